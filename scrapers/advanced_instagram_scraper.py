@@ -5,28 +5,41 @@ Downloads images, videos, and stories from Instagram accounts using multiple tec
 """
 
 import requests
-import json
-import os
 import time
-import re
 import random
-from urllib.parse import urlparse, parse_qs
-from bs4 import BeautifulSoup
-import urllib.request
 import logging
-import base64
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException
 import undetected_chromedriver as uc
 
+from driver_pool import DriverPool, block_resources as block_page_resources
+from instagram_engine import InstagramEngine, SeleniumBackend, extract_username_from_url, read_brands_list
+from network_capture import NetworkCapture, enable_performance_log, find_posts, find_profile, has_more_posts
+from rate_limit import INSTAGRAM_RATE_LIMITS, RateLimitedSession
+
 class AdvancedInstagramScraper:
-    def __init__(self, output_dir="downloads/instagram_data"):
+    def __init__(self, output_dir="downloads/instagram_data", post_workers=4, driver_factory=None,
+                 block_resources=True, base_url="https://www.instagram.com", rate_limits=None,
+                 capture_network=True):
         self.output_dir = output_dir
+        self.base_url = base_url
+        self.driver_factory = driver_factory
+        self.block_resources = block_resources
+        # Read profiles and posts from the JSON the profile page loads; falls back to the DOM without it
+        self.capture_network = capture_network
+        self.capture = None
+        self._captured = None
+        self.rate_limits = rate_limits or INSTAGRAM_RATE_LIMITS
+        self.media_session = RateLimitedSession(requests.Session(), self.rate_limits)
         self.setup_logging()
         self.setup_driver()
+        # Post pages are read by a pool of headless browsers; self.driver keeps login and profile pages
+        self.post_pool = DriverPool(post_workers, factory=driver_factory, block_resources=block_resources,
+                                    warm_url=f"{base_url}/", logger=self.logger)
+        self.engine = InstagramEngine(SeleniumBackend(self), output_dir, media_session=self.media_session,
+                                      max_posts=15, rate_limits=self.rate_limits, logger=self.logger)
         
     def setup_logging(self):
         """Setup logging configuration"""
@@ -43,41 +56,47 @@ class AdvancedInstagramScraper:
     def setup_driver(self):
         """Setup undetected Chrome driver"""
         try:
+            if self.driver_factory:
+                self.driver = self.driver_factory()
+                self.setup_capture()
+                return
+            
             options = uc.ChromeOptions()
             options.add_argument('--no-sandbox')
             options.add_argument('--disable-dev-shm-usage')
             options.add_argument('--disable-blink-features=AutomationControlled')
             options.add_experimental_option("excludeSwitches", ["enable-automation"])
             options.add_experimental_option('useAutomationExtension', False)
+            if self.capture_network:
+                enable_performance_log(options)
             
             self.driver = uc.Chrome(options=options)
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            self.setup_capture()
             self.logger.info("Chrome driver setup successful")
             
         except Exception as e:
             self.logger.error(f"Failed to setup Chrome driver: {e}")
             self.driver = None
     
-    def extract_username_from_url(self, instagram_url):
-        """Extract username from Instagram URL"""
+    def setup_capture(self):
+        """Start reading the driver's network log, if capture mode is on and the driver keeps one"""
+        if not self.capture_network:
+            return
         try:
-            if '/p/' in instagram_url:
-                # Post URL, extract username from the path
-                path = urlparse(instagram_url).path
-                parts = path.split('/')
-                if len(parts) > 1:
-                    return parts[1]
-            elif 'instagram.com/' in instagram_url:
-                # Profile URL
-                path = urlparse(instagram_url).path
-                username = path.strip('/')
-                if username and not username.startswith('p/'):
-                    return username
-            
-            return None
+            capture = NetworkCapture(self.driver, logger=self.logger)
+            capture.clear()
         except Exception as e:
-            self.logger.error(f"Error extracting username from {instagram_url}: {e}")
-            return None
+            self.logger.warning(f"Network capture unavailable, reading the page instead: {e}")
+            return
+        self.capture = capture
+        # Captured JSON carries every URL, so the page's own images and fonts are never needed
+        if self.block_resources:
+            block_page_resources(self.driver)
+    
+    def extract_username_from_url(self, instagram_url):
+        """Extract username from Instagram URL"""
+        return extract_username_from_url(instagram_url)
     
     def login_to_instagram(self, username=None, password=None):
         """Login to Instagram (optional)"""
@@ -86,7 +105,7 @@ class AdvancedInstagramScraper:
             return True
         
         try:
-            self.driver.get("https://www.instagram.com/accounts/login/")
+            self.driver.get(f"{self.base_url}/accounts/login/")
             time.sleep(3)
             
             # Find and fill username
@@ -105,6 +124,9 @@ class AdvancedInstagramScraper:
             
             time.sleep(5)
             self.logger.info("Login successful")
+            
+            # Post pages are read by the pool, which needs the logged-in session too
+            self.post_pool.set_cookies(self.driver.get_cookies(), f"{self.base_url}/")
             return True
             
         except Exception as e:
@@ -114,9 +136,11 @@ class AdvancedInstagramScraper:
     def get_profile_data(self, username):
         """Get profile data using Selenium"""
         try:
-            profile_url = f"https://www.instagram.com/{username}/"
-            self.driver.get(profile_url)
-            time.sleep(random.uniform(3, 5))
+            self.open_profile_page(username)
+            if self.capture:
+                profile = self.wait_for_captured(lambda captured: captured['profile'])
+                if profile:
+                    return profile
             
             # Get profile picture
             try:
@@ -152,14 +176,91 @@ class AdvancedInstagramScraper:
             self.logger.error(f"Error getting profile data for {username}: {e}")
             return None
     
+    def open_profile_page(self, username):
+        """Load username's profile page, starting a fresh capture of the responses it loads"""
+        if self.capture:
+            self.capture.clear()
+            self._captured = {'username': username, 'profile': None, 'posts': {}, 'more': None, 'responses': 0}
+        self.rate_limits.api.acquire()
+        self.driver.get(f"{self.base_url}/{username}/")
+    
+    def collect_captured(self):
+        """Fold the responses captured since the last call into the current profile's state"""
+        captured = self._captured
+        for url, payload in self.capture.responses():
+            captured['responses'] += 1
+            captured['profile'] = captured['profile'] or find_profile(payload, captured['username'])
+            for post in find_posts(payload):
+                captured['posts'].setdefault(post['shortcode'] or post['id'], post)
+            more = has_more_posts(payload)
+            if more is not None:
+                captured['more'] = more
+        return captured
+    
+    def wait_for_captured(self, condition, timeout=10):
+        """Poll the network log until condition(captured state) is truthy; None on timeout"""
+        try:
+            return WebDriverWait(self.driver, timeout, poll_frequency=0.2).until(
+                lambda driver: condition(self.collect_captured())
+            )
+        except TimeoutException:
+            return None
+    
+    @staticmethod
+    def captured_posts_ready(captured):
+        """Whether the captured responses hold posts or show the profile has none to show"""
+        if captured['posts'] or captured['more'] is False:
+            return True
+        profile = captured['profile']
+        return bool(profile and (profile.get('is_private') or profile.get('posts_count') == 0))
+    
+    def get_captured_posts(self, username, max_posts):
+        """Posts from the feed responses the profile page loads, scrolling only to make it load the next page.
+        
+        Returns None if the page loaded no usable JSON, so the caller can
+        fall back to reading post pages.
+        """
+        if not self._captured or self._captured['username'] != username:
+            self.open_profile_page(username)
+        if not self.wait_for_captured(self.captured_posts_ready):
+            return None
+        captured = self._captured
+        if not captured['posts']:
+            self.logger.info(f"@{username} has no visible posts")
+            return []
+        
+        while (max_posts is None or len(captured['posts']) < max_posts) and captured['more']:
+            seen = captured['responses']
+            # Scrolling to the bottom makes the page fetch its next feed page
+            self.rate_limits.api.acquire()
+            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            if not self.wait_for_captured(lambda captured: captured['responses'] > seen):
+                self.logger.warning(f"No further feed page loaded for @{username}")
+                break
+        
+        # Newest first; pinned posts, which the feed lists first, go where their age puts them
+        posts = sorted(captured['posts'].values(), key=lambda post: post.get('timestamp') or 0, reverse=True)
+        for post in posts:
+            post['url'] = f"{self.base_url}/p/{post['shortcode']}/"
+        self.logger.info(f"Captured {len(posts)} posts for @{username} from "
+                         f"{captured['responses']} network responses")
+        return posts[:max_posts]
+    
     def get_posts_data(self, username, max_posts=20):
         """Get posts data using Selenium"""
         try:
-            profile_url = f"https://www.instagram.com/{username}/"
+            if self.capture:
+                posts_data = self.get_captured_posts(username, max_posts)
+                if posts_data is not None:
+                    return posts_data
+                self.logger.info(f"No post data captured for @{username}, reading post pages")
+            
+            profile_url = f"{self.base_url}/{username}/"
+            self.rate_limits.api.acquire()
             self.driver.get(profile_url)
-            time.sleep(random.uniform(3, 5))
-            
-            posts_data = []
+            WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located((By.XPATH, "//a[contains(@href, '/p/')]"))
+            )
             
             # Scroll to load more posts
             for i in range(3):
@@ -168,33 +269,33 @@ class AdvancedInstagramScraper:
             
             # Find post links
             post_links = self.driver.find_elements(By.XPATH, "//a[contains(@href, '/p/')]")
-            
-            for i, link in enumerate(post_links[:max_posts]):
-                try:
-                    post_url = link.get_attribute('href')
-                    self.logger.info(f"Processing post {i+1}: {post_url}")
-                    
-                    post_data = self.get_single_post_data(post_url)
-                    if post_data:
-                        posts_data.append(post_data)
-                    
-                    time.sleep(random.uniform(1, 3))
-                    
-                except Exception as e:
-                    self.logger.error(f"Error processing post {i+1}: {e}")
-                    continue
-            
-            return posts_data
+            post_urls = []
+            for link in post_links:
+                post_url = link.get_attribute('href')
+                if post_url and post_url not in post_urls:
+                    post_urls.append(post_url)
+            post_urls = post_urls[:max_posts]
+            self.logger.info(f"Reading {len(post_urls)} posts with {self.post_pool.size} browsers")
+            
+            # Open the post pages in parallel across the pool
+            posts_data = self.post_pool.map(lambda driver, url: self.get_single_post_data(url, driver), post_urls)
+            return [post_data for post_data in posts_data if post_data]
             
         except Exception as e:
             self.logger.error(f"Error getting posts data for {username}: {e}")
             return []
     
-    def get_single_post_data(self, post_url):
+    def get_single_post_data(self, post_url, driver=None):
         """Get data from a single post"""
+        driver = driver or self.driver
         try:
-            self.driver.get(post_url)
-            time.sleep(random.uniform(2, 4))
+            self.logger.info(f"Processing post: {post_url}")
+            self.rate_limits.api.acquire()
+            driver.get(post_url)
+            try:
+                WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "article")))
+            except TimeoutException:
+                self.logger.warning(f"Post page did not finish loading: {post_url}")
             
             post_data = {
                 'url': post_url,
@@ -207,7 +308,7 @@ class AdvancedInstagramScraper:
             # Get media URLs
             try:
                 # Look for images
-                images = self.driver.find_elements(By.XPATH, "//img[@alt='Photo by']")
+                images = driver.find_elements(By.XPATH, "//img[@alt='Photo by']")
                 for img in images:
                     src = img.get_attribute('src')
                     if src and 'instagram' in src:
@@ -217,7 +318,7 @@ class AdvancedInstagramScraper:
                         })
                 
                 # Look for videos
-                videos = self.driver.find_elements(By.XPATH, "//video")
+                videos = driver.find_elements(By.XPATH, "//video")
                 for video in videos:
                     src = video.get_attribute('src')
                     if src:
@@ -231,14 +332,14 @@ class AdvancedInstagramScraper:
             
             # Get caption
             try:
-                caption_element = self.driver.find_element(By.XPATH, "//div[@data-testid='post-caption']")
+                caption_element = driver.find_element(By.XPATH, "//div[@data-testid='post-caption']")
                 post_data['caption'] = caption_element.text
             except:
                 pass
             
             # Get likes count
             try:
-                likes_element = self.driver.find_element(By.XPATH, "//section//span[contains(text(), 'like')]")
+                likes_element = driver.find_element(By.XPATH, "//section//span[contains(text(), 'like')]")
                 post_data['likes'] = likes_element.text.split()[0]
             except:
                 pass
@@ -251,163 +352,19 @@ class AdvancedInstagramScraper:
     
     def download_media(self, url, filepath):
         """Download media file from URL"""
-        try:
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(filepath), exist_ok=True)
-            
-            # Download the file
-            urllib.request.urlretrieve(url, filepath)
-            self.logger.info(f"Downloaded: {filepath}")
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Error downloading {url}: {e}")
-            return False
+        return self.engine.download_media(url, filepath).result()
     
     def scrape_brand_instagram(self, brand_name, instagram_url):
         """Scrape Instagram content for a specific brand"""
-        try:
-            # Extract username from URL
-            username = self.extract_username_from_url(instagram_url)
-            if not username:
-                self.logger.error(f"Could not extract username from URL: {instagram_url}")
-                return False
-            
-            # Create brand folder
-            brand_folder = os.path.join(self.output_dir, brand_name)
-            images_folder = os.path.join(brand_folder, 'images')
-            videos_folder = os.path.join(brand_folder, 'videos')
-            posts_folder = os.path.join(brand_folder, 'posts')
-            
-            os.makedirs(images_folder, exist_ok=True)
-            os.makedirs(videos_folder, exist_ok=True)
-            os.makedirs(posts_folder, exist_ok=True)
-            
-            self.logger.info(f"Processing {brand_name} (@{username})")
-            
-            # Get profile data
-            profile_data = self.get_profile_data(username)
-            if profile_data:
-                # Download profile picture
-                if profile_data.get('profile_pic_url'):
-                    profile_pic_path = os.path.join(brand_folder, f"{username}_profile.jpg")
-                    self.download_media(profile_data['profile_pic_url'], profile_pic_path)
-                
-                # Save profile data
-                profile_file = os.path.join(brand_folder, 'profile_data.json')
-                with open(profile_file, 'w', encoding='utf-8') as f:
-                    json.dump(profile_data, f, indent=2)
-            
-            # Get posts data
-            posts_data = self.get_posts_data(username, max_posts=15)
-            
-            # Download media from posts
-            downloaded_count = 0
-            for i, post in enumerate(posts_data):
-                try:
-                    post_folder = os.path.join(posts_folder, f"post_{i+1}")
-                    os.makedirs(post_folder, exist_ok=True)
-                    
-                    # Save post data
-                    post_file = os.path.join(post_folder, 'post_data.json')
-                    with open(post_file, 'w', encoding='utf-8') as f:
-                        json.dump(post, f, indent=2)
-                    
-                    # Download media
-                    for j, media in enumerate(post.get('media_urls', [])):
-                        if media['type'] == 'image':
-                            filename = f"image_{j+1}.jpg"
-                            filepath = os.path.join(post_folder, filename)
-                        else:
-                            filename = f"video_{j+1}.mp4"
-                            filepath = os.path.join(post_folder, filename)
-                        
-                        if self.download_media(media['url'], filepath):
-                            downloaded_count += 1
-                    
-                    time.sleep(random.uniform(1, 2))
-                    
-                except Exception as e:
-                    self.logger.error(f"Error processing post {i+1}: {e}")
-                    continue
-            
-            self.logger.info(f"Downloaded {downloaded_count} media files for {brand_name}")
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Error scraping {brand_name}: {e}")
-            return False
+        return self.engine.scrape_brand(brand_name, instagram_url)
     
     def read_brands_list(self, brands_file="downloads/brands-list.md"):
         """Read brands and Instagram links from the markdown file"""
-        brands = {}
-        
-        try:
-            with open(brands_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Extract brand names and Instagram links
-            lines = content.split('\n')
-            for line in lines:
-                if '**' in line and 'Instagram' in line:
-                    # Extract brand name
-                    brand_match = re.search(r'\*\*(.*?)\*\*', line)
-                    if brand_match:
-                        brand_name = brand_match.group(1)
-                        
-                        # Extract Instagram URL
-                        url_match = re.search(r'https://www\.instagram\.com/[^\s)]+', line)
-                        if url_match:
-                            instagram_url = url_match.group(0)
-                            brands[brand_name] = instagram_url
-                        elif 'No official Instagram link found' in line or 'No specific Instagram link found' in line:
-                            brands[brand_name] = None
-            
-            return brands
-            
-        except Exception as e:
-            self.logger.error(f"Error reading brands file: {e}")
-            return {}
+        return read_brands_list(brands_file, self.logger)
     
     def run(self, brands_file="downloads/brands-list.md", max_brands=None):
         """Main method to scrape Instagram content for all brands"""
-        self.logger.info("Starting Advanced Instagram Content Scraper...")
-        
-        # Read brands list
-        brands = self.read_brands_list(brands_file)
-        
-        if not brands:
-            self.logger.error("No brands found in the file!")
-            return
-        
-        self.logger.info(f"Found {len(brands)} brands with Instagram links")
-        
-        # Limit brands if specified
-        if max_brands:
-            brands = dict(list(brands.items())[:max_brands])
-            self.logger.info(f"Limited to {max_brands} brands for testing")
-        
-        # Process each brand
-        successful_scrapes = 0
-        for i, (brand_name, instagram_url) in enumerate(brands.items(), 1):
-            if not instagram_url:
-                self.logger.info(f"Skipping {brand_name} - no Instagram link")
-                continue
-            
-            self.logger.info(f"\n[{i}/{len(brands)}] Processing: {brand_name}")
-            
-            if self.scrape_brand_instagram(brand_name, instagram_url):
-                successful_scrapes += 1
-            
-            # Be respectful with delays between brands
-            time.sleep(random.uniform(5, 10))
-        
-        self.logger.info(f"\nCompleted! Successfully scraped {successful_scrapes} out of {len(brands)} brands")
-        self.logger.info(f"Check the '{self.output_dir}' folder for downloaded content.")
-        
-        # Clean up
-        if self.driver:
-            self.driver.quit()
+        self.engine.run(brands_file, max_brands=max_brands, title="Advanced Instagram Content Scraper")
 
 def main():
     """Main function to run the advanced Instagram scraper"""
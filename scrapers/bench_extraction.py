@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Extraction Benchmark
+Times the single-pass ProductPageExtractor against the selector-by-selector
+product page parse it replaced, on product pages rendered from a recorded
+lowheads scrape, and checks both give the same result
+"""
+
+import argparse
+import json
+import re
+import time
+import html as html_lib
+from typing import Dict, List
+
+from bs4 import BeautifulSoup
+
+from fixture_server import render_lowheads_product_page
+from lowheads_scraper import LowheadsCompleteScraper
+
+
+def render_fallback_page(product: Dict) -> str:
+    """A product page that only the fallback rules match: cart heading, bare CDN images,
+    background images, an embedded video and brand details in running text"""
+    images = ''.join(
+        f'<img src="{html_lib.escape(url.replace("lowheads.com/cdn/shop", "cdn.shopify.com/s/files/1/0"))}_800x.jpg">'
+        for url in product.get('images', [])
+    )
+    backgrounds = ''.join(
+        f'<div style="background-image: url(\'https://cdn.shopify.com/s/files/1/0/bg_{i}.jpg\')"></div>'
+        for i in range(3)
+    )
+    return (
+        '<html><body><h1>Your cart</h1><h1 class="product-title">'
+        f'{html_lib.escape(product.get("name", ""))}</h1>'
+        f'<div class="product-price-wrapper"><p>From $ {re.sub(r"[^0-9.]", "", str(product.get("price", "0")))}</p></div>'
+        f'<div>{images}{backgrounds}</div>'
+        '<iframe src="https://www.youtube.com/embed/abc"></iframe>'
+        '<p>This Brand Is From - New York City</p><p>About This Brand - banishedusa.com</p>'
+        '<div class="variant-picker"><option>Select</option><option>S</option><option>M</option></div>'
+        '</body></html>'
+    )
+
+
+def load_pages(data_file: str, limit: int) -> List:
+    with open(data_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    pages = []
+    for brand_data in data['brands'].values():
+        for product in brand_data.get('products', []):
+            listing = {key: product.get(key, '') for key in ('brand', 'name', 'price', 'listing_image', 'product_url')}
+            listing['listing_data_complete'] = True
+            pages.append((render_lowheads_product_page(product), listing))
+            pages.append((render_fallback_page(product), listing))
+            if len(pages) >= limit:
+                return pages
+    return pages
+
+
+def legacy_extract(self, soup: BeautifulSoup, listing_data: Dict) -> Dict:
+    """The selector-by-selector parse_product_page this engine replaced, kept as the baseline"""
+    product = listing_data.copy()
+    product['detailed_data_complete'] = False
+
+    try:
+        # Get detailed product name
+        name_selectors = [
+            'h1',
+            ('h1', {'class': re.compile(r'product.*title', re.I)}),
+            ('div', {'class': re.compile(r'product.*title', re.I)}),
+        ]
+
+        for selector in name_selectors:
+            if isinstance(selector, str):
+                name_elem = soup.find(selector)
+            else:
+                name_elem = soup.find(*selector)
+
+            if name_elem:
+                detailed_name = name_elem.get_text(strip=True)
+                # Filter out cart-related text
+                if detailed_name and 'cart' not in detailed_name.lower() and len(detailed_name) > 3:
+                    product['detailed_name'] = detailed_name
+                    break
+
+        # If no detailed name found, use the listing name
+        if not product.get('detailed_name') or 'cart' in product.get('detailed_name', '').lower():
+            product['detailed_name'] = product.get('name', 'Unknown Product')
+
+        # Get detailed price
+        price_selectors = [
+            ('span', {'class': re.compile(r'price', re.I)}),
+            ('div', {'class': re.compile(r'price', re.I)}),
+            ('p', {'class': re.compile(r'price', re.I)}),
+        ]
+
+        for tag, attrs in price_selectors:
+            price_elem = soup.find(tag, attrs)
+            if price_elem:
+                price_text = price_elem.get_text(strip=True)
+                price_match = re.search(r'[\$£€]?\s*\d+(?:[.,]\d{2})?', price_text)
+                if price_match:
+                    product['detailed_price'] = price_match.group(0)
+                    break
+
+        # Get all product images and videos
+        product['images'] = []
+        product['videos'] = []
+
+        # Find image gallery - comprehensive approach for Lowheads
+        image_selectors = [
+            ('img', {'class': re.compile(r'product.*image', re.I)}),
+            ('img', {'class': re.compile(r'gallery.*image', re.I)}),
+            ('img', {'data-src': True}),
+            ('img', {'src': re.compile(r'cdn\.shopify\.com', re.I)}),
+            # Lowheads specific selectors
+            ('img', {'src': re.compile(r'\.jpg|\.jpeg|\.png|\.webp', re.I)}),
+            ('img', {'data-src': re.compile(r'\.jpg|\.jpeg|\.png|\.webp', re.I)}),
+        ]
+
+        for tag, attrs in image_selectors:
+            images = soup.find_all(tag, attrs)
+            for img in images:
+                # Check all possible image sources
+                img_url = img.get('src') or img.get('data-src') or img.get('data-srcset')
+                if img_url:
+                    clean_url = self.clean_image_url(img_url)
+                    # Filter out logo images and small icons
+                    if (clean_url not in product['images'] and 
+                        'logo' not in clean_url.lower() and
+                        'icon' not in clean_url.lower() and
+                        len(clean_url) > 20):  # Avoid very short URLs
+                        product['images'].append(clean_url)
+
+        # Also check for images with responsive-image class (common in Lowheads)
+        responsive_images = soup.find_all('img', class_='responsive-image')
+        for img in responsive_images:
+            img_url = img.get('src') or img.get('data-src') or img.get('data-srcset')
+            if img_url:
+                clean_url = self.clean_image_url(img_url)
+                if (clean_url not in product['images'] and
+                    'logo' not in clean_url.lower() and
+                    'icon' not in clean_url.lower()):
+                    product['images'].append(clean_url)
+
+
+
+        # If no images found with selectors, try to get all images and filter
+        if not product['images']:
+            all_images = soup.find_all('img')
+            for img in all_images:
+                img_url = img.get('src') or img.get('data-src') or img.get('data-srcset')
+                if img_url:
+                    clean_url = self.clean_image_url(img_url)
+                    # Filter for product images only
+                    if (clean_url not in product['images'] and
+                        'cdn.shopify.com' in clean_url and
+                        'logo' not in clean_url.lower() and
+                        'icon' not in clean_url.lower() and
+                        len(clean_url) > 20):
+                        product['images'].append(clean_url)
+
+        # Also check for background images in CSS
+        elements_with_bg = soup.find_all(style=re.compile(r'background-image'))
+        for elem in elements_with_bg:
+            style = elem.get('style', '')
+            match = re.search(r'url\([\'"]?([^\'"]+)[\'"]?\)', style)
+            if match:
+                img_url = self.clean_image_url(match.group(1))
+                if (img_url not in product['images'] and
+                    'cdn.shopify.com' in img_url and
+                    'logo' not in img_url.lower() and
+                    'icon' not in img_url.lower()):
+                    product['images'].append(img_url)
+
+        # Check for data attributes that might contain image URLs
+        for elem in soup.find_all(attrs={'data-image': True}):
+            img_url = elem.get('data-image')
+            if img_url:
+                clean_url = self.clean_image_url(img_url)
+                if clean_url not in product['images']:
+                    product['images'].append(clean_url)
+
+        # Look for any elements with image-related data attributes
+        for elem in soup.find_all(attrs=re.compile(r'data-.*image')):
+            for attr_name, attr_value in elem.attrs.items():
+                if 'image' in attr_name.lower() and attr_value:
+                    img_url = self.clean_image_url(attr_value)
+                    if (img_url not in product['images'] and
+                        'cdn.shopify.com' in img_url):
+                        product['images'].append(img_url)
+
+        # Find videos
+        video_selectors = [
+            ('video', {}),
+            ('source', {'type': re.compile(r'video', re.I)}),
+            ('iframe', {'src': re.compile(r'youtube|vimeo', re.I)}),
+        ]
+
+        for tag, attrs in video_selectors:
+            videos = soup.find_all(tag, attrs)
+            for video in videos:
+                video_url = video.get('src') or video.get('data-src')
+                if video_url:
+                    if video_url not in product['videos']:
+                        product['videos'].append(video_url)
+
+        # Get product description - improved for Lowheads
+        page_text = soup.get_text()
+
+        # Look for the specific description pattern we know exists
+        desc_pattern = r'Heavyweight[^.]*?Ships in \d+-\d+ days'
+        desc_match = re.search(desc_pattern, page_text, re.DOTALL | re.IGNORECASE)
+
+        if desc_match:
+            product['description'] = desc_match.group(0).strip()
+        else:
+            # Fallback to element search
+            desc_selectors = [
+                ('div', {'class': re.compile(r'product.*description', re.I)}),
+                ('div', {'class': re.compile(r'description', re.I)}),
+                ('p', {'class': re.compile(r'description', re.I)}),
+            ]
+
+            for tag, attrs in desc_selectors:
+                desc_elem = soup.find(tag, attrs)
+                if desc_elem:
+                    desc_text = desc_elem.get_text(strip=True)
+                    # Check if it contains description-like content
+                    if any(keyword in desc_text.lower() for keyword in ['heavyweight', 'embroidered', 'cotton', 'print']):
+                        product['description'] = desc_text
+                        break
+
+        # Get brand metadata (location, shipping, website)
+        product['brand_metadata'] = {}
+
+        # Look for brand information sections
+        brand_info_selectors = [
+            ('div', {'class': re.compile(r'brand.*info', re.I)}),
+            ('div', {'class': re.compile(r'vendor.*info', re.I)}),
+            ('div', {'class': re.compile(r'seller.*info', re.I)}),
+            ('div', {'class': re.compile(r'about.*brand', re.I)}),
+        ]
+
+        for tag, attrs in brand_info_selectors:
+            brand_elem = soup.find(tag, attrs)
+            if brand_elem:
+                # Extract brand metadata from text
+                brand_text = brand_elem.get_text(strip=True)
+
+                # Look for location
+                location_match = re.search(r'This Brand Is From - (.+)', brand_text)
+                if location_match:
+                    product['brand_metadata']['location'] = location_match.group(1).strip()
+
+                # Look for shipping info
+                shipping_match = re.search(r'This Brand Ships Within - (.+)', brand_text)
+                if shipping_match:
+                    product['brand_metadata']['shipping_time'] = shipping_match.group(1).strip()
+
+                # Look for website
+                website_match = re.search(r'About This Brand - (.+)', brand_text)
+                if website_match:
+                    product['brand_metadata']['website'] = website_match.group(1).strip()
+
+                break
+
+        # If not found in specific sections, search the entire page
+        if not product['brand_metadata']:
+            product['brand_metadata'] = self.extract_brand_metadata(page_text)
+
+        # Also look for alternative patterns that might exist
+        if not product['brand_metadata'].get('location'):
+            # Look for any mention of New York City
+            nyc_match = re.search(r'[Nn]ew [Yy]ork [Cc]ity', page_text)
+            if nyc_match:
+                product['brand_metadata']['location'] = 'New York City'
+
+        if not product['brand_metadata'].get('website'):
+            # Look for banishedusa.com
+            website_match = re.search(r'banishedusa\.com', page_text)
+            if website_match:
+                product['brand_metadata']['website'] = 'banishedusa.com'
+
+        # Get product variants (sizes, colors, etc.)
+        variant_selectors = [
+            ('select', {'name': re.compile(r'variant', re.I)}),
+            ('div', {'class': re.compile(r'variant', re.I)}),
+        ]
+
+        product['variants'] = []
+        for tag, attrs in variant_selectors:
+            variant_elem = soup.find(tag, attrs)
+            if variant_elem:
+                options = variant_elem.find_all('option')
+                for option in options:
+                    variant_text = option.get_text(strip=True)
+                    if variant_text and variant_text not in ['Select', 'Choose']:
+                        product['variants'].append(variant_text)
+
+        product['detailed_data_complete'] = True
+
+    except Exception as e:
+        print(f"    × Error parsing product page: {e}")
+
+    return product
+
+def time_it(func, items, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(*item)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark single-pass product page extraction")
+    parser.add_argument('--data', default='lowheads_complete_data.json', help='Recorded scrape to render pages from')
+    parser.add_argument('--pages', type=int, default=400, help='Number of product pages')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is reported)')
+    args = parser.parse_args()
+
+    scraper = LowheadsCompleteScraper(use_http_cache=False, use_shopify_feed=False)
+    pages = load_pages(args.data, args.pages)
+    soups = [(BeautifulSoup(page, 'html.parser'), listing) for page, listing in pages]
+
+    mismatches = sum(
+        1 for soup, listing in soups
+        if legacy_extract(scraper, soup, listing) != scraper.extractor.extract(soup, listing)
+    )
+
+    legacy_extract_time = time_it(lambda soup, listing: legacy_extract(scraper, soup, listing), soups, args.repeat)
+    single_pass_time = time_it(scraper.extractor.extract, soups, args.repeat)
+    parse_time = time_it(lambda page, listing: BeautifulSoup(page, 'html.parser'), pages, args.repeat)
+
+    print("=" * 60)
+    print(f"EXTRACTION BENCHMARK ({len(pages)} product pages)")
+    print("=" * 60)
+    print(f"{'stage':<28}{'total s':>10}{'ms/page':>10}")
+    for name, seconds in (('html.parser tree build', parse_time),
+                          ('multi-pass selectors', legacy_extract_time),
+                          ('single-pass extractor', single_pass_time)):
+        print(f"{name:<28}{seconds:>10.3f}{seconds / len(pages) * 1000:>10.2f}")
+    print(f"\nExtraction speedup: {legacy_extract_time / single_pass_time:.1f}x")
+    print(f"End-to-end speedup (parse + extract): "
+          f"{(parse_time + legacy_extract_time) / (parse_time + single_pass_time):.1f}x")
+    print(f"Results that differ from the multi-pass parse: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Parser Benchmark
+Measures parse throughput of each installed HTML parser backend on saved
+HTML (or pages rendered from a recorded lowheads scrape), and checks the
+scraper extracts the same products with each of them
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+from typing import Dict, List, Tuple
+
+from fixture_server import render_lowheads_listing_page, render_lowheads_product_page
+from html_parsing import available_backends, make_soup
+from lowheads_scraper import LowheadsCompleteScraper
+
+
+def load_rendered_pages(data_file: str, limit: int) -> Tuple[List[Tuple[str, Dict]], List[Tuple[str, str]]]:
+    """Product pages with their listing data, and brand listing pages with their brand"""
+    with open(data_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    product_pages, listing_pages = [], []
+    for brand_name, brand_data in data['brands'].items():
+        products = [p for p in brand_data.get('products', []) if p.get('product_url')]
+        if not products:
+            continue
+        listing_pages.append((render_lowheads_listing_page(brand_name, products), brand_name))
+        for product in products:
+            listing = {key: product.get(key, '') for key in ('brand', 'name', 'price', 'listing_image', 'product_url')}
+            listing['listing_data_complete'] = True
+            product_pages.append((render_lowheads_product_page(product), listing))
+        if len(product_pages) >= limit:
+            break
+    return product_pages[:limit], listing_pages
+
+
+def load_saved_pages(html_dir: str) -> List[Tuple[str, Dict]]:
+    pages = []
+    for name in sorted(os.listdir(html_dir)):
+        if name.endswith(('.html', '.htm')):
+            with open(os.path.join(html_dir, name), 'r', encoding='utf-8', errors='replace') as f:
+                pages.append((f.read(), {'name': name, 'product_url': name}))
+    return pages
+
+
+def best_time(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML parser backends")
+    parser.add_argument('--data', default='lowheads_complete_data.json', help='Recorded scrape to render pages from')
+    parser.add_argument('--html-dir', help='Directory of saved product page .html files to use instead')
+    parser.add_argument('--pages', type=int, default=300, help='Number of product pages to render')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is reported)')
+    args = parser.parse_args()
+
+    if args.html_dir:
+        product_pages, listing_pages = load_saved_pages(args.html_dir), []
+    else:
+        product_pages, listing_pages = load_rendered_pages(args.data, args.pages)
+    total_bytes = sum(len(page.encode('utf-8')) for page, _ in product_pages)
+
+    backends = available_backends()
+    results = {}
+    outputs = {}
+    for backend in backends:
+        scraper = LowheadsCompleteScraper(use_http_cache=False, use_shopify_feed=False, parser_backend=backend)
+
+        parse = best_time(lambda: [make_soup(page, backend) for page, _ in product_pages], args.repeat)
+        extract = best_time(lambda: [scraper.extractor.extract_html(page, listing, backend)
+                                     for page, listing in product_pages], args.repeat)
+        with contextlib.redirect_stdout(io.StringIO()):
+            listings = best_time(lambda: [scraper.parse_brand_listing(page, brand)
+                                          for page, brand in listing_pages], args.repeat)
+            outputs[backend] = (
+                [scraper.extractor.extract_html(page, listing, backend) for page, listing in product_pages],
+                [scraper.parse_brand_listing(page, brand) for page, brand in listing_pages],
+            )
+        results[backend] = (parse, extract, listings)
+
+    print("=" * 72)
+    print(f"PARSER BENCHMARK ({len(product_pages)} product pages, {total_bytes / 1e6:.1f} MB, "
+          f"{len(listing_pages)} listing pages)")
+    print("=" * 72)
+    print(f"{'backend':<14}{'parse MB/s':>12}{'pages/s':>10}{'parse+extract/s':>18}{'listings s':>12}{'speedup':>9}")
+    baseline = results['html.parser'][1]
+    for backend in backends:
+        parse, extract, listings = results[backend]
+        print(f"{backend:<14}{total_bytes / 1e6 / parse:>12.1f}{len(product_pages) / parse:>10.0f}"
+              f"{len(product_pages) / extract:>18.0f}{listings:>12.3f}{baseline / extract:>8.1f}x")
+
+    reference = outputs['html.parser']
+    for backend in backends:
+        if backend == 'html.parser':
+            continue
+        products, listings = outputs[backend]
+        differing = sum(1 for a, b in zip(products, reference[0]) if a != b)
+        differing += sum(1 for a, b in zip(listings, reference[1]) if a != b)
+        print(f"{backend}: {differing} pages extract differently from html.parser")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Selenium Benchmark
+Serves a fixture Instagram profile from a local server and times
+AdvancedInstagramScraper reading its posts with one browser fetching every
+page asset, with a pool of warm headless browsers with images, fonts and
+stylesheets blocked, and from the feed responses the profile page loads
+"""
+
+import argparse
+import threading
+import time
+
+from fixture_server import FixtureServer, build_instagram_routes
+from network_capture import enable_performance_log
+from rate_limit import InstagramRateLimits
+
+
+def headless_chrome():
+    """Plain headless Chrome; the fixture server doesn't need undetected_chromedriver"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    enable_performance_log(options)
+    return webdriver.Chrome(options=options)
+
+
+class AssetHandler:
+    """Answers /media/ and /static/ requests after ``delay`` seconds, counting them"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.served = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, path: str):
+        if not path.startswith(('/media/', '/static/')):
+            return None
+        with self._lock:
+            self.served += 1
+        time.sleep(self.delay)
+        return (200, 'application/octet-stream', b'\0' * 1024)
+
+
+def run_once(server: FixtureServer, assets: AssetHandler, username: str, posts: int,
+             workers: int, block: bool, capture: bool):
+    from advanced_instagram_scraper import AdvancedInstagramScraper
+
+    start = time.perf_counter()
+    # No pacing against localhost; the real limits would hide the browser cost
+    scraper = AdvancedInstagramScraper(post_workers=workers, driver_factory=headless_chrome,
+                                       block_resources=block, base_url=server.base_url, capture_network=capture,
+                                       rate_limits=InstagramRateLimits(api_rate=1000, api_burst=1000))
+    try:
+        if not capture:
+            scraper.post_pool.start()
+        startup = time.perf_counter() - start
+
+        server.reset_counters()
+        assets.served = 0
+        start = time.perf_counter()
+        posts_data = scraper.get_posts_data(username, max_posts=posts)
+        elapsed = time.perf_counter() - start
+    finally:
+        scraper.engine.close()
+
+    return {
+        'posts': len(posts_data),
+        'requests': server.requests_served,
+        'assets': assets.served,
+        'startup': startup,
+        'seconds': elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time Selenium post extraction with one browser, the browser pool and network capture")
+    parser.add_argument('--posts', type=int, default=12, help='Posts on the fixture profile')
+    parser.add_argument('--workers', type=int, default=4, help='Browsers in the pool')
+    parser.add_argument('--asset-delay', type=float, default=0.05, help='Seconds the server takes per image/font/stylesheet')
+    args = parser.parse_args()
+
+    username = 'fixturebrand'
+    routes, _ = build_instagram_routes(username, args.posts)
+    assets = AssetHandler(args.asset_delay)
+
+    with FixtureServer(routes, handler=assets) as server:
+        before = run_once(server, assets, username, args.posts, workers=1, block=False, capture=False)
+        pooled = run_once(server, assets, username, args.posts, workers=args.workers, block=True, capture=False)
+        captured = run_once(server, assets, username, args.posts, workers=args.workers, block=True, capture=True)
+
+    print("=" * 60)
+    print(f"SELENIUM BENCHMARK ({args.posts} posts, {args.workers} browsers)")
+    print("=" * 60)
+    print(f"{'mode':<22}{'requests':>10}{'assets':>8}{'startup':>10}{'seconds':>10}")
+    for name, result in (('one browser', before), ('blocked browser pool', pooled), ('network capture', captured)):
+        print(f"{name:<22}{result['requests']:>10}{result['assets']:>8}"
+              f"{result['startup']:>10.2f}{result['seconds']:>10.2f}")
+    for name, result in (('Browser pool', pooled), ('Network capture', captured)):
+        if result['seconds']:
+            print(f"\n{name}: post extraction {before['seconds'] / result['seconds']:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
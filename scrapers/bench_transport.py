@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Transport Benchmark
+Replays the recorded lowheads scrape from a local fixture server and counts
+the TCP handshakes the scraper makes with bare requests.get versus the
+pooled keep-alive session
+"""
+
+import argparse
+import time
+import contextlib
+import io
+
+from fixture_server import FixtureServer, build_lowheads_routes
+from lowheads_scraper import LowheadsCompleteScraper
+
+
+def run_once(server: FixtureServer, brands, pooled: bool, verbose: bool = False):
+    scraper = LowheadsCompleteScraper(base_url=server.base_url, pooled_transport=pooled, use_http_cache=False)
+    server.reset_counters()
+
+    start = time.perf_counter()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output) if not verbose else contextlib.nullcontext():
+        products = 0
+        for brand in brands:
+            products += len(scraper.scrape_brand_products(brand, download_media=False))
+    elapsed = time.perf_counter() - start
+
+    return {
+        'products': products,
+        'requests': server.requests_served,
+        'handshakes': server.connections_accepted,
+        'seconds': elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count handshakes per scrape run before and after connection pooling")
+    parser.add_argument('--data', default='lowheads_complete_data.json', help='Recorded scrape to serve')
+    parser.add_argument('--brands', type=int, default=10, help='Number of brands to replay')
+    parser.add_argument('--verbose', action='store_true', help='Show scraper output')
+    args = parser.parse_args()
+
+    routes, brands = build_lowheads_routes(args.data, max_brands=args.brands)
+
+    with FixtureServer(routes) as server:
+        before = run_once(server, brands, pooled=False, verbose=args.verbose)
+        after = run_once(server, brands, pooled=True, verbose=args.verbose)
+
+    print("=" * 60)
+    print(f"TRANSPORT BENCHMARK ({len(brands)} brands, {after['products']} products)")
+    print("=" * 60)
+    print(f"{'mode':<22}{'requests':>10}{'handshakes':>12}{'seconds':>10}")
+    for name, result in (('bare requests.get', before), ('pooled session', after)):
+        print(f"{name:<22}{result['requests']:>10}{result['handshakes']:>12}{result['seconds']:>10.2f}")
+    if after['handshakes']:
+        print(f"\nHandshakes reduced {before['handshakes'] / after['handshakes']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,10 @@ Debug script to see what text content is available on the product page
 """
 
 import requests
-from bs4 import BeautifulSoup
 import re
 
+from html_parsing import make_soup
+
 def debug_text_extraction():
     """Debug text extraction from product page"""
     url = "https://lowheads.com/products/extreme-clothing-zip-up-hoodie"
@@ -17,7 +18,7 @@ def debug_text_extraction():
     try:
         response = requests.get(url, timeout=10)
         if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text)
             
             print(f"Page title: {soup.title.string if soup.title else 'No title'}")
             
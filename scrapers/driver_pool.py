@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Browser Driver Pool
+A fixed set of warm headless Chrome sessions shared by the Selenium
+scrapers: started in parallel once per run, given the same cookies, and
+told through DevTools not to fetch images, fonts or stylesheets, which the
+scrapers never look at (they read URLs from the DOM)
+"""
+
+import queue
+import logging
+import threading
+import concurrent.futures
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Everything a page pulls in that the scrapers don't read; img/video src
+# attributes stay in the DOM when the fetch itself is blocked
+BLOCKED_RESOURCE_PATTERNS = [
+    '*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.css', '*.mp4',
+]
+
+
+def chrome_options(headless: bool = True, block_resources: bool = True):
+    """Options for undetected Chrome as the Instagram scrapers use it"""
+    import undetected_chromedriver as uc
+
+    options = uc.ChromeOptions()
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    if headless:
+        options.add_argument('--headless=new')
+    if block_resources:
+        # Belt and braces with Network.setBlockedURLs: don't even decode images
+        options.add_argument('--blink-settings=imagesEnabled=false')
+    return options
+
+
+def undetected_chrome(headless: bool = True, block_resources: bool = True):
+    """Start one undetected Chrome session"""
+    import undetected_chromedriver as uc
+
+    driver = uc.Chrome(options=chrome_options(headless, block_resources))
+    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    return driver
+
+
+def block_resources(driver, patterns: Iterable[str] = BLOCKED_RESOURCE_PATTERNS):
+    """Tell a Chromium driver's network stack to refuse URLs matching patterns"""
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(patterns)})
+
+
+class DriverPool:
+    """``size`` browser sessions handed out one caller at a time.
+
+    ``factory`` starts a driver (undetected headless Chrome by default);
+    start() runs it on ``size`` threads at once so a run pays for one
+    browser startup, not ``size``. Each new driver gets resource blocking
+    (unless ``block_resources`` is False) and, if ``warm_url`` is given,
+    loads it once so the first real page doesn't pay for DNS, TLS and the
+    site's cookies. set_cookies() copies a session (e.g. a logged-in one)
+    into every driver. Use driver() as a context manager, or map() to run
+    a function over items with one driver per worker.
+    """
+
+    def __init__(self, size: int = 4, factory: Optional[Callable[[], object]] = None,
+                 block_resources: bool = True, warm_url: Optional[str] = None, logger=None):
+        self.size = size
+        self.factory = factory or undetected_chrome
+        self.block_resources = block_resources
+        self.warm_url = warm_url
+        self.logger = logger or logging.getLogger(__name__)
+        self._drivers: List[object] = []
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._cookies: List[Dict] = []
+
+    def _start_driver(self):
+        driver = self.factory()
+        try:
+            if self.block_resources:
+                block_resources(driver)
+            if self.warm_url:
+                driver.get(self.warm_url)
+                for cookie in self._cookies:
+                    driver.add_cookie(cookie)
+        except Exception:
+            driver.quit()
+            raise
+        return driver
+
+    def start(self):
+        """Start the missing drivers in parallel; drivers that fail to start are logged and left out"""
+        with self._lock:
+            missing = self.size - len(self._drivers)
+        if missing <= 0:
+            return self
+        with concurrent.futures.ThreadPoolExecutor(max_workers=missing) as executor:
+            futures = [executor.submit(self._start_driver) for _ in range(missing)]
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    driver = future.result()
+                except Exception as e:
+                    self.logger.error(f"Failed to start browser: {e}")
+                    continue
+                with self._lock:
+                    self._drivers.append(driver)
+                self._idle.put(driver)
+        if not self._drivers:
+            raise RuntimeError("No browser in the pool could be started")
+        self.logger.info(f"Browser pool ready: {len(self._drivers)} drivers")
+        return self
+
+    def set_cookies(self, cookies: List[Dict], url: str):
+        """Give every driver (and any started later) these cookies for url's site"""
+        self._cookies = [{k: v for k, v in cookie.items() if k != 'sameSite'} for cookie in cookies]
+        self.warm_url = self.warm_url or url
+        for driver in self._checkout_all():
+            try:
+                driver.get(url)
+                for cookie in self._cookies:
+                    driver.add_cookie(cookie)
+            finally:
+                self._idle.put(driver)
+
+    def _checkout_all(self) -> List[object]:
+        with self._lock:
+            count = len(self._drivers)
+        return [self._idle.get() for _ in range(count)]
+
+    @contextmanager
+    def driver(self):
+        """Borrow a driver, starting the pool first if needed"""
+        if not self._drivers:
+            self.start()
+        driver = self._idle.get()
+        try:
+            yield driver
+        finally:
+            self._idle.put(driver)
+
+    def map(self, func: Callable, items: Iterable) -> List:
+        """func(driver, item) for every item, spread over the pool; results keep the items' order"""
+        items = list(items)
+        if not self._drivers:
+            self.start()
+
+        def run(item):
+            with self.driver() as driver:
+                return func(driver, item)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(self._drivers)) as executor:
+            return list(executor.map(run, items))
+
+    def close(self):
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+        self._idle = queue.Queue()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                self.logger.error(f"Error closing browser: {e}")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
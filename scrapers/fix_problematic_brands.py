@@ -4,20 +4,19 @@ Fix Problematic Brands Script
 Re-scrapes brands that didn't work and organizes content properly
 """
 
-import requests
 import json
 import os
-import time
-import re
 from urllib.parse import urlparse
-import urllib.request
 import logging
 import shutil
 
+from http_cache import download_file
+from instagram_client import InstagramClient
+from instagram_engine import instagram_sessions, run_brands
+
 class FixProblematicBrands:
     def __init__(self, output_dir="downloads/instagram_data"):
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.session, self.media_session = instagram_sessions({
             'User-Agent': 'Instagram 219.0.0.12.117 Android',
             'Accept': '*/*',
             'Accept-Language': 'en-US',
@@ -26,6 +25,7 @@ class FixProblematicBrands:
         })
         self.output_dir = output_dir
         self.setup_logging()
+        self.client = InstagramClient(self.session, self.logger)
         
     def setup_logging(self):
         logging.basicConfig(level=logging.INFO)
@@ -37,92 +37,15 @@ class FixProblematicBrands:
         return username if username and not username.startswith('p/') else None
     
     def get_user_info(self, username):
-        try:
-            url = f"https://i.instagram.com/api/v1/users/web_profile_info/?username={username}"
-            response = self.session.get(url, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                user = data.get('data', {}).get('user', {})
-                
-                return {
-                    'username': username,
-                    'full_name': user.get('full_name', ''),
-                    'biography': user.get('biography', ''),
-                    'profile_pic_url': user.get('profile_pic_url', ''),
-                    'profile_pic_url_hd': user.get('profile_pic_url_hd', ''),
-                    'followers': user.get('edge_followed_by', {}).get('count', 0),
-                    'posts_count': user.get('edge_owner_to_timeline_media', {}).get('count', 0),
-                    'is_private': user.get('is_private', False)
-                }
-            
-            return None
-        except Exception as e:
-            self.logger.error(f"Error getting user info for {username}: {e}")
-            return None
+        return self.client.get_user_info(username)
     
     def get_user_posts(self, username, max_posts=6):
-        try:
-            url = f"https://i.instagram.com/api/v1/feed/user/{username}/username/?count={max_posts}"
-            response = self.session.get(url, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                posts = data.get('items', [])
-                
-                posts_data = []
-                for post in posts:
-                    post_data = {
-                        'id': post.get('id', ''),
-                        'caption': post.get('caption', {}).get('text', ''),
-                        'media_urls': [],
-                        'likes': post.get('like_count', 0),
-                        'comments': post.get('comment_count', 0)
-                    }
-                    
-                    # Get media URLs
-                    if post.get('media_type') == 2:  # Video
-                        if post.get('video_versions'):
-                            post_data['media_urls'].append({
-                                'type': 'video',
-                                'url': post['video_versions'][0]['url']
-                            })
-                    else:  # Image
-                        if post.get('image_versions2', {}).get('candidates'):
-                            post_data['media_urls'].append({
-                                'type': 'image',
-                                'url': post['image_versions2']['candidates'][0]['url']
-                            })
-                    
-                    # Handle carousel posts
-                    if post.get('carousel_media'):
-                        for carousel_item in post['carousel_media']:
-                            if carousel_item.get('media_type') == 2:  # Video
-                                if carousel_item.get('video_versions'):
-                                    post_data['media_urls'].append({
-                                        'type': 'video',
-                                        'url': carousel_item['video_versions'][0]['url']
-                                    })
-                            else:  # Image
-                                if carousel_item.get('image_versions2', {}).get('candidates'):
-                                    post_data['media_urls'].append({
-                                        'type': 'image',
-                                        'url': carousel_item['image_versions2']['candidates'][0]['url']
-                                    })
-                    
-                    posts_data.append(post_data)
-                
-                return posts_data
-            
-            return []
-        except Exception as e:
-            self.logger.error(f"Error getting posts for {username}: {e}")
-            return []
+        return self.client.get_user_posts(username, max_posts=max_posts)
     
     def download_media(self, url, filepath):
         try:
             os.makedirs(os.path.dirname(filepath), exist_ok=True)
-            urllib.request.urlretrieve(url, filepath)
+            download_file(self.media_session, url, filepath)
             self.logger.info(f"Downloaded: {filepath}")
             return True
         except Exception as e:
@@ -240,8 +163,6 @@ class FixProblematicBrands:
                     filepath = os.path.join(post_folder, filename)
                     if self.download_media(media['url'], filepath):
                         downloaded_count += 1
-                
-                time.sleep(1)
             
             # Organize content
             self.organize_content(brand_folder)
@@ -274,11 +195,7 @@ class FixProblematicBrands:
         
         self.logger.info("Starting to fix problematic brands...")
         
-        successful = 0
-        for brand_name, instagram_url in problematic_brands.items():
-            if self.scrape_brand(brand_name, instagram_url):
-                successful += 1
-            time.sleep(3)
+        successful = run_brands(problematic_brands, self.scrape_brand, logger=self.logger)
         
         self.logger.info(f"Completed! Successfully fixed {successful} out of {len(problematic_brands)} brands")
 
@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+Local Fixture Server
+Serves recorded pages on localhost so scrapers can be benchmarked without
+touching the real sites. Counts accepted TCP connections, which is the
+number of handshakes a client had to make. Every 200 carries an ETag and
+a matching If-None-Match gets a 304.
+"""
+
+import re
+import json
+import socket
+import hashlib
+import threading
+import html as html_lib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, urlparse
+from typing import Callable, Dict, List, Optional, Tuple
+
+# (status, content type, body)
+FixtureResponse = Tuple[int, str, bytes]
+
+
+class _CountingHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.connections_accepted = 0
+        self.requests_served = 0
+        self.not_modified_served = 0
+        self.counter_lock = threading.Lock()
+
+    def get_request(self):
+        request = super().get_request()
+        with self.counter_lock:
+            self.connections_accepted += 1
+        return request
+
+
+class FixtureServer:
+    """Threaded HTTP/1.1 server that answers from a route table.
+
+    routes maps a request path (including the query string) to a response;
+    a path without its query string is tried second. handler, if given, is
+    called for anything not in routes and may return None for a 404.
+    """
+
+    def __init__(self, routes: Optional[Dict[str, FixtureResponse]] = None,
+                 handler: Optional[Callable[[str], Optional[FixtureResponse]]] = None,
+                 host: str = '127.0.0.1', port: int = 0):
+        self.routes = routes or {}
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    def _make_handler(self):
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                # Headers and body go out as separate writes; without this, Nagle plus
+                # delayed ACKs add ~40 ms to every request on a kept-alive connection
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def log_message(self, format, *args):
+                pass
+
+            def _respond(self, send_body: bool):
+                with self.server.counter_lock:
+                    self.server.requests_served += 1
+                response = fixture.resolve(self.path)
+                status, content_type, body = response or (404, 'text/plain', b'Not Found')
+                etag = f'"{hashlib.md5(body).hexdigest()}"'
+                if status == 200 and self.headers.get('If-None-Match') == etag:
+                    with self.server.counter_lock:
+                        self.server.not_modified_served += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                if status == 200:
+                    self.send_header('ETag', etag)
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                self._respond(send_body=True)
+
+            def do_HEAD(self):
+                self._respond(send_body=False)
+
+        return Handler
+
+    def resolve(self, path: str) -> Optional[FixtureResponse]:
+        if path in self.routes:
+            return self.routes[path]
+        bare_path = urlparse(path).path
+        if bare_path in self.routes:
+            return self.routes[bare_path]
+        if self.handler:
+            return self.handler(path)
+        return None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self._server.server_address[1]}"
+
+    @property
+    def connections_accepted(self) -> int:
+        return self._server.connections_accepted
+
+    @property
+    def requests_served(self) -> int:
+        return self._server.requests_served
+
+    @property
+    def not_modified_served(self) -> int:
+        return self._server.not_modified_served
+
+    def reset_counters(self):
+        with self._server.counter_lock:
+            self._server.connections_accepted = 0
+            self._server.requests_served = 0
+            self._server.not_modified_served = 0
+
+    def start(self):
+        self._server = _CountingHTTPServer((self.host, self.port), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def render_lowheads_listing_page(brand_name: str, products: List[Dict]) -> str:
+    """Render a vendor search page in the shape of lowheads.com's product grid"""
+    items = []
+    for product in products:
+        path = urlparse(product['product_url']).path
+        items.append(
+            '<div class="grid__item type-product-grid-item">'
+            f'<a href="{path}">'
+            f'<img class="responsive-image" src="{html_lib.escape(product.get("listing_image", ""))}">'
+            f'<div class="product-grid-item__title"><span>{html_lib.escape(product.get("name", ""))}</span></div>'
+            f'<div class="product-grid-item__price"><span>${html_lib.escape(str(product.get("price", "")))}.00</span></div>'
+            f'<span>{html_lib.escape(brand_name)}</span>'
+            '</a></div>'
+        )
+    return (
+        '<!doctype html><html><head><title>Lowheads</title></head><body>'
+        '<header><img src="//lowheads.com/cdn/shop/files/logo.png" alt="logo"><nav><a href="/">Home</a></nav></header>'
+        f'<main><div class="grid">{"".join(items)}</div></main>'
+        '</body></html>'
+    )
+
+
+def render_lowheads_product_page(product: Dict) -> str:
+    """Render a product page with the gallery, price, description and brand sections the scraper reads"""
+    gallery = ''.join(
+        f'<div class="product__media" data-image="{html_lib.escape(url)}">'
+        f'<img class="product-single__image" src="{html_lib.escape(url)}?v=1700000000" data-src="{html_lib.escape(url)}">'
+        '</div>'
+        for url in product.get('images', [])
+    )
+    videos = ''.join(
+        f'<video src="{html_lib.escape(url)}"></video>' for url in product.get('videos', [])
+    )
+    variants = ''.join(
+        f'<option>{html_lib.escape(v)}</option>' for v in (product.get('variants') or ['S', 'M', 'L'])
+    )
+    metadata = product.get('brand_metadata', {})
+    brand_info = ''
+    if metadata:
+        brand_info = (
+            '<div class="brand-info">'
+            f'<p>This Brand Is From - {html_lib.escape(metadata.get("location", ""))}</p>'
+            f'<p>This Brand Ships Within - {html_lib.escape(metadata.get("shipping_time", ""))}</p>'
+            f'<p>About This Brand - {html_lib.escape(metadata.get("website", ""))}</p>'
+            '</div>'
+        )
+    filler = ''.join(
+        f'<li class="footer-link"><a href="/pages/info-{i}">Info {i}</a></li>' for i in range(60)
+    )
+    return (
+        '<!doctype html><html><head><title>Lowheads</title>'
+        '<style>.hero{background:#000}</style></head><body>'
+        '<header><img src="//lowheads.com/cdn/shop/files/logo.png" alt="logo">'
+        '<img src="//lowheads.com/cdn/shop/files/cart-icon.svg"><a href="/cart">Cart (0)</a></header>'
+        '<main>'
+        f'<div class="product__gallery">{gallery}{videos}</div>'
+        f'<h1 class="product-single__title">{html_lib.escape(product.get("detailed_name") or product.get("name", ""))}</h1>'
+        f'<span class="product__price">${html_lib.escape(str(product.get("price", "")))}.00</span>'
+        f'<select name="id" class="product-single__variants variant-select">{variants}</select>'
+        f'<div class="product-single__description">{html_lib.escape(product.get("description", "Heavyweight cotton. Ships in 5-7 days"))}</div>'
+        f'{brand_info}'
+        '</main>'
+        f'<footer><ul>{filler}</ul></footer>'
+        '</body></html>'
+    )
+
+
+def build_lowheads_routes(data_file: str = 'lowheads_complete_data.json',
+                          max_brands: Optional[int] = None) -> Tuple[Dict[str, FixtureResponse], List[str]]:
+    """Build vendor search and product page routes from a recorded lowheads scrape.
+
+    Returns the route table and the brand names that have products in it.
+    """
+    with open(data_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    routes: Dict[str, FixtureResponse] = {}
+    brands: List[str] = []
+    for brand_name, brand_data in data['brands'].items():
+        products = [p for p in brand_data.get('products', []) if p.get('product_url')]
+        if not products:
+            continue
+        if max_brands is not None and len(brands) >= max_brands:
+            break
+        brands.append(brand_name)
+        listing = render_lowheads_listing_page(brand_name, products).encode('utf-8')
+        routes[f"/collections/vendors?q={quote(brand_name)}"] = (200, 'text/html; charset=utf-8', listing)
+        for product in products:
+            page = render_lowheads_product_page(product).encode('utf-8')
+            routes[urlparse(product['product_url']).path] = (200, 'text/html; charset=utf-8', page)
+
+    return routes, brands
+
+
+def feed_product_from_record(product: Dict, handle: str) -> Dict:
+    """Build a products.json entry from a recorded lowheads product"""
+    price = re.sub(r'[^\d.]', '', str(product.get('price', ''))) or '0'
+    if '.' not in price:
+        price += '.00'
+    variants = product.get('variants') or ['Default Title']
+    return {
+        'id': abs(hash(handle)) % 10 ** 12,
+        'title': product.get('detailed_name') or product.get('name', ''),
+        'handle': handle,
+        'vendor': product.get('brand', ''),
+        'body_html': html_lib.escape(product.get('description', '')),
+        'variants': [{'title': v, 'price': price, 'available': True} for v in variants],
+        'images': [{'src': url} for url in product.get('images', [])],
+    }
+
+
+def build_lowheads_feed_routes(data_file: str = 'lowheads_complete_data.json',
+                               max_brands: Optional[int] = None,
+                               page_size: int = 250) -> Tuple[Dict[str, FixtureResponse], List[str]]:
+    """Build Shopify /products.json pages and /products/<handle>.js routes from a recorded lowheads scrape"""
+    with open(data_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    routes: Dict[str, FixtureResponse] = {}
+    brands: List[str] = []
+    feed: List[Dict] = []
+    for brand_name, brand_data in data['brands'].items():
+        products = [p for p in brand_data.get('products', []) if p.get('product_url')]
+        if not products:
+            continue
+        if max_brands is not None and len(brands) >= max_brands:
+            break
+        brands.append(brand_name)
+        for product in products:
+            handle = urlparse(product['product_url']).path.rstrip('/').split('/')[-1]
+            feed_product = feed_product_from_record(dict(product, brand=brand_name), handle)
+            feed.append(feed_product)
+            js_product = dict(feed_product, description=feed_product['body_html'],
+                              images=[image['src'] for image in feed_product['images']])
+            routes[f"/products/{handle}.js"] = (200, 'application/json', json.dumps(js_product).encode('utf-8'))
+
+    for page in range(len(feed) // page_size + 1):
+        body = json.dumps({'products': feed[page * page_size:(page + 1) * page_size]}).encode('utf-8')
+        routes[f"/products.json?limit={page_size}&page={page + 1}"] = (200, 'application/json', body)
+
+    return routes, brands
+
+
+FIXTURE_POST_TIME = 1700000000
+
+
+def fixture_instagram_posts(posts: int, images_per_post: int = 3) -> List[Dict]:
+    """Fixture posts newest first, an hour apart, as the shortcode, time and image paths both APIs are built from"""
+    return [
+        {
+            'code': f"C{i:04d}fixture",
+            'taken_at': FIXTURE_POST_TIME - i * 3600,
+            'images': [f"/media/instagram_C{i:04d}fixture_{n}.jpg" for n in range(images_per_post)],
+        }
+        for i in range(posts)
+    ]
+
+
+def feed_item_from_post(post: Dict) -> Dict:
+    """A post in the mobile feed API's item shape"""
+    candidates = [{'image_versions2': {'candidates': [{'url': url, 'width': 1080}]}} for url in post['images']]
+    item = {
+        'id': f"{post['taken_at']}_1",
+        'code': post['code'],
+        'taken_at': post['taken_at'],
+        'media_type': 8 if len(candidates) > 1 else 1,
+        'caption': {'text': f"Caption for {post['code']}"},
+        'like_count': 321,
+        'comment_count': 12,
+    }
+    # Carousels carry their images only in carousel_media
+    if len(candidates) > 1:
+        item['carousel_media'] = candidates
+    else:
+        item.update(candidates[0])
+    return item
+
+
+def graphql_node_from_post(post: Dict) -> Dict:
+    """A post in the web GraphQL timeline's node shape"""
+    node = {
+        'id': f"{post['taken_at']}",
+        'shortcode': post['code'],
+        'taken_at_timestamp': post['taken_at'],
+        'is_video': False,
+        'display_url': post['images'][0],
+        'edge_liked_by': {'count': 321},
+        'edge_media_to_comment': {'count': 12},
+        'edge_media_to_caption': {'edges': [{'node': {'text': f"Caption for {post['code']}"}}]},
+    }
+    if len(post['images']) > 1:
+        # The sidecar's first child is the cover image again
+        node['edge_sidecar_to_children'] = {'edges': [
+            {'node': {'is_video': False, 'display_url': url}} for url in post['images'][1:]
+        ]}
+    return node
+
+
+def render_instagram_profile_page(username: str, shortcodes: List[str], page_size: int = 12) -> str:
+    """Render a profile page with the profile picture and post grid the Selenium scraper reads.
+
+    Like the real page, the script loads the profile from web_profile_info
+    and the next feed page each time the grid is scrolled to the bottom,
+    adding the new posts to the grid.
+    """
+    grid = ''.join(
+        f'<a href="/p/{code}/"><img src="/media/{code}_thumb.jpg" alt="post"></a>' for code in shortcodes
+    )
+    user = json.dumps(username)
+    script = (
+        'let cursor = null, loading = false;'
+        f'fetch("/api/v1/users/web_profile_info/?username=" + {user}).then(r => r.json()).then(d => {{'
+        ' const media = d.data.user.edge_owner_to_timeline_media;'
+        ' cursor = media.page_info.has_next_page ? media.page_info.end_cursor : null; });'
+        'window.addEventListener("scroll", () => {'
+        ' if (!cursor || loading) return; loading = true;'
+        f' fetch("/api/v1/feed/user/" + {user} + "/username/?count={page_size}&max_id=" + cursor)'
+        ' .then(r => r.json()).then(d => {'
+        '  const grid = document.querySelector(".grid");'
+        '  for (const item of d.items) {'
+        '   const link = document.createElement("a"); link.href = "/p/" + item.code + "/";'
+        '   link.innerHTML = \'<img alt="post" src="/media/\' + item.code + \'_thumb.jpg">\';'
+        '   grid.appendChild(link); }'
+        '  cursor = d.more_available ? d.next_max_id : null; loading = false; }); });'
+    )
+    return (
+        f'<!doctype html><html><head><title>@{html_lib.escape(username)}</title>'
+        '<link rel="stylesheet" href="/static/app.css">'
+        '<style>.grid a { display: block; height: 400px; }</style></head><body>'
+        f'<header><img alt="profile picture" src="/media/{html_lib.escape(username)}_profile.jpg">'
+        f'<div data-testid="user-bio">Fixture profile for {html_lib.escape(username)}</div>'
+        f'<a href="/{html_lib.escape(username)}/followers/"><span>1,234</span> followers</a></header>'
+        f'<main><div class="grid">{grid}</div></main>'
+        f'<script>{script}</script>'
+        '</body></html>'
+    )
+
+
+def render_instagram_post_page(shortcode: str, images: int = 3) -> str:
+    """Render a post page with its carousel images, caption and likes, plus the page assets a browser fetches"""
+    media = ''.join(
+        f'<img alt="Photo by" src="/media/instagram_{shortcode}_{i}.jpg">' for i in range(images)
+    )
+    return (
+        f'<!doctype html><html><head><title>{shortcode}</title>'
+        '<link rel="stylesheet" href="/static/app.css">'
+        '<link rel="preload" as="font" href="/static/sans.woff2" crossorigin></head><body>'
+        f'<article>{media}'
+        f'<div data-testid="post-caption">Caption for {shortcode}</div>'
+        '<section><span>321 likes</span></section></article>'
+        '</body></html>'
+    )
+
+
+def build_instagram_routes(username: str = 'fixturebrand', posts: int = 24, images_per_post: int = 3,
+                           page_size: int = 12) -> Tuple[Dict[str, FixtureResponse], List[str]]:
+    """Build the profile page, post page and API routes for one fixture account.
+
+    The profile page carries the first page_size posts and its script pages
+    through the rest with the feed API, as Instagram's does. Returns the
+    route table and the post shortcodes, newest first. Images, stylesheets
+    and fonts (/media/..., /static/...) are not in the table; serve them
+    from a handler so their cost can be set.
+    """
+    fixture_posts = fixture_instagram_posts(posts, images_per_post)
+    shortcodes = [post['code'] for post in fixture_posts]
+    first_page = fixture_posts[:page_size]
+
+    def json_response(data) -> FixtureResponse:
+        return (200, 'application/json; charset=utf-8', json.dumps(data).encode('utf-8'))
+
+    profile = {'data': {'user': {
+        'id': '1000001',
+        'username': username,
+        'full_name': f"{username} (fixture)",
+        'biography': f"Fixture profile for {username}",
+        'profile_pic_url': f"/media/{username}_profile.jpg",
+        'profile_pic_url_hd': f"/media/{username}_profile_hd.jpg",
+        'edge_followed_by': {'count': 1234},
+        'is_private': False,
+        'edge_owner_to_timeline_media': {
+            'count': posts,
+            'edges': [{'node': graphql_node_from_post(post)} for post in first_page],
+            'page_info': {'has_next_page': posts > page_size,
+                          'end_cursor': first_page[-1]['code'] if first_page else None},
+        },
+    }}}
+
+    routes: Dict[str, FixtureResponse] = {
+        f"/{username}/": (200, 'text/html; charset=utf-8',
+                          render_instagram_profile_page(username, shortcodes[:page_size], page_size).encode('utf-8')),
+        f"/api/v1/users/web_profile_info/?username={username}": json_response(profile),
+    }
+    for start in range(page_size, posts, page_size):
+        page = fixture_posts[start:start + page_size]
+        more = start + page_size < posts
+        routes[f"/api/v1/feed/user/{username}/username/?count={page_size}&max_id={fixture_posts[start - 1]['code']}"] = \
+            json_response({
+                'items': [feed_item_from_post(post) for post in page],
+                'more_available': more,
+                'next_max_id': page[-1]['code'] if more else None,
+            })
+    for post in fixture_posts:
+        routes[f"/p/{post['code']}/"] = (200, 'text/html; charset=utf-8',
+                                         render_instagram_post_page(post['code'], images_per_post).encode('utf-8'))
+    return routes, shortcodes
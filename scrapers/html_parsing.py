@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+HTML Parser Backends
+One place to choose how scraped pages are parsed. BeautifulSoup with
+html.parser (pure Python) is the default, as it always was. BeautifulSoup
+with lxml (C) and selectolax (lexbor, C, through a shim that supports the
+find/find_all/select calls the scrapers make) are opt-in: they build
+slightly different trees for malformed markup.
+
+Set SCRAPER_HTML_PARSER to lxml, html.parser or selectolax to choose.
+"""
+
+import os
+import re
+from importlib.util import find_spec
+from typing import Dict, Iterator, List, Optional
+
+from bs4 import BeautifulSoup
+
+HAVE_LXML = find_spec('lxml') is not None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    HAVE_SELECTOLAX = True
+except ImportError:
+    HAVE_SELECTOLAX = False
+
+BACKENDS = ('lxml', 'html.parser', 'selectolax')
+
+
+def available_backends() -> List[str]:
+    backends = []
+    if HAVE_LXML:
+        backends.append('lxml')
+    backends.append('html.parser')
+    if HAVE_SELECTOLAX:
+        backends.append('selectolax')
+    return backends
+
+
+def default_backend() -> str:
+    backend = os.environ.get('SCRAPER_HTML_PARSER')
+    if backend:
+        if backend not in available_backends():
+            raise ValueError(f"HTML parser backend {backend!r} is not available (have {available_backends()})")
+        return backend
+    return 'html.parser'
+
+
+def make_soup(markup, backend: Optional[str] = None):
+    """Parse HTML with the chosen (or default) backend.
+
+    lxml and html.parser return a real BeautifulSoup; selectolax returns a
+    SelectolaxSoup with the same interface for the calls the scrapers use.
+    """
+    backend = backend or default_backend()
+    if backend == 'selectolax':
+        return SelectolaxSoup(markup)
+    if backend not in ('lxml', 'html.parser'):
+        raise ValueError(f"Unknown HTML parser backend: {backend!r}")
+    return BeautifulSoup(markup, backend)
+
+
+# --- selectolax shim -------------------------------------------------------
+
+# Like BeautifulSoup, text inside these tags isn't page text
+_NON_TEXT_PARENTS = {'script', 'style', 'template'}
+# Attributes BeautifulSoup splits on whitespace into a list
+_MULTI_VALUED_ATTRIBUTES = {'class', 'rel', 'rev', 'accept-charset', 'headers', 'accesskey', 'dropzone'}
+
+
+class SelectolaxText(str):
+    """A text node; the counterpart of NavigableString"""
+
+
+class SelectolaxScriptText(SelectolaxText):
+    """Text inside script/style/template, left out of get_text() like BeautifulSoup's Script strings"""
+
+
+class SelectolaxComment(SelectolaxText):
+    """A comment, left out of get_text()"""
+
+
+def _wrap(node):
+    tag = node.tag
+    if tag == '-text':
+        parent = node.parent
+        text_type = SelectolaxScriptText if parent is not None and parent.tag in _NON_TEXT_PARENTS else SelectolaxText
+        return text_type(node.text_content or '')
+    if tag == '-comment':
+        return SelectolaxComment(node.comment_content or '')
+    return SelectolaxTag(node)
+
+
+def _value_matches(value, expected) -> bool:
+    """BeautifulSoup's matching of one attribute value (or tag name) against a filter"""
+    if expected is True:
+        return value is not None
+    if expected is None:
+        return True
+    if isinstance(value, list):
+        return (any(_value_matches(v, expected) for v in value)
+                or (len(value) > 1 and _value_matches(' '.join(value), expected)))
+    if callable(expected) and not isinstance(expected, (str, re.Pattern)):
+        return bool(expected(value))
+    if value is None:
+        return False
+    if isinstance(expected, re.Pattern):
+        return expected.search(value) is not None
+    if isinstance(expected, (list, tuple, set)):
+        return any(_value_matches(value, e) for e in expected)
+    return value == expected
+
+
+class SelectolaxTag:
+    """Wraps a selectolax node with the BeautifulSoup Tag methods the scrapers use"""
+
+    __slots__ = ('_node', 'name', '_attrs')
+
+    def __init__(self, node):
+        self._node = node
+        self.name = node.tag
+        self._attrs = None
+
+    @property
+    def attrs(self) -> Dict:
+        if self._attrs is None:
+            attrs = {}
+            for key, value in self._node.attributes.items():
+                value = value if value is not None else ''
+                attrs[key] = value.split() if key in _MULTI_VALUED_ATTRIBUTES else value
+            self._attrs = attrs
+        return self._attrs
+
+    def get(self, key: str, default=None):
+        return self.attrs.get(key, default)
+
+    def has_attr(self, key: str) -> bool:
+        return key in self.attrs
+
+    def __getitem__(self, key: str):
+        return self.attrs[key]
+
+    def __bool__(self):
+        return True
+
+    def __eq__(self, other):
+        return isinstance(other, SelectolaxTag) and self._node.mem_id == other._node.mem_id
+
+    def __hash__(self):
+        return self._node.mem_id
+
+    def __repr__(self):
+        return self._node.html or ''
+
+    __str__ = __repr__
+
+    @property
+    def parent(self) -> Optional['SelectolaxTag']:
+        parent = self._node.parent
+        return SelectolaxTag(parent) if parent is not None else None
+
+    @property
+    def children(self) -> Iterator:
+        child = self._node.child
+        while child is not None:
+            yield _wrap(child)
+            child = child.next
+
+    @property
+    def contents(self) -> List:
+        return list(self.children)
+
+    @property
+    def descendants(self) -> Iterator:
+        nodes = self._node.traverse(include_text=True)
+        next(nodes, None)  # traverse() starts with the node itself
+        for node in nodes:
+            yield _wrap(node)
+
+    def _strings(self, strip: bool = False) -> Iterator[str]:
+        for node in self._node.traverse(include_text=True):
+            if node.tag != '-text':
+                continue
+            parent = node.parent
+            if parent is not None and parent.tag in _NON_TEXT_PARENTS:
+                continue
+            text = node.text_content or ''
+            if strip:
+                text = text.strip()
+                if not text:
+                    continue
+            yield text
+
+    def get_text(self, separator: str = '', strip: bool = False) -> str:
+        return separator.join(self._strings(strip))
+
+    @property
+    def text(self) -> str:
+        return self.get_text()
+
+    @property
+    def stripped_strings(self) -> Iterator[str]:
+        return self._strings(strip=True)
+
+    @property
+    def string(self) -> Optional[str]:
+        """The tag's only string, following a single child tag down, else None"""
+        children = self.contents
+        if len(children) != 1:
+            return None
+        child = children[0]
+        if isinstance(child, SelectolaxTag):
+            return child.string
+        return None if isinstance(child, SelectolaxComment) else child
+
+    def _matches(self, name, attrs: Dict, string) -> bool:
+        if name is not None and not _value_matches(self.name, name):
+            return False
+        for key, expected in attrs.items():
+            if not _value_matches(self.attrs.get(key), expected):
+                return False
+        if string is not None and not _value_matches(self.string, string):
+            return False
+        return True
+
+    def find_all(self, name=None, attrs=None, recursive: bool = True, string=None,
+                 limit: Optional[int] = None, class_=None, text=None, **kwargs) -> List['SelectolaxTag']:
+        if string is None:
+            string = text
+        if attrs is not None and not isinstance(attrs, dict):
+            # A bare non-dict attrs filter means class, as in BeautifulSoup
+            attrs = {'class': attrs}
+        filters = dict(attrs or {})
+        if class_ is not None:
+            filters['class'] = class_
+        filters.update(kwargs)
+
+        if recursive:
+            candidates = (node for node in self.descendants if isinstance(node, SelectolaxTag))
+        else:
+            candidates = (node for node in self.children if isinstance(node, SelectolaxTag))
+
+        found = []
+        for tag in candidates:
+            if tag._matches(name, filters, string):
+                found.append(tag)
+                if limit and len(found) >= limit:
+                    break
+        return found
+
+    findAll = find_all
+
+    def find(self, name=None, attrs=None, recursive: bool = True, string=None, **kwargs) -> Optional['SelectolaxTag']:
+        found = self.find_all(name, attrs, recursive, string, limit=1, **kwargs)
+        return found[0] if found else None
+
+    def select(self, selector: str) -> List['SelectolaxTag']:
+        return [SelectolaxTag(node) for node in self._node.css(selector)]
+
+    def select_one(self, selector: str) -> Optional['SelectolaxTag']:
+        node = self._node.css_first(selector)
+        return SelectolaxTag(node) if node is not None else None
+
+    def __getattr__(self, name: str):
+        # soup.title, soup.body, ... like BeautifulSoup
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self.find(name)
+
+
+class SelectolaxSoup(SelectolaxTag):
+    """Document root returned by make_soup(..., backend='selectolax')"""
+
+    __slots__ = ('parser',)
+
+    def __init__(self, markup):
+        if isinstance(markup, bytes):
+            markup = markup.decode('utf-8', errors='replace')
+        self.parser = LexborHTMLParser(markup)
+        super().__init__(self.parser.root)
+        self.name = '[document]'
+
+    @property
+    def descendants(self) -> Iterator:
+        # The root is the <html> element, which BeautifulSoup lists as a descendant of the document
+        yield SelectolaxTag(self._node)
+        yield from super().descendants
+
+    @property
+    def parent(self):
+        return None
+
+
+ELEMENT_TYPES = (SelectolaxTag,)
+TEXT_TYPES = (SelectolaxText,)
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+On-Disk HTTP Cache
+Keeps response bodies with their ETag/Last-Modified validators so re-scrapes
+send conditional requests and mostly get 304s, and remembers parse results
+per body so unchanged pages don't have to be parsed again
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import inspect
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+DEFAULT_CACHE_DIR = '.http_cache'
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control')
+
+
+class HTTPCache:
+    """Response bodies on disk, indexed in SQLite by URL.
+
+    Entries are dropped ``ttl`` seconds after their body was stored, however
+    often a 304 has confirmed it since, and once the bodies take more than
+    ``max_bytes`` the least recently used entries are evicted. Safe to
+    share between threads.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl: float = 7 * 24 * 3600,
+                 max_bytes: int = 2 * 1024 ** 3):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+        os.makedirs(os.path.join(cache_dir, 'bodies'), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(cache_dir, 'index.sqlite3'), check_same_thread=False)
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                headers TEXT,
+                content_hash TEXT,
+                size INTEGER,
+                validated_at REAL,
+                accessed_at REAL,
+                stored_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+            CREATE TABLE IF NOT EXISTS parsed (
+                namespace TEXT,
+                url TEXT,
+                version TEXT,
+                data TEXT,
+                PRIMARY KEY (namespace, url)
+            );
+        ''')
+        columns = [row[1] for row in self._db.execute('PRAGMA table_info(entries)')]
+        if 'stored_at' not in columns:
+            # Caches written before stored_at existed start their TTL from their last validation
+            self._db.execute('ALTER TABLE entries ADD COLUMN stored_at REAL')
+            self._db.execute('UPDATE entries SET stored_at = validated_at')
+        self._db.commit()
+        self.total_bytes = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def _body_path(self, url: str) -> str:
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, 'bodies', key[:2], key)
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for url, or None if there isn't a live one"""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT etag, last_modified, headers, content_hash, size, validated_at, stored_at '
+                'FROM entries WHERE url = ?',
+                (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            if time.time() - row[6] > self.ttl or not os.path.exists(self._body_path(url)):
+                self._delete(url)
+                self._db.commit()
+                return None
+            self._db.execute('UPDATE entries SET accessed_at = ? WHERE url = ?', (time.time(), url))
+            self._db.commit()
+
+        return {
+            'url': url,
+            'etag': row[0],
+            'last_modified': row[1],
+            'headers': json.loads(row[2]),
+            'content_hash': row[3],
+            'size': row[4],
+            'validated_at': row[5],
+            'path': self._body_path(url),
+        }
+
+    def touch(self, url: str):
+        """Mark an entry as just revalidated by a 304; its TTL still runs from when it was stored"""
+        now = time.time()
+        with self._lock:
+            self._db.execute('UPDATE entries SET validated_at = ?, accessed_at = ? WHERE url = ?', (now, now, url))
+            self._db.commit()
+
+    def new_temp_file(self):
+        """Open a temporary file in the cache directory for a body being streamed in"""
+        return tempfile.NamedTemporaryFile(dir=self.cache_dir, prefix='body-', delete=False)
+
+    def store_file(self, url: str, temp_path: str, headers, content_hash: str):
+        """Move a fully downloaded body into the cache"""
+        path = self._body_path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(temp_path, path)
+        size = os.path.getsize(path)
+        kept_headers = {name: headers[name] for name in STORED_HEADERS if name in headers}
+        now = time.time()
+
+        with self._lock:
+            old = self._db.execute('SELECT size, content_hash FROM entries WHERE url = ?', (url,)).fetchone()
+            if old:
+                self.total_bytes -= old[0]
+                if old[1] != content_hash:
+                    self._db.execute('DELETE FROM parsed WHERE url = ?', (url,))
+            self._db.execute(
+                'INSERT OR REPLACE INTO entries '
+                '(url, etag, last_modified, headers, content_hash, size, validated_at, accessed_at, stored_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (url, headers.get('ETag'), headers.get('Last-Modified'), json.dumps(kept_headers),
+                 content_hash, size, now, now, now)
+            )
+            self.total_bytes += size
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+            self._db.commit()
+
+    def store(self, url: str, body: bytes, headers) -> str:
+        """Cache a body that is already in memory and return its content hash"""
+        content_hash = hashlib.sha256(body).hexdigest()
+        with self.new_temp_file() as f:
+            f.write(body)
+        self.store_file(url, f.name, headers, content_hash)
+        return content_hash
+
+    def _delete(self, url: str):
+        row = self._db.execute('SELECT size FROM entries WHERE url = ?', (url,)).fetchone()
+        if row:
+            self.total_bytes -= row[0]
+        self._db.execute('DELETE FROM entries WHERE url = ?', (url,))
+        self._db.execute('DELETE FROM parsed WHERE url = ?', (url,))
+        try:
+            os.remove(self._body_path(url))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        """Drop expired entries, then least recently used ones until under max_bytes"""
+        expired = self._db.execute(
+            'SELECT url FROM entries WHERE stored_at < ?', (time.time() - self.ttl,)
+        ).fetchall()
+        for (url,) in expired:
+            self._delete(url)
+
+        if self.total_bytes > self.max_bytes:
+            for (url,) in self._db.execute('SELECT url FROM entries ORDER BY accessed_at').fetchall():
+                if self.total_bytes <= self.max_bytes:
+                    break
+                self._delete(url)
+
+    def evict(self):
+        with self._lock:
+            self._evict()
+            self._db.commit()
+
+    def get_parsed(self, namespace: str, url: str, version: str):
+        """Return a stored parse result for this exact version of url's body, or None"""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT data FROM parsed WHERE namespace = ? AND url = ? AND version = ?',
+                (namespace, url, version)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_parsed(self, namespace: str, url: str, version: str, data):
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO parsed VALUES (?, ?, ?, ?)',
+                (namespace, url, version, json.dumps(data, ensure_ascii=False))
+            )
+            self._db.commit()
+
+
+class _CachingReader:
+    """Stands in for a streamed response's raw body and copies it into the cache as it is read.
+
+    The body is only committed once it has been read to the end, so an
+    interrupted download never leaves a truncated cache entry.
+    """
+
+    def __init__(self, raw, cache: HTTPCache, url: str, headers):
+        self._raw = raw
+        self._cache = cache
+        self._url = url
+        self._headers = headers
+        self._file = cache.new_temp_file()
+        self._hash = hashlib.sha256()
+
+    def read(self, amt=None, **kwargs):
+        chunk = self._raw.read(amt, decode_content=True)
+        if self._file is None:
+            return chunk
+        if chunk:
+            self._file.write(chunk)
+            self._hash.update(chunk)
+        else:
+            self._file.close()
+            self._cache.store_file(self._url, self._file.name, self._headers, self._hash.hexdigest())
+            self._file = None
+        return chunk
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            os.remove(self._file.name)
+            self._file = None
+        self._raw.close()
+
+    def release_conn(self):
+        release_conn = getattr(self._raw, 'release_conn', None)
+        if release_conn:
+            release_conn()
+
+
+class CachedSession:
+    """Wraps a requests session (or the requests module) so GETs go through an HTTPCache.
+
+    Cached URLs are revalidated with If-None-Match/If-Modified-Since; a 304
+    is answered from disk as a 200 with ``from_cache`` and ``not_modified``
+    set. Entries validated within the last ``fresh_for`` seconds are served
+    without a request at all. Everything else is passed through to the
+    wrapped session, so headers, mounts and stats keep working.
+    """
+
+    def __init__(self, session=None, cache: Optional[HTTPCache] = None, fresh_for: float = 0):
+        self.session = session if session is not None else requests.Session()
+        self.cache = cache or HTTPCache()
+        self.fresh_for = fresh_for
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    def _cached_response(self, entry: Dict[str, Any], stream: bool) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.url = entry['url']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        if stream:
+            response.raw = open(entry['path'], 'rb')
+        else:
+            with open(entry['path'], 'rb') as f:
+                response._content = f.read()
+        response.from_cache = True
+        response.not_modified = True
+        response.content_hash = entry['content_hash']
+        response.cache_key = entry['url']
+        return response
+
+    def get(self, url: str, params=None, headers: Optional[Dict[str, str]] = None,
+            stream: bool = False, **kwargs) -> requests.Response:
+        full_url = requests.Request('GET', url, params=params).prepare().url
+        entry = self.cache.lookup(full_url)
+
+        if entry and time.time() - entry['validated_at'] < self.fresh_for:
+            self.cache.hits += 1
+            return self._cached_response(entry, stream)
+
+        request_headers = dict(headers or {})
+        if entry:
+            if entry['etag']:
+                request_headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                request_headers['If-Modified-Since'] = entry['last_modified']
+
+        response = self.session.get(full_url, headers=request_headers, stream=stream, **kwargs)
+
+        if response.status_code == 304 and entry:
+            response.close()
+            self.cache.touch(full_url)
+            self.cache.revalidated += 1
+            return self._cached_response(entry, stream)
+
+        self.cache.misses += 1
+        response.from_cache = False
+        response.not_modified = False
+        response.content_hash = None
+        # The URL that was asked for, not response.url after redirects; bodies are stored under it
+        response.cache_key = full_url
+        if response.status_code == 200:
+            if stream:
+                response.raw = _CachingReader(response.raw, self.cache, full_url, response.headers)
+            else:
+                response.content_hash = self.cache.store(full_url, response.content, response.headers)
+        return response
+
+    def parse(self, namespace: str, response: requests.Response, parse_func, *args, parser_version: str = ''):
+        """Run parse_func(response.text, *args), reusing the stored result if this body was parsed before.
+
+        Results are stored as JSON, so parse_func must return plain data.
+        parser_version identifies the parsing code (see source_version());
+        a result stored under a different one is parsed again.
+        """
+        if not getattr(response, 'content_hash', None):
+            return parse_func(response.text, *args)
+
+        version = f"{response.content_hash}:{parser_version}"
+        if args:
+            args_key = json.dumps(args, sort_keys=True, ensure_ascii=False, default=str)
+            version += ':' + hashlib.sha256(args_key.encode('utf-8')).hexdigest()
+
+        url = getattr(response, 'cache_key', None) or response.url
+        parsed = self.cache.get_parsed(namespace, url, version)
+        if parsed is None:
+            parsed = parse_func(response.text, *args)
+            self.cache.put_parsed(namespace, url, version, parsed)
+        return parsed
+
+
+def source_version(*objects) -> str:
+    """A short hash of the source files defining objects (modules, classes or functions).
+
+    Pass the parsing code as CachedSession.parse's parser_version so any
+    edit to it invalidates the stored results.
+    """
+    digest = hashlib.sha256()
+    for path in sorted({inspect.getsourcefile(obj) for obj in objects}):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def download_file(session, url: str, filepath: str, timeout: int = 30, chunk_size: int = 8192,
+                  progress: Optional[Callable[[int], None]] = None) -> bool:
+    """Download url to filepath through a (possibly cached) session.
+
+    The body is streamed to a temporary file next to filepath and renamed
+    into place, so an interrupted download never leaves a truncated file.
+    If the server says the file hasn't changed and it is already on disk it
+    is left alone. progress, if given, is called with the size of each chunk
+    written. Returns True on success; errors are raised to the caller.
+    """
+    response = session.get(url, stream=True, timeout=timeout)
+    try:
+        response.raise_for_status()
+        if getattr(response, 'not_modified', False) and os.path.exists(filepath):
+            return True
+
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{filepath}.part-{os.getpid()}-{threading.get_ident()}"
+        try:
+            with open(temp_path, 'wb', buffering=chunk_size) as f:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    if chunk:
+                        f.write(chunk)
+                        if progress:
+                            progress(len(chunk))
+            os.replace(temp_path, filepath)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return True
+    finally:
+        response.close()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Pooled HTTP Transport
+Builds requests sessions that keep connections alive per host and retry
+transient failures with exponential backoff
+"""
+
+import threading
+from typing import Dict, Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+DEFAULT_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class ConnectionStats:
+    """Thread-safe count of new connections (TCP/TLS handshakes) opened per host"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.per_host: Dict[str, int] = {}
+
+    def record(self, host: str):
+        with self._lock:
+            self.per_host[host] = self.per_host.get(host, 0) + 1
+
+    @property
+    def total(self) -> int:
+        with self._lock:
+            return sum(self.per_host.values())
+
+
+def _counting_pool(base_cls, stats: ConnectionStats):
+    class CountingPool(base_cls):
+        def _new_conn(self):
+            stats.record(f"{self.host}:{self.port}")
+            return super()._new_conn()
+
+    return CountingPool
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that records every new connection its pools open"""
+
+    def __init__(self, stats: Optional[ConnectionStats] = None, **kwargs):
+        self.stats = stats or ConnectionStats()
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _counting_pool(HTTPConnectionPool, self.stats),
+            'https': _counting_pool(HTTPSConnectionPool, self.stats),
+        }
+
+
+def create_pooled_session(headers: Optional[Dict[str, str]] = None, pool_connections: int = 10,
+                          pool_maxsize: int = 10, retries: int = 3, backoff_factor: float = 0.5,
+                          retry_statuses: Iterable[int] = DEFAULT_RETRY_STATUSES,
+                          stats: Optional[ConnectionStats] = None) -> requests.Session:
+    """Create a keep-alive session with sized connection pools and a retry/backoff adapter.
+
+    pool_connections is how many hosts keep a pool, pool_maxsize how many
+    connections each host's pool holds; size it to the number of concurrent
+    requests per host. Idempotent requests are retried on connection errors
+    and on retry_statuses, sleeping backoff_factor * 2**n between attempts and
+    honouring Retry-After. The final response is returned rather than raised
+    so callers can keep checking status_code themselves.
+
+    requests speaks HTTP/1.1 only, so reuse comes from keep-alive rather than
+    HTTP/2 multiplexing.
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=tuple(retry_statuses),
+        allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS']),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = PooledHTTPAdapter(
+        stats=stats,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    if headers:
+        session.headers.update(headers)
+    session.connection_stats = adapter.stats
+    return session
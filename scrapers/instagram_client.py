@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Instagram Client
+Profile and feed requests shared by the Instagram scrapers, with a per-run
+memo of each profile and user ID so a brand costs one profile request plus
+its feed pages, however many times the scraper asks about it
+"""
+
+import re
+import json
+import logging
+import threading
+from typing import Dict, Iterator, List, Optional
+
+PROFILE_INFO_URL = "https://i.instagram.com/api/v1/users/web_profile_info/?username={username}"
+USER_FEED_URL = "https://i.instagram.com/api/v1/feed/user/{username}/username/"
+PROFILE_PAGE_URL = "https://www.instagram.com/{username}/"
+# The feed API refuses larger counts
+FEED_PAGE_SIZE = 12
+
+
+def _feed_media_urls(item) -> List[Dict[str, str]]:
+    if item.get('media_type') == 2:  # Video
+        if item.get('video_versions'):
+            return [{'type': 'video', 'url': item['video_versions'][0]['url']}]
+    else:  # Image
+        if item.get('image_versions2', {}).get('candidates'):
+            return [{'type': 'image', 'url': item['image_versions2']['candidates'][0]['url']}]
+    return []
+
+
+def parse_feed_post(post) -> Dict:
+    """Reduce one item of the mobile feed API to the post_data.json shape"""
+    post_data = {
+        'id': post.get('id', ''),
+        'caption': (post.get('caption') or {}).get('text', ''),
+        'media_urls': _feed_media_urls(post),
+        'likes': post.get('like_count', 0),
+        'comments': post.get('comment_count', 0),
+        'shortcode': post.get('code', ''),
+        'timestamp': post.get('taken_at', 0)
+    }
+
+    # Handle carousel posts
+    for carousel_item in post.get('carousel_media') or []:
+        post_data['media_urls'].extend(_feed_media_urls(carousel_item))
+
+    return post_data
+
+
+class InstagramClient:
+    """Fetches Instagram profiles and feeds through one session.
+
+    Profiles (and user IDs scraped from profile pages) are remembered for
+    the lifetime of the client, failures included, so callers can ask for
+    the same username as often as they like without another request.
+    ``requests_made`` counts the requests actually sent. Safe to share
+    between threads.
+    """
+
+    def __init__(self, session, logger: Optional[logging.Logger] = None, timeout: int = 10):
+        self.session = session
+        self.logger = logger or logging.getLogger(__name__)
+        self.timeout = timeout
+        self.requests_made = 0
+        self._lock = threading.Lock()
+        self._profiles: Dict[str, Optional[Dict]] = {}
+        self._user_ids: Dict[str, Optional[str]] = {}
+        self._username_locks: Dict[str, threading.Lock] = {}
+
+    def get(self, url: str, **kwargs):
+        """GET through the client's session, counted in requests_made"""
+        with self._lock:
+            self.requests_made += 1
+        return self.session.get(url, timeout=kwargs.pop('timeout', self.timeout), **kwargs)
+
+    def _username_lock(self, username: str) -> threading.Lock:
+        with self._lock:
+            return self._username_locks.setdefault(username.lower(), threading.Lock())
+
+    def get_user_info(self, username: str) -> Optional[Dict]:
+        """Profile summary from the mobile web_profile_info API, fetched at most once per username"""
+        key = username.lower()
+        with self._username_lock(username):
+            if key not in self._profiles:
+                self._profiles[key] = self._fetch_user_info(username)
+            return self._profiles[key]
+
+    def _fetch_user_info(self, username: str) -> Optional[Dict]:
+        try:
+            response = self.get(PROFILE_INFO_URL.format(username=username))
+
+            if response.status_code == 200:
+                data = response.json()
+                user = data.get('data', {}).get('user', {})
+
+                if user.get('id'):
+                    with self._lock:
+                        self._user_ids.setdefault(username.lower(), str(user['id']))
+
+                return {
+                    'username': username,
+                    'full_name': user.get('full_name', ''),
+                    'biography': user.get('biography', ''),
+                    'profile_pic_url': user.get('profile_pic_url', ''),
+                    'profile_pic_url_hd': user.get('profile_pic_url_hd', ''),
+                    'followers': user.get('edge_followed_by', {}).get('count', 0),
+                    'posts_count': user.get('edge_owner_to_timeline_media', {}).get('count', 0),
+                    'is_private': user.get('is_private', False)
+                }
+
+            return None
+        except Exception as e:
+            self.logger.error(f"Error getting user info for {username}: {e}")
+            return None
+
+    def get_user_posts(self, username: str, max_posts: int = 6) -> List[Dict]:
+        """Up to max_posts recent posts from the mobile feed API"""
+        return list(self.iter_user_posts(username, max_posts=max_posts))
+
+    def iter_user_posts(self, username: str, max_posts: Optional[int] = None,
+                        since: Optional[float] = None) -> Iterator[Dict]:
+        """Yield posts newest first, fetching the next feed page only when the caller gets to it.
+
+        Stops after max_posts posts or at the first post taken before the
+        ``since`` Unix timestamp (pinned posts, which come first whatever
+        their age, are skipped instead), whichever comes first. Uses the
+        memoized profile (if one was already fetched) only to skip private
+        accounts; it never fetches the profile itself.
+        """
+        with self._lock:
+            profile = self._profiles.get(username.lower())
+        if profile and profile.get('is_private'):
+            self.logger.info(f"@{username} is private, skipping posts")
+            return
+
+        yielded = 0
+        max_id = None
+        try:
+            while max_posts is None or yielded < max_posts:
+                count = FEED_PAGE_SIZE if max_posts is None else min(FEED_PAGE_SIZE, max_posts - yielded)
+                params = {'count': count}
+                if max_id:
+                    params['max_id'] = max_id
+                response = self.get(USER_FEED_URL.format(username=username), params=params)
+                if response.status_code != 200:
+                    break
+
+                data = response.json()
+                items = data.get('items', [])
+                for item in items:
+                    if since is not None and item.get('taken_at', 0) < since:
+                        if item.get('timeline_pinned_user_ids'):
+                            continue
+                        return
+                    yield parse_feed_post(item)
+                    yielded += 1
+                    if max_posts is not None and yielded >= max_posts:
+                        return
+
+                max_id = data.get('next_max_id')
+                if not items or not data.get('more_available') or not max_id:
+                    break
+        except Exception as e:
+            self.logger.error(f"Error getting posts for {username}: {e}")
+
+    def get_user_id(self, username: str) -> Optional[str]:
+        """Numeric user ID, from the memoized profile or else scraped once from the profile page"""
+        key = username.lower()
+        with self._username_lock(username):
+            with self._lock:
+                if key in self._user_ids:
+                    return self._user_ids[key]
+            user_id = self._fetch_user_id(username)
+            with self._lock:
+                self._user_ids[key] = user_id
+            return user_id
+
+    def _fetch_user_id(self, username: str) -> Optional[str]:
+        try:
+            response = self.get(PROFILE_PAGE_URL.format(username=username), timeout=15)
+            response.raise_for_status()
+
+            # Look for user ID in the page source
+            user_id_match = re.search(r'"user_id":"(\d+)"', response.text)
+            if user_id_match:
+                return user_id_match.group(1)
+
+            # Alternative method: look for profile page data
+            profile_data_match = re.search(r'"profilePage":\[{"user":(.*?)}', response.text)
+            if profile_data_match:
+                profile_data = json.loads(profile_data_match.group(1))
+                return str(profile_data.get('id', ''))
+
+            return None
+
+        except Exception as e:
+            self.logger.error(f"Error getting user ID for {username}: {e}")
+            return None
@@ -0,0 +1,778 @@
+#!/usr/bin/env python3
+"""
+Instagram Engine
+One brand scheduler, one media downloader and one output layout shared by
+all the Instagram scrapers; what differs between them (how a profile and
+its posts are fetched) is a backend plugged into the engine
+
+Backends:
+    web_profile_info  Instagram's mobile web_profile_info + feed APIs
+    graphql           GraphQL query_hash API (profile page for the user ID)
+    instaloader       the instaloader package (optional dependency)
+    selenium          undetected Chrome via advanced_instagram_scraper
+
+Usage:
+    python instagram_engine.py --backend web_profile_info --max-brands 3
+"""
+
+import os
+import re
+import json
+import shutil
+import logging
+import tempfile
+import argparse
+import concurrent.futures
+from abc import ABC, abstractmethod
+from urllib.parse import urlparse
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+import requests
+
+from http_cache import CachedSession
+from instagram_client import InstagramClient
+from media_pipeline import MediaDownloadPipeline
+from rate_limit import (DEFAULT_API_RATE, DEFAULT_MEDIA_RATE, INSTAGRAM_RATE_LIMITS, InstagramRateLimits,
+                        RateLimitedSession)
+
+DEFAULT_BRANDS_FILE = "downloads/brands-list.md"
+GRAPHQL_URL = "https://www.instagram.com/graphql/query/"
+PROFILE_QUERY_HASH = "e769aa130647d2354c40ea6a439bfc08"
+POSTS_QUERY_HASH = "003056d32c2554def87228bc3fd9668a"
+# Largest page the GraphQL timeline query serves
+GRAPHQL_PAGE_SIZE = 50
+# Newest post seen by the last run, kept in each brand folder
+WATERMARK_FILE = "watermark.json"
+
+
+def extract_username_from_url(instagram_url):
+    """Extract username from Instagram URL"""
+    if '/p/' in instagram_url:
+        # Post URL, extract username from the path
+        parts = urlparse(instagram_url).path.split('/')
+        return parts[1] if len(parts) > 1 and parts[1] != 'p' else None
+    if 'instagram.com/' in instagram_url:
+        # Profile URL
+        username = urlparse(instagram_url).path.strip('/')
+        if username and not username.startswith('p/'):
+            return username
+    return None
+
+
+def read_brands_list(brands_file=DEFAULT_BRANDS_FILE, logger=None):
+    """Read brands and Instagram links from the markdown file"""
+    brands = {}
+
+    try:
+        with open(brands_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        # Extract brand names and Instagram links
+        for line in content.split('\n'):
+            if '**' in line and 'Instagram' in line:
+                # Extract brand name
+                brand_match = re.search(r'\*\*(.*?)\*\*', line)
+                if brand_match:
+                    brand_name = brand_match.group(1)
+
+                    # Extract Instagram URL
+                    url_match = re.search(r'https://www\.instagram\.com/[^\s)]+', line)
+                    if url_match:
+                        brands[brand_name] = url_match.group(0)
+                    elif 'No official Instagram link found' in line or 'No specific Instagram link found' in line:
+                        brands[brand_name] = None
+
+        return brands
+
+    except Exception as e:
+        (logger or logging.getLogger(__name__)).error(f"Error reading brands file: {e}")
+        return {}
+
+
+def instagram_sessions(headers: Optional[Dict[str, str]] = None,
+                       rate_limits: Optional[InstagramRateLimits] = None):
+    """Return (session, media_session) sharing one connection pool, headers and rate limits.
+
+    Profile and API responses go through the HTTP cache, so an unchanged
+    page is revalidated rather than downloaded again; every revalidation is
+    still a request and takes a rate token. Media skips the cache: the
+    downloaded files are the copy.
+    """
+    base = requests.Session()
+    base.headers.update(headers or {})
+    media_session = RateLimitedSession(base, rate_limits)
+    return CachedSession(media_session), media_session
+
+
+def load_brands(brands_file=DEFAULT_BRANDS_FILE, max_brands=None, title="Instagram Scraper",
+                logger=None) -> Dict[str, Optional[str]]:
+    """Read the brands file for a run, keeping the first max_brands if given"""
+    logger = logger or logging.getLogger(__name__)
+    logger.info(f"Starting {title}...")
+
+    # Read brands list
+    brands = read_brands_list(brands_file, logger)
+
+    if not brands:
+        logger.error("No brands found in the file!")
+        return {}
+
+    logger.info(f"Found {len(brands)} brands with Instagram links")
+
+    # Limit brands if specified
+    if max_brands:
+        brands = dict(list(brands.items())[:max_brands])
+        logger.info(f"Limited to {max_brands} brands for testing")
+    return brands
+
+
+def run_brands(brands: Dict[str, Optional[str]], scrape: Callable[[str, str], bool],
+               workers: int = 4, logger=None) -> int:
+    """Call scrape(brand_name, instagram_url) for every brand with a link on up to workers threads.
+
+    Returns how many calls succeeded. Nothing sleeps between brands; the
+    sessions scrape uses are expected to pace their own requests (see
+    RateLimitedSession). Scripts that scrape brands their own way use this
+    directly; InstagramEngine.run_brands runs its backend through it.
+    """
+    logger = logger or logging.getLogger(__name__)
+
+    def run_one(i, brand_name, instagram_url):
+        logger.info(f"\n[{i}/{len(brands)}] Processing: {brand_name}")
+        return scrape(brand_name, instagram_url)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = []
+        for i, (brand_name, instagram_url) in enumerate(brands.items(), 1):
+            if not instagram_url:
+                logger.info(f"Skipping {brand_name} - no Instagram link")
+                continue
+            futures.append(executor.submit(run_one, i, brand_name, instagram_url))
+        return sum(1 for future in futures if future.result())
+
+
+def read_watermark(brand_folder) -> Optional[Dict]:
+    """The newest post (shortcode, timestamp) a previous run saved for this brand, if any"""
+    try:
+        with open(os.path.join(brand_folder, WATERMARK_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_watermark(brand_folder, posts: List[Dict]):
+    """Record the newest of posts (by timestamp, else the first) as this brand's watermark"""
+    newest = max(posts, key=lambda post: post.get('timestamp') or 0) if any(
+        post.get('timestamp') for post in posts) else posts[0]
+    watermark = {
+        'shortcode': newest.get('shortcode', ''),
+        'post_id': newest.get('id', ''),
+        'timestamp': newest.get('timestamp') or None,
+        'updated_at': datetime.now().isoformat()
+    }
+    with open(os.path.join(brand_folder, WATERMARK_FILE), 'w', encoding='utf-8') as f:
+        json.dump(watermark, f, indent=2)
+
+
+class InstagramBackend(ABC):
+    """How a scraper gets a profile and its recent posts.
+
+    get_profile returns a dict (profile_pic_url / profile_pic_url_hd are
+    used for the profile picture) or None; get_posts returns post dicts
+    whose ``media_urls`` list holds {'type': 'image'|'video', 'url'} and,
+    where the source has it, a Unix ``timestamp``. iter_posts yields the
+    same dicts newest first, stopping after max_posts or at the first post
+    older than ``since``; backends that page through a feed override it to
+    fetch each page only when it is reached. ``max_concurrency`` caps how
+    many brands the engine scrapes with this backend at once (None = no
+    cap beyond the engine's own).
+    """
+
+    name = 'backend'
+    max_concurrency: Optional[int] = None
+
+    @abstractmethod
+    def get_profile(self, username) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def get_posts(self, username, max_posts) -> List[Dict]:
+        ...
+
+    def iter_posts(self, username, max_posts: Optional[int] = None,
+                   since: Optional[float] = None) -> Iterator[Dict]:
+        for post in self.get_posts(username, max_posts):
+            # Posts without a timestamp can't be placed against the watermark
+            if since is not None and post.get('timestamp') and post['timestamp'] < since:
+                return
+            yield post
+
+    def close(self):
+        pass
+
+
+class CallableBackend(InstagramBackend):
+    """Backend made from a scraper's own profile and posts methods"""
+
+    def __init__(self, name, get_profile: Callable, get_posts: Callable,
+                 max_concurrency: Optional[int] = None, close: Optional[Callable] = None):
+        self.name = name
+        self._get_profile = get_profile
+        self._get_posts = get_posts
+        self._close = close
+        self.max_concurrency = max_concurrency
+
+    def get_profile(self, username):
+        return self._get_profile(username)
+
+    def get_posts(self, username, max_posts):
+        return self._get_posts(username, max_posts=max_posts)
+
+    def close(self):
+        if self._close:
+            self._close()
+
+
+class WebProfileInfoBackend(InstagramBackend):
+    """Mobile web_profile_info and feed APIs, one profile request per brand"""
+
+    name = 'web_profile_info'
+
+    def __init__(self, session=None, client: Optional[InstagramClient] = None, logger=None):
+        if client is None:
+            session = session or instagram_sessions()[0]
+            session.headers.update({
+                'User-Agent': 'Instagram 219.0.0.12.117 Android',
+                'Accept': '*/*',
+                'Accept-Language': 'en-US',
+                'Accept-Encoding': 'gzip, deflate',
+                'Connection': 'keep-alive'
+            })
+            client = InstagramClient(session, logger)
+        self.client = client
+
+    def get_profile(self, username):
+        return self.client.get_user_info(username)
+
+    def get_posts(self, username, max_posts):
+        return self.client.get_user_posts(username, max_posts=max_posts)
+
+    def iter_posts(self, username, max_posts=None, since=None):
+        return self.client.iter_user_posts(username, max_posts=max_posts, since=since)
+
+
+class GraphQLBackend(InstagramBackend):
+    """GraphQL query_hash API, keyed by the user ID scraped from the profile page"""
+
+    name = 'graphql'
+
+    def __init__(self, session=None, client: Optional[InstagramClient] = None, logger=None):
+        if client is None:
+            session = session or instagram_sessions()[0]
+            session.headers.update({
+                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                'Accept': 'application/json, text/plain, */*',
+                'Accept-Language': 'en-US,en;q=0.9',
+                'Referer': 'https://www.instagram.com/',
+                'Origin': 'https://www.instagram.com',
+                'X-Requested-With': 'XMLHttpRequest'
+            })
+            client = InstagramClient(session, logger, timeout=15)
+        self.client = client
+        self.logger = logger or logging.getLogger(__name__)
+
+    def _query(self, query_hash, variables):
+        response = self.client.get(GRAPHQL_URL, params={
+            "query_hash": query_hash,
+            "variables": json.dumps(variables)
+        })
+        response.raise_for_status()
+        return response.json()
+
+    def get_profile(self, username):
+        try:
+            user_id = self.client.get_user_id(username)
+            if not user_id:
+                self.logger.warning(f"Could not get user ID for {username}")
+                return None
+
+            data = self._query(PROFILE_QUERY_HASH, {
+                "user_id": user_id,
+                "include_chaining": False,
+                "include_reel": True,
+                "include_suggested_users": False,
+                "include_logged_out_extras": False,
+                "include_highlight_reels": False,
+                "include_related_profiles": False
+            })
+
+            if 'data' in data and 'user' in data['data']:
+                user_data = data['data']['user']
+                return {
+                    'username': username,
+                    'user_id': user_id,
+                    'full_name': user_data.get('full_name', ''),
+                    'biography': user_data.get('biography', ''),
+                    'profile_pic_url': user_data.get('profile_pic_url', ''),
+                    'profile_pic_url_hd': user_data.get('profile_pic_url_hd', ''),
+                    'followers_count': user_data.get('edge_followed_by', {}).get('count', 0),
+                    'following_count': user_data.get('edge_follow', {}).get('count', 0),
+                    'posts_count': user_data.get('edge_owner_to_timeline_media', {}).get('count', 0),
+                    'is_private': user_data.get('is_private', False),
+                    'is_verified': user_data.get('is_verified', False)
+                }
+
+            return None
+
+        except Exception as e:
+            self.logger.error(f"Error getting profile data for {username}: {e}")
+            return None
+
+    @staticmethod
+    def _node_media_urls(node) -> List[Dict[str, str]]:
+        if node.get('is_video'):
+            return [{'type': 'video', 'url': node['video_url']}] if node.get('video_url') else []
+        return [{'type': 'image', 'url': node['display_url']}] if node.get('display_url') else []
+
+    @staticmethod
+    def parse_post(post_node) -> Dict:
+        """Reduce one GraphQL timeline node to the post_data.json shape"""
+        post_data = {
+            'id': post_node.get('id', ''),
+            'shortcode': post_node.get('shortcode', ''),
+            'caption': '',
+            'media_urls': GraphQLBackend._node_media_urls(post_node),
+            'is_video': post_node.get('is_video', False),
+            'likes_count': post_node.get('edge_liked_by', {}).get('count', 0),
+            'comments_count': post_node.get('edge_media_to_comment', {}).get('count', 0),
+            'timestamp': post_node.get('taken_at_timestamp', 0)
+        }
+
+        # Get caption
+        if post_node.get('edge_media_to_caption', {}).get('edges'):
+            post_data['caption'] = post_node['edge_media_to_caption']['edges'][0]['node']['text']
+
+        # Get additional images for carousel posts
+        if not post_node.get('is_video'):
+            for edge in post_node.get('edge_sidecar_to_children', {}).get('edges', []):
+                post_data['media_urls'].extend(GraphQLBackend._node_media_urls(edge['node']))
+
+        return post_data
+
+    def get_posts(self, username, max_posts):
+        return list(self.iter_posts(username, max_posts))
+
+    def iter_posts(self, username, max_posts=None, since=None):
+        """Follow the timeline's end_cursor one page at a time"""
+        try:
+            user_id = self.client.get_user_id(username)
+            if not user_id:
+                return
+
+            yielded = 0
+            after = None
+            while max_posts is None or yielded < max_posts:
+                first = GRAPHQL_PAGE_SIZE if max_posts is None else min(GRAPHQL_PAGE_SIZE, max_posts - yielded)
+                data = self._query(POSTS_QUERY_HASH, {"id": user_id, "first": first, "after": after})
+                if 'data' not in data or 'user' not in data['data']:
+                    return
+
+                timeline = data['data']['user'].get('edge_owner_to_timeline_media', {})
+                edges = timeline.get('edges', [])
+                for post in edges:
+                    post_node = post['node']
+                    if since is not None and post_node.get('taken_at_timestamp', 0) < since:
+                        if post_node.get('pinned_for_users'):
+                            continue
+                        return
+                    yield self.parse_post(post_node)
+                    yielded += 1
+                    if max_posts is not None and yielded >= max_posts:
+                        return
+
+                page_info = timeline.get('page_info', {})
+                after = page_info.get('end_cursor')
+                if not edges or not page_info.get('has_next_page') or not after:
+                    return
+
+        except Exception as e:
+            self.logger.error(f"Error getting posts for {username}: {e}")
+
+
+class InstaloaderBackend(InstagramBackend):
+    """The instaloader package; imported only when this backend is used"""
+
+    name = 'instaloader'
+    # instaloader's context is not meant to be shared between threads
+    max_concurrency = 1
+
+    def __init__(self, logger=None):
+        import instaloader
+        self.instaloader = instaloader
+        self.loader = instaloader.Instaloader(download_pictures=False, download_videos=False,
+                                              save_metadata=False, quiet=True)
+        self.logger = logger or logging.getLogger(__name__)
+        self._profiles = {}
+
+    def _profile(self, username):
+        if username not in self._profiles:
+            self._profiles[username] = self.instaloader.Profile.from_username(self.loader.context, username)
+        return self._profiles[username]
+
+    def get_profile(self, username):
+        try:
+            profile = self._profile(username)
+            return {
+                'username': username,
+                'user_id': str(profile.userid),
+                'full_name': profile.full_name,
+                'biography': profile.biography,
+                'profile_pic_url': profile.profile_pic_url,
+                'followers_count': profile.followers,
+                'posts_count': profile.mediacount,
+                'is_private': profile.is_private,
+                'is_verified': profile.is_verified
+            }
+        except Exception as e:
+            self.logger.error(f"Error getting profile data for {username}: {e}")
+            return None
+
+    def get_posts(self, username, max_posts):
+        return list(self.iter_posts(username, max_posts))
+
+    def iter_posts(self, username, max_posts=None, since=None):
+        yielded = 0
+        try:
+            for post in self._profile(username).get_posts():
+                if max_posts is not None and yielded >= max_posts:
+                    break
+                if since is not None and post.date_utc.timestamp() < since:
+                    if getattr(post, 'is_pinned', False):
+                        continue
+                    break
+                if post.typename == 'GraphSidecar':
+                    media_urls = [{'type': 'video' if node.is_video else 'image',
+                                   'url': node.video_url if node.is_video else node.display_url}
+                                  for node in post.get_sidecar_nodes()]
+                else:
+                    media_urls = [{'type': 'video' if post.is_video else 'image',
+                                   'url': post.video_url if post.is_video else post.url}]
+                yield {
+                    'id': str(post.mediaid),
+                    'shortcode': post.shortcode,
+                    'caption': post.caption or '',
+                    'media_urls': media_urls,
+                    'is_video': post.is_video,
+                    'likes_count': post.likes,
+                    'comments_count': post.comments,
+                    'timestamp': int(post.date_utc.timestamp())
+                }
+                yielded += 1
+        except Exception as e:
+            self.logger.error(f"Error getting posts for {username}: {e}")
+
+
+class SeleniumBackend(CallableBackend):
+    """A Chrome driven by advanced_instagram_scraper; one brand at a time"""
+
+    def __init__(self, scraper=None):
+        if scraper is None:
+            from advanced_instagram_scraper import AdvancedInstagramScraper
+            scraper = AdvancedInstagramScraper()
+        self.scraper = scraper
+        super().__init__('selenium', scraper.get_profile_data, scraper.get_posts_data,
+                         max_concurrency=1, close=self._quit)
+
+    def _quit(self):
+        if getattr(self.scraper, 'post_pool', None):
+            self.scraper.post_pool.close()
+        if self.scraper.driver:
+            self.scraper.driver.quit()
+            self.scraper.driver = None
+
+
+BACKENDS = {
+    'web_profile_info': WebProfileInfoBackend,
+    'graphql': GraphQLBackend,
+    'instaloader': InstaloaderBackend,
+    'selenium': SeleniumBackend,
+}
+
+
+class InstagramEngine:
+    """Scrapes brands' Instagram profiles and posts into ``output_dir``.
+
+    Brands run on ``brand_workers`` threads (fewer if the backend caps its
+    concurrency) and media goes through one shared MediaDownloadPipeline
+    of ``media_workers`` threads. Nothing sleeps between brands: requests
+    are paced by ``rate_limits``, which the sessions given to the engine
+    and its backend should take tokens from (see RateLimitedSession).
+
+    Each brand gets its newest ``max_posts`` posts (None for no limit),
+    stopping early at posts older than the ``since`` Unix timestamp. Posts
+    are written and their media queued as the backend yields them, so
+    downloads start while later feed pages are still being fetched.
+
+    With ``incremental`` on, a brand scraped before only gets the posts
+    newer than its watermark.json: the feed is read until the first post
+    already seen, the new posts take the lowest post_N numbers and the
+    older folders move up (those past ``max_posts`` are removed), so
+    post_1 is still the newest. A run that finds nothing new writes no
+    posts at all. New posts are written to a staging folder and only
+    moved in, and the existing ones renumbered, once all of them are
+    written and their media downloaded; a post with a failed download,
+    and any newer one, is dropped and fetched again by the next run.
+
+    Layouts:
+        posts  <brand>/profile_data.json, <brand>/posts/post_N/...,
+               plus empty images/ and videos/ folders for reorganizing
+        flat   <brand>/user_info.json, <brand>/post_N/...
+    """
+
+    def __init__(self, backend: Optional[InstagramBackend], output_dir="downloads/instagram_data",
+                 media_session=None, max_posts: Optional[int] = 6, layout: str = 'posts',
+                 brand_workers: int = 4, media_workers: int = 8,
+                 rate_limits: Optional[InstagramRateLimits] = None, since: Optional[float] = None,
+                 incremental: bool = True, logger=None):
+        self.backend = backend
+        self.output_dir = output_dir
+        self.max_posts = max_posts
+        self.since = since
+        self.incremental = incremental
+        self.layout = layout
+        self.brand_workers = brand_workers
+        self.rate_limits = rate_limits or INSTAGRAM_RATE_LIMITS
+        self.logger = logger or logging.getLogger(__name__)
+        media_session = media_session or instagram_sessions(rate_limits=self.rate_limits)[1]
+        self.media = MediaDownloadPipeline(media_session, workers=media_workers, report_interval=None)
+
+    def download_media(self, url, filepath) -> concurrent.futures.Future:
+        """Queue a media download; the Future resolves to True or False"""
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+
+        def log_result(ok):
+            if ok:
+                self.logger.info(f"Downloaded: {filepath}")
+            else:
+                self.logger.error(f"Error downloading {url}")
+
+        return self.media.submit(url, filepath, on_done=log_result)
+
+    def scrape_brand(self, brand_name, instagram_url) -> bool:
+        """Fetch one brand's profile and posts through the backend and download their media"""
+        try:
+            # Extract username from URL
+            username = extract_username_from_url(instagram_url)
+            if not username:
+                self.logger.error(f"Could not extract username from URL: {instagram_url}")
+                return False
+
+            # Create brand folder
+            brand_folder = os.path.join(self.output_dir, brand_name)
+            if self.layout == 'posts':
+                posts_folder = os.path.join(brand_folder, 'posts')
+                for folder in ('images', 'videos', 'posts'):
+                    os.makedirs(os.path.join(brand_folder, folder), exist_ok=True)
+                profile_file = 'profile_data.json'
+            else:
+                posts_folder = brand_folder
+                os.makedirs(brand_folder, exist_ok=True)
+                profile_file = 'user_info.json'
+
+            self.logger.info(f"Processing {brand_name} (@{username}) with {self.backend.name}")
+
+            profile_downloads = []
+            media_downloads = []
+
+            # Get profile data
+            profile_data = self.backend.get_profile(username)
+            if profile_data:
+                # Download profile picture
+                if profile_data.get('profile_pic_url_hd'):
+                    profile_pic_path = os.path.join(brand_folder, f"{username}_profile_hd.jpg")
+                    profile_downloads.append(self.download_media(profile_data['profile_pic_url_hd'], profile_pic_path))
+                elif profile_data.get('profile_pic_url'):
+                    profile_pic_path = os.path.join(brand_folder, f"{username}_profile.jpg")
+                    profile_downloads.append(self.download_media(profile_data['profile_pic_url'], profile_pic_path))
+
+                # Save profile data
+                with open(os.path.join(brand_folder, profile_file), 'w', encoding='utf-8') as f:
+                    json.dump(profile_data, f, indent=2)
+
+            watermark = read_watermark(brand_folder) if self.incremental else None
+            since = self.since
+            if watermark and watermark.get('timestamp'):
+                # Timestamps are whole seconds; stop at the first post not newer than the watermark
+                since = max(since or 0, watermark['timestamp'] + 1)
+            posts = self.backend.iter_posts(username, self.max_posts, since=since)
+
+            if watermark:
+                posts = self._unseen_posts(posts, watermark)
+                if not posts:
+                    self.logger.info(f"No new posts for {brand_name} since the last run")
+
+            # Incremental runs assemble the new posts here, so a failure leaves the brand as it was
+            staging = tempfile.mkdtemp(prefix='.incoming-', dir=brand_folder) if self.incremental else None
+            try:
+                # Write each post and queue its media as soon as the backend yields it
+                written = []
+                for i, post in enumerate(posts):
+                    try:
+                        post_folder = os.path.join(staging or posts_folder, f"post_{i+1}")
+                        os.makedirs(post_folder, exist_ok=True)
+
+                        # Save post data
+                        with open(os.path.join(post_folder, 'post_data.json'), 'w', encoding='utf-8') as f:
+                            json.dump(post, f, indent=2)
+                        written.append(post)
+
+                        # Download media
+                        post_downloads = []
+                        media_downloads.append(post_downloads)
+                        for j, media in enumerate(post.get('media_urls', [])):
+                            if media['type'] == 'image':
+                                filename = f"image_{j+1}.jpg"
+                            else:
+                                filename = f"video_{j+1}.mp4"
+                            post_downloads.append(self.download_media(media['url'], os.path.join(post_folder, filename)))
+
+                    except Exception as e:
+                        self.logger.error(f"Error processing post {i+1}: {e}")
+                        if staging:
+                            # Moving in the others would leave a gap in the numbering
+                            raise
+                        continue
+
+                concurrent.futures.wait(profile_downloads)
+                results = [[future.result() for future in post_downloads] for post_downloads in media_downloads]
+                downloaded_count = sum(map(sum, results))
+                if staging:
+                    self._commit_posts(brand_name, brand_folder, posts_folder, staging, written, results,
+                                       replace=watermark is None)
+            finally:
+                if staging:
+                    # Nothing may still be writing into the staging folder when it goes
+                    concurrent.futures.wait([future for post_downloads in media_downloads for future in post_downloads])
+                    shutil.rmtree(staging, ignore_errors=True)
+
+            self.logger.info(f"Downloaded {downloaded_count} media files for {brand_name}")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error scraping {brand_name}: {e}")
+            return False
+
+    @staticmethod
+    def _unseen_posts(posts, watermark) -> List[Dict]:
+        # Backends without timestamps can't stop at the watermark themselves
+        unseen = []
+        for post in posts:
+            if watermark.get('shortcode') and post.get('shortcode') == watermark['shortcode']:
+                break
+            unseen.append(post)
+        return unseen
+
+    def _commit_posts(self, brand_name, brand_folder, posts_folder, staging, written, results, replace):
+        # Posts are newest first; everything from the oldest post with a failed download up is dropped,
+        # so the watermark never passes a post that isn't fully on disk
+        failed = [i for i, post_results in enumerate(results) if not all(post_results)]
+        first_kept = failed[-1] + 1 if failed else 0
+        kept = written[first_kept:]
+        if failed:
+            self.logger.warning(f"{first_kept} new posts for {brand_name} had failed downloads; "
+                                f"they will be fetched again next run")
+        if not kept:
+            return
+
+        if replace:
+            # No watermark yet: the new posts replace whatever an older run left
+            for n in self._post_numbers(posts_folder):
+                shutil.rmtree(os.path.join(posts_folder, f"post_{n}"))
+        else:
+            self._shift_posts(posts_folder, len(kept))
+        for n in range(len(kept)):
+            os.rename(os.path.join(staging, f"post_{first_kept + n + 1}"), os.path.join(posts_folder, f"post_{n + 1}"))
+        write_watermark(brand_folder, kept)
+
+    @staticmethod
+    def _post_numbers(posts_folder) -> List[int]:
+        if not os.path.isdir(posts_folder):
+            return []
+        return sorted((int(name[5:]) for name in os.listdir(posts_folder) if re.fullmatch(r'post_\d+', name)),
+                      reverse=True)
+
+    def _shift_posts(self, posts_folder, count):
+        # Renumber post_N to post_N+count, oldest first, dropping what falls past max_posts
+        if not count:
+            return
+        for n in self._post_numbers(posts_folder):
+            old_path = os.path.join(posts_folder, f"post_{n}")
+            if self.max_posts and n + count > self.max_posts:
+                shutil.rmtree(old_path)
+            else:
+                os.rename(old_path, os.path.join(posts_folder, f"post_{n + count}"))
+
+    def run_brands(self, brands: Dict[str, Optional[str]]) -> int:
+        """Scrape every brand with a link through the backend; returns how many succeeded"""
+        workers = self.brand_workers
+        if self.backend and self.backend.max_concurrency:
+            workers = min(workers, self.backend.max_concurrency)
+        successful = run_brands(brands, self.scrape_brand, workers, self.logger)
+        self.media.join()
+        return successful
+
+    def run(self, brands_file=DEFAULT_BRANDS_FILE, max_brands=None, title="Instagram Scraper"):
+        """Read the brands file and scrape every brand in it"""
+        brands = load_brands(brands_file, max_brands, title, self.logger)
+        if not brands:
+            return
+
+        try:
+            successful_scrapes = self.run_brands(brands)
+        finally:
+            self.close()
+
+        self.logger.info(f"\nCompleted! Successfully scraped {successful_scrapes} out of {len(brands)} brands")
+        self.logger.info(f"Check the '{self.output_dir}' folder for downloaded content.")
+        self.logger.info(f"Media: {self.media.format_stats()}")
+        self.logger.info(f"Rate limits: {self.rate_limits.format_stats()}")
+
+    def close(self):
+        self.media.close()
+        if self.backend:
+            self.backend.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape brands' Instagram content with a pluggable backend")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='web_profile_info')
+    parser.add_argument('--brands-file', default=DEFAULT_BRANDS_FILE)
+    parser.add_argument('--output-dir', default='downloads/instagram_data')
+    parser.add_argument('--max-brands', type=int, default=None)
+    parser.add_argument('--max-posts', type=int, default=6, help='Newest posts per brand (0 for no limit)')
+    parser.add_argument('--since', help='Only posts from this date on (YYYY-MM-DD)')
+    parser.add_argument('--full', action='store_true', help='Ignore watermarks and re-fetch the newest posts')
+    parser.add_argument('--layout', choices=['posts', 'flat'], default='posts')
+    parser.add_argument('--workers', type=int, default=4, help='Brands scraped at once')
+    parser.add_argument('--media-workers', type=int, default=8, help='Parallel media downloads')
+    parser.add_argument('--api-rate', type=float, default=DEFAULT_API_RATE,
+                        help='Profile/feed requests per second across all workers')
+    parser.add_argument('--media-rate', type=float, default=DEFAULT_MEDIA_RATE,
+                        help='CDN media requests per second across all workers')
+    args = parser.parse_args()
+
+    INSTAGRAM_RATE_LIMITS.api.set_rate(args.api_rate)
+    INSTAGRAM_RATE_LIMITS.media.set_rate(args.media_rate)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    since = datetime.strptime(args.since, '%Y-%m-%d').timestamp() if args.since else None
+    engine = InstagramEngine(BACKENDS[args.backend](), output_dir=args.output_dir,
+                             max_posts=args.max_posts or None, layout=args.layout,
+                             brand_workers=args.workers, media_workers=args.media_workers, since=since,
+                             incremental=not args.full)
+    engine.run(args.brands_file, max_brands=args.max_brands, title=f"Instagram Engine ({args.backend})")
+
+
+if __name__ == "__main__":
+    main()
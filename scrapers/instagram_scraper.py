@@ -4,21 +4,18 @@ Instagram Content Scraper
 Downloads images and videos from Instagram accounts
 """
 
-import requests
 import json
 import os
 import time
-import re
-from urllib.parse import urlparse, parse_qs
-from bs4 import BeautifulSoup
-import urllib.request
-from pathlib import Path
 import logging
 
+from http_cache import download_file
+from html_parsing import make_soup
+from instagram_engine import extract_username_from_url, instagram_sessions, load_brands, read_brands_list, run_brands
+
 class InstagramScraper:
     def __init__(self, output_dir="downloads/instagram_data"):
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.session, self.media_session = instagram_sessions({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
@@ -43,21 +40,7 @@ class InstagramScraper:
     
     def extract_username_from_url(self, instagram_url):
         """Extract username from Instagram URL"""
-        # Handle different URL formats
-        if '/p/' in instagram_url:
-            # Post URL, extract username from the path
-            path = urlparse(instagram_url).path
-            parts = path.split('/')
-            if len(parts) > 1:
-                return parts[1]
-        elif 'instagram.com/' in instagram_url:
-            # Profile URL
-            path = urlparse(instagram_url).path
-            username = path.strip('/')
-            if username:
-                return username
-        
-        return None
+        return extract_username_from_url(instagram_url)
     
     def get_instagram_profile_data(self, username):
         """Get Instagram profile data using web scraping"""
@@ -69,7 +52,7 @@ class InstagramScraper:
             response.raise_for_status()
             
             # Look for JSON data in the HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text)
             
             # Find script tags containing JSON data
             scripts = soup.find_all('script')
@@ -92,11 +75,7 @@ class InstagramScraper:
     def download_media(self, url, filepath):
         """Download media file from URL"""
         try:
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(filepath), exist_ok=True)
-            
-            # Download the file
-            urllib.request.urlretrieve(url, filepath)
+            download_file(self.media_session, url, filepath)
             self.logger.info(f"Downloaded: {filepath}")
             return True
             
@@ -168,9 +147,6 @@ class InstagramScraper:
                 post_data = post['node']
                 if self.process_instagram_post(post_data, brand_folder):
                     downloaded_count += 1
-                
-                # Be respectful with delays
-                time.sleep(2)
             
             self.logger.info(f"Downloaded {downloaded_count} media files for {brand_name}")
             return True
@@ -181,64 +157,18 @@ class InstagramScraper:
     
     def read_brands_list(self, brands_file="downloads/brands-list.md"):
         """Read brands and Instagram links from the markdown file"""
-        brands = {}
-        
-        try:
-            with open(brands_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Extract brand names and Instagram links
-            lines = content.split('\n')
-            for line in lines:
-                if '**' in line and 'Instagram' in line:
-                    # Extract brand name
-                    brand_match = re.search(r'\*\*(.*?)\*\*', line)
-                    if brand_match:
-                        brand_name = brand_match.group(1)
-                        
-                        # Extract Instagram URL
-                        url_match = re.search(r'https://www\.instagram\.com/[^\s)]+', line)
-                        if url_match:
-                            instagram_url = url_match.group(0)
-                            brands[brand_name] = instagram_url
-                        elif 'No official Instagram link found' in line or 'No specific Instagram link found' in line:
-                            brands[brand_name] = None
-            
-            return brands
-            
-        except Exception as e:
-            self.logger.error(f"Error reading brands file: {e}")
-            return {}
+        return read_brands_list(brands_file, self.logger)
     
     def run(self, brands_file="downloads/brands-list.md"):
         """Main method to scrape Instagram content for all brands"""
-        self.logger.info("Starting Instagram Content Scraper...")
-        
-        # Read brands list
-        brands = self.read_brands_list(brands_file)
-        
+        brands = load_brands(brands_file, title="Instagram Content Scraper", logger=self.logger)
         if not brands:
-            self.logger.error("No brands found in the file!")
             return
         
-        self.logger.info(f"Found {len(brands)} brands with Instagram links")
-        
-        # Process each brand
-        successful_scrapes = 0
-        for i, (brand_name, instagram_url) in enumerate(brands.items(), 1):
-            if not instagram_url:
-                self.logger.info(f"Skipping {brand_name} - no Instagram link")
-                continue
-            
-            self.logger.info(f"\n[{i}/{len(brands)}] Processing: {brand_name}")
-            
-            if self.scrape_brand_instagram(brand_name, instagram_url):
-                successful_scrapes += 1
-            
-            # Be respectful with delays between brands
-            time.sleep(5)
+        successful_scrapes = run_brands(brands, self.scrape_brand_instagram, logger=self.logger)
         
         self.logger.info(f"\nCompleted! Successfully scraped {successful_scrapes} out of {len(brands)} brands")
+        self.logger.info(f"Check the '{self.output_dir}' folder for downloaded content.")
 
 def main():
     """Main function to run the Instagram scraper"""
@@ -7,21 +7,60 @@ Downloads all images and videos to organized folders
 """
 
 import requests
-from bs4 import BeautifulSoup
 import json
 import time
 import os
 from urllib.parse import urljoin, urlparse, quote
 import re
-from datetime import datetime
+from datetime import datetime, timedelta
 import concurrent.futures
-from typing import List, Dict, Optional
+import asyncio
+from typing import List, Dict, Optional, Tuple
 import csv
+import hashlib
+import threading
+from functools import partial
+
+from crawl_engine import AsyncCrawler
+from http_transport import create_pooled_session
+from http_cache import DEFAULT_CACHE_DIR, CachedSession, HTTPCache, download_file, source_version
+from product_extractor import ProductPageExtractor, extract_brand_metadata
+from html_parsing import default_backend, make_soup
+from media_pipeline import MediaDownloadPipeline
+from media_store import DEFAULT_STORE_DIR, MediaStore
+from shopify_feed import (
+    ShopifyFeed, product_handle_from_url, product_image_urls, product_price,
+    product_variant_titles, product_video_urls, strip_html
+)
+
+class BrandFetchError(Exception):
+    """None of a brand's pages could be fetched, so it's unknown whether it still has products"""
+
 
 class LowheadsCompleteScraper:
-    def __init__(self, base_url="https://lowheads.com"):
+    def __init__(self, base_url="https://lowheads.com", pooled_transport: bool = True, pool_maxsize: int = 8,
+                 use_shopify_feed: bool = True, use_http_cache: bool = True, cache_dir: str = DEFAULT_CACHE_DIR,
+                 parser_backend: Optional[str] = None, media_workers: int = 8, media_queue_size: int = 256,
+                 use_media_store: bool = True, media_store_dir: str = DEFAULT_STORE_DIR):
         self.base_url = base_url
-        self.session = requests.Session()
+        self.parser_backend = parser_backend  # None uses SCRAPER_HTML_PARSER, else html.parser (see html_parsing)
+        # Cached parse results are only reused by the same parser backend and parsing code
+        self.parser_version = (f"{parser_backend or default_backend()}:"
+                               f"{source_version(LowheadsCompleteScraper, ProductPageExtractor, make_soup)}")
+        
+        # Pages are fetched with requests' default headers (the browser headers on
+        # self.session change what lowheads.com serves), media with the browser headers.
+        # Both keep connections alive so each host costs one handshake per pooled connection
+        # instead of one per request. pool_maxsize should cover the async per-host limit.
+        if pooled_transport:
+            self.page_session = create_pooled_session(pool_maxsize=pool_maxsize)
+            self.session = create_pooled_session(
+                pool_maxsize=pool_maxsize,
+                stats=self.page_session.connection_stats
+            )
+        else:
+            self.page_session = requests
+            self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -31,6 +70,20 @@ class LowheadsCompleteScraper:
             'Upgrade-Insecure-Requests': '1'
         })
         
+        # Re-runs revalidate pages and media against an on-disk cache instead of
+        # downloading them again, and reuse the parse of any page that hasn't changed
+        if use_http_cache:
+            cache = HTTPCache(cache_dir)
+            self.page_session = CachedSession(self.page_session, cache)
+            self.session = CachedSession(self.session, cache)
+        
+        # lowheads.com is a Shopify store, so product data is read from its JSON feeds
+        # and the HTML pages are only parsed for brands the feeds don't cover
+        self.use_shopify_feed = use_shopify_feed
+        self.feed = ShopifyFeed(self.base_url, session=self.page_session)
+        self._vendor_catalog = None
+        self._vendor_catalog_lock = threading.Lock()
+        
         # Complete list of all brands from the website
         self.BRANDS = [
             "5MOREDAYS", "629", "A STONECOLD STUDIOS PRODUCTION", "ABSTRAITE DESIGN", "ACD™",
@@ -70,23 +123,55 @@ class LowheadsCompleteScraper:
             "WORSHIP", "WORSTCASE", "XENON", "YACHTY IN ELIAS", "YAMI MIYAZAKI", "YOURAVGCADET",
             "YOUTH MOVEMENT"
         ]
+        
+        self.extractor = ProductPageExtractor(self.clean_image_url)
+        
+        # Previous snapshot, indexed by product key (see product_key), for incremental re-scrapes
+        self.previous_products: Dict[str, Dict] = {}
+        self.previous_scraped_at = None
+        self.staleness_window = timedelta(days=7)
+        self.unchanged_keys = set()
+        
+        # Media is downloaded by a worker pool while scraping carries on; jobs are
+        # kept in plan order so local paths can be recorded once they've finished
+        self.media_workers = media_workers
+        self.media_queue_size = media_queue_size
+        self.media_pipeline = None
+        # Media files are kept once per content hash and linked into each product folder,
+        # so an image shared between products (or seen on a previous run) is fetched once.
+        # The store is opened with the first media download, so runs without media don't create it
+        self.use_media_store = use_media_store
+        self.media_store_dir = media_store_dir
+        self.media_store = None
+        self.pending_media: List[Tuple[Dict, str, str, concurrent.futures.Future]] = []
+        self._pending_media_lock = threading.Lock()
     
-    def create_brand_urls(self, brand_name: str) -> List[str]:
-        """Generate possible URLs for a brand - handles both direct collections and vendor search"""
-        # Clean the brand name for URL
+    def clean_brand_handle(self, brand_name: str) -> str:
+        """Turn a brand name into a Shopify-style collection handle"""
         clean_name = brand_name.lower()
         clean_name = re.sub(r'[™®©]', '', clean_name)  # Remove trademark symbols
         clean_name = re.sub(r'[^\w\s-]', '', clean_name)  # Remove special chars except hyphen
         clean_name = re.sub(r'\s+', '-', clean_name)  # Replace spaces with hyphens
         clean_name = re.sub(r'-+', '-', clean_name)  # Remove multiple hyphens
-        clean_name = clean_name.strip('-')  # Remove leading/trailing hyphens
+        return clean_name.strip('-')  # Remove leading/trailing hyphens
+    
+    def create_collection_handles(self, brand_name: str) -> List[str]:
+        """Possible direct collection handles for a brand, most likely first"""
+        handles = [
+            self.clean_brand_handle(brand_name),
+            brand_name.lower().replace(' ', '-'),
+            brand_name.lower().replace(' ', ''),
+        ]
+        return list(dict.fromkeys(handles))
+    
+    def create_brand_urls(self, brand_name: str) -> List[str]:
+        """Generate possible URLs for a brand - handles both direct collections and vendor search"""
+        clean_name = self.clean_brand_handle(brand_name)
         
         # Generate multiple URL variations
         urls = [
             # Direct brand collection URLs
-            f"{self.base_url}/collections/{clean_name}",
-            f"{self.base_url}/collections/{brand_name.lower().replace(' ', '-')}",
-            f"{self.base_url}/collections/{brand_name.lower().replace(' ', '')}",
+            *(f"{self.base_url}/collections/{handle}" for handle in self.create_collection_handles(brand_name)),
             
             # Vendor search URLs (for brands that use the vendor search system)
             f"{self.base_url}/collections/vendors?q={quote(brand_name)}",
@@ -104,6 +189,95 @@ class LowheadsCompleteScraper:
         
         return unique_urls
     
+    def load_vendor_catalog(self) -> Dict[str, List[Dict]]:
+        """Fetch the whole store's products.json once and group it by vendor"""
+        with self._vendor_catalog_lock:
+            if self._vendor_catalog is None:
+                catalog = {}
+                try:
+                    print("Loading Shopify product feed...")
+                    feed_products = self.feed.fetch_products()
+                    if feed_products is None:
+                        print("! No product feed available, falling back to HTML")
+                        self.use_shopify_feed = False
+                    for feed_product in feed_products or []:
+                        vendor = (feed_product.get('vendor') or '').strip().upper()
+                        catalog.setdefault(vendor, []).append(feed_product)
+                    print(f"✓ Loaded {sum(len(p) for p in catalog.values())} products from {len(catalog)} vendors")
+                except Exception as e:
+                    print(f"× Error loading product feed, falling back to HTML: {e}")
+                    self.use_shopify_feed = False
+                self._vendor_catalog = catalog
+            return self._vendor_catalog
+    
+    def product_from_feed(self, feed_product: Dict, brand_name: str, product_url: str) -> Dict:
+        """Map a Shopify feed product onto the scraper's product schema"""
+        title = (feed_product.get('title') or '').strip()
+        price = product_price(feed_product)
+        images = []
+        for img_url in product_image_urls(feed_product):
+            clean_url = self.clean_image_url(img_url)
+            if clean_url not in images:
+                images.append(clean_url)
+        
+        product = {
+            'brand': brand_name,
+            'name': title,
+            'price': price,
+            'listing_image': images[0] if images else '',
+            'product_url': product_url,
+            'listing_data_complete': bool(title and product_url),
+            'detailed_data_complete': True,
+            'detailed_name': title or 'Unknown Product',
+            'detailed_price': price,
+            'images': images,
+            'videos': product_video_urls(feed_product),
+            'last_scraped': datetime.now().isoformat(),
+        }
+        
+        description = strip_html(feed_product.get('body_html', ''))
+        if description:
+            product['description'] = description
+        product['brand_metadata'] = self.extract_brand_metadata(description)
+        product['variants'] = product_variant_titles(feed_product)
+        return product
+    
+    def get_feed_products(self, brand_name: str) -> Optional[List[Dict]]:
+        """Products for a brand from the Shopify feeds, or None if the HTML pages must be scraped"""
+        if not self.use_shopify_feed:
+            return None
+        
+        feed_products = self.load_vendor_catalog().get(brand_name.strip().upper())
+        if not self.use_shopify_feed:
+            return None
+        collection = 'vendors'
+        
+        # Brands that aren't vendors (DENIM, STAFF PICKS, ...) are collections
+        if not feed_products:
+            for handle in self.create_collection_handles(brand_name):
+                try:
+                    feed_products = self.feed.fetch_products(handle)
+                except requests.RequestException as e:
+                    print(f"  × Error reading feed for collection {handle}: {e}")
+                    feed_products = None
+                if feed_products:
+                    collection = handle
+                    break
+        
+        if not feed_products:
+            return None
+        
+        products = []
+        for feed_product in feed_products:
+            # A product keeps the URL it was first recorded under (its brand's collection, usually),
+            # so switching between the feed and the HTML pages doesn't show up as a change
+            previous = self.previous_products.get(feed_product['handle'])
+            product_url = (previous or {}).get('product_url') or \
+                f"{self.base_url}/collections/{collection}/products/{feed_product['handle']}"
+            product = self.product_from_feed(feed_product, brand_name, product_url)
+            products.append(self.previous_version(product) or product)
+        return products
+    
     def extract_product_listing_data(self, container, brand_name: str) -> Dict:
         """Extract basic product information from a product listing container"""
         product = {
@@ -156,274 +330,99 @@ class LowheadsCompleteScraper:
         
         return product
     
+    def listing_fingerprint(self, product: Dict) -> str:
+        """Hash of the listing fields whose change means a product page must be scraped again"""
+        key = json.dumps([product.get('name', ''), product.get('price', ''), product.get('listing_image', '')],
+                         ensure_ascii=False)
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def product_key(product: Dict) -> str:
+        """A product's handle, which identifies it across snapshots whatever collection it was found under"""
+        product_url = product.get('product_url') or ''
+        return product_handle_from_url(product_url) or product_url
+    
+    def previous_version(self, listing_data: Dict) -> Optional[Dict]:
+        """The previous snapshot's copy of a product, if its listing is unchanged and it isn't stale"""
+        previous = self.previous_products.get(self.product_key(listing_data))
+        if not previous or not previous.get('detailed_data_complete'):
+            return None
+        if self.listing_fingerprint(previous) != self.listing_fingerprint(listing_data):
+            return None
+        
+        try:
+            last_scraped = datetime.fromisoformat(previous.get('last_scraped') or self.previous_scraped_at)
+        except (TypeError, ValueError):
+            return None
+        if datetime.now() - last_scraped > self.staleness_window:
+            return None
+        
+        self.unchanged_keys.add(self.product_key(listing_data))
+        return dict(previous, brand=listing_data.get('brand', previous.get('brand')))
+    
+    def refresh_product(self, listing_data: Dict, brand_name: str) -> Dict:
+        """Reuse an unchanged product from the previous snapshot, otherwise scrape its page"""
+        previous = self.previous_version(listing_data)
+        if previous:
+            return previous
+        
+        product = self.scrape_product_page(listing_data['product_url'], brand_name, listing_data)
+        product['last_scraped'] = datetime.now().isoformat()
+        return product
+    
     def scrape_product_page(self, product_url: str, brand_name: str, listing_data: Dict) -> Dict:
         """Scrape detailed product information from individual product page"""
         product = listing_data.copy()
         product['detailed_data_complete'] = False
         
         try:
+            # The product's .js document carries the same data without the page around it
+            handle = product_handle_from_url(product_url) if self.use_shopify_feed else None
+            feed_product = None
+            if handle:
+                try:
+                    feed_product = self.feed.fetch_product(handle)
+                except requests.RequestException as e:
+                    print(f"    × Error reading product feed: {e}")
+            if feed_product:
+                detailed = self.product_from_feed(feed_product, brand_name, product_url)
+                for key in ('name', 'price', 'listing_image'):
+                    detailed[key] = listing_data.get(key) or detailed[key]
+                print(f"    ✓ Found {len(detailed['images'])} images and {len(detailed['videos'])} videos in product feed")
+                return detailed
+            
             print(f"    Scraping product page: {product_url}")
-            response = requests.get(product_url, timeout=10)
+            response = self.page_session.get(product_url, timeout=10)
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                            # Get detailed product name
-            name_selectors = [
-                'h1',
-                ('h1', {'class': re.compile(r'product.*title', re.I)}),
-                ('div', {'class': re.compile(r'product.*title', re.I)}),
-            ]
-            
-            for selector in name_selectors:
-                if isinstance(selector, str):
-                    name_elem = soup.find(selector)
-                else:
-                    name_elem = soup.find(*selector)
-                
-                if name_elem:
-                    detailed_name = name_elem.get_text(strip=True)
-                    # Filter out cart-related text
-                    if detailed_name and 'cart' not in detailed_name.lower() and len(detailed_name) > 3:
-                        product['detailed_name'] = detailed_name
-                        break
+                product = self.parse_response('product_page', response, self.parse_product_page, listing_data)
             
-            # If no detailed name found, use the listing name
-            if not product.get('detailed_name') or 'cart' in product.get('detailed_name', '').lower():
-                product['detailed_name'] = product.get('name', 'Unknown Product')
-                
-            # Get detailed price
-            price_selectors = [
-                ('span', {'class': re.compile(r'price', re.I)}),
-                ('div', {'class': re.compile(r'price', re.I)}),
-                ('p', {'class': re.compile(r'price', re.I)}),
-            ]
+        except Exception as e:
+            print(f"    × Error scraping product page: {e}")
+        
+        return product
+    
+    def parse_product_page(self, html: str, listing_data: Dict) -> Dict:
+        """Extract detailed product information from a product page's HTML"""
+        product = listing_data.copy()
+        product['detailed_data_complete'] = False
+        
+        try:
+            soup = make_soup(html, self.parser_backend)
             
-            for tag, attrs in price_selectors:
-                price_elem = soup.find(tag, attrs)
-                if price_elem:
-                    price_text = price_elem.get_text(strip=True)
-                    price_match = re.search(r'[\$£€]?\s*\d+(?:[.,]\d{2})?', price_text)
-                    if price_match:
-                        product['detailed_price'] = price_match.group(0)
-                        break
-                
-                # Get all product images and videos
-                product['images'] = []
-                product['videos'] = []
-                
-                # Find image gallery - comprehensive approach for Lowheads
-                image_selectors = [
-                    ('img', {'class': re.compile(r'product.*image', re.I)}),
-                    ('img', {'class': re.compile(r'gallery.*image', re.I)}),
-                    ('img', {'data-src': True}),
-                    ('img', {'src': re.compile(r'cdn\.shopify\.com', re.I)}),
-                    # Lowheads specific selectors
-                    ('img', {'src': re.compile(r'\.jpg|\.jpeg|\.png|\.webp', re.I)}),
-                    ('img', {'data-src': re.compile(r'\.jpg|\.jpeg|\.png|\.webp', re.I)}),
-                ]
-                
-                for tag, attrs in image_selectors:
-                    images = soup.find_all(tag, attrs)
-                    for img in images:
-                        # Check all possible image sources
-                        img_url = img.get('src') or img.get('data-src') or img.get('data-srcset')
-                        if img_url:
-                            clean_url = self.clean_image_url(img_url)
-                            # Filter out logo images and small icons
-                            if (clean_url not in product['images'] and 
-                                'logo' not in clean_url.lower() and
-                                'icon' not in clean_url.lower() and
-                                len(clean_url) > 20):  # Avoid very short URLs
-                                product['images'].append(clean_url)
-                
-                # Also check for images with responsive-image class (common in Lowheads)
-                responsive_images = soup.find_all('img', class_='responsive-image')
-                for img in responsive_images:
-                    img_url = img.get('src') or img.get('data-src') or img.get('data-srcset')
-                    if img_url:
-                        clean_url = self.clean_image_url(img_url)
-                        if (clean_url not in product['images'] and
-                            'logo' not in clean_url.lower() and
-                            'icon' not in clean_url.lower()):
-                            product['images'].append(clean_url)
-                
-
-                
-                # If no images found with selectors, try to get all images and filter
-                if not product['images']:
-                    all_images = soup.find_all('img')
-                    for img in all_images:
-                        img_url = img.get('src') or img.get('data-src') or img.get('data-srcset')
-                        if img_url:
-                            clean_url = self.clean_image_url(img_url)
-                            # Filter for product images only
-                            if (clean_url not in product['images'] and
-                                'cdn.shopify.com' in clean_url and
-                                'logo' not in clean_url.lower() and
-                                'icon' not in clean_url.lower() and
-                                len(clean_url) > 20):
-                                product['images'].append(clean_url)
-                
-                # Also check for background images in CSS
-                elements_with_bg = soup.find_all(style=re.compile(r'background-image'))
-                for elem in elements_with_bg:
-                    style = elem.get('style', '')
-                    match = re.search(r'url\([\'"]?([^\'"]+)[\'"]?\)', style)
-                    if match:
-                        img_url = self.clean_image_url(match.group(1))
-                        if (img_url not in product['images'] and
-                            'cdn.shopify.com' in img_url and
-                            'logo' not in img_url.lower() and
-                            'icon' not in img_url.lower()):
-                            product['images'].append(img_url)
-                
-                # Check for data attributes that might contain image URLs
-                for elem in soup.find_all(attrs={'data-image': True}):
-                    img_url = elem.get('data-image')
-                    if img_url:
-                        clean_url = self.clean_image_url(img_url)
-                        if clean_url not in product['images']:
-                            product['images'].append(clean_url)
-                
-                # Look for any elements with image-related data attributes
-                for elem in soup.find_all(attrs=re.compile(r'data-.*image')):
-                    for attr_name, attr_value in elem.attrs.items():
-                        if 'image' in attr_name.lower() and attr_value:
-                            img_url = self.clean_image_url(attr_value)
-                            if (img_url not in product['images'] and
-                                'cdn.shopify.com' in img_url):
-                                product['images'].append(img_url)
-                
-                # Find videos
-                video_selectors = [
-                    ('video', {}),
-                    ('source', {'type': re.compile(r'video', re.I)}),
-                    ('iframe', {'src': re.compile(r'youtube|vimeo', re.I)}),
-                ]
-                
-                for tag, attrs in video_selectors:
-                    videos = soup.find_all(tag, attrs)
-                    for video in videos:
-                        video_url = video.get('src') or video.get('data-src')
-                        if video_url:
-                            if video_url not in product['videos']:
-                                product['videos'].append(video_url)
-                
-                # Get product description - improved for Lowheads
-                page_text = soup.get_text()
-                
-                # Look for the specific description pattern we know exists
-                desc_pattern = r'Heavyweight[^.]*?Ships in \d+-\d+ days'
-                desc_match = re.search(desc_pattern, page_text, re.DOTALL | re.IGNORECASE)
-                
-                if desc_match:
-                    product['description'] = desc_match.group(0).strip()
-                else:
-                    # Fallback to element search
-                    desc_selectors = [
-                        ('div', {'class': re.compile(r'product.*description', re.I)}),
-                        ('div', {'class': re.compile(r'description', re.I)}),
-                        ('p', {'class': re.compile(r'description', re.I)}),
-                    ]
-                    
-                    for tag, attrs in desc_selectors:
-                        desc_elem = soup.find(tag, attrs)
-                        if desc_elem:
-                            desc_text = desc_elem.get_text(strip=True)
-                            # Check if it contains description-like content
-                            if any(keyword in desc_text.lower() for keyword in ['heavyweight', 'embroidered', 'cotton', 'print']):
-                                product['description'] = desc_text
-                                break
-                
-                # Get brand metadata (location, shipping, website)
-                product['brand_metadata'] = {}
-                
-                # Look for brand information sections
-                brand_info_selectors = [
-                    ('div', {'class': re.compile(r'brand.*info', re.I)}),
-                    ('div', {'class': re.compile(r'vendor.*info', re.I)}),
-                    ('div', {'class': re.compile(r'seller.*info', re.I)}),
-                    ('div', {'class': re.compile(r'about.*brand', re.I)}),
-                ]
-                
-                for tag, attrs in brand_info_selectors:
-                    brand_elem = soup.find(tag, attrs)
-                    if brand_elem:
-                        # Extract brand metadata from text
-                        brand_text = brand_elem.get_text(strip=True)
-                        
-                        # Look for location
-                        location_match = re.search(r'This Brand Is From - (.+)', brand_text)
-                        if location_match:
-                            product['brand_metadata']['location'] = location_match.group(1).strip()
-                        
-                        # Look for shipping info
-                        shipping_match = re.search(r'This Brand Ships Within - (.+)', brand_text)
-                        if shipping_match:
-                            product['brand_metadata']['shipping_time'] = shipping_match.group(1).strip()
-                        
-                        # Look for website
-                        website_match = re.search(r'About This Brand - (.+)', brand_text)
-                        if website_match:
-                            product['brand_metadata']['website'] = website_match.group(1).strip()
-                        
-                        break
-                
-                # If not found in specific sections, search the entire page
-                if not product['brand_metadata']:
-                    # Look for location
-                    location_match = re.search(r'This Brand Is From - (.+)', page_text)
-                    if location_match:
-                        product['brand_metadata']['location'] = location_match.group(1).strip()
-                    
-                    # Look for shipping info
-                    shipping_match = re.search(r'This Brand Ships Within - (.+)', page_text)
-                    if shipping_match:
-                        product['brand_metadata']['shipping_time'] = shipping_match.group(1).strip()
-                    
-                    # Look for website
-                    website_match = re.search(r'About This Brand - (.+)', page_text)
-                    if website_match:
-                        product['brand_metadata']['website'] = website_match.group(1).strip()
-                
-                # Also look for alternative patterns that might exist
-                if not product['brand_metadata'].get('location'):
-                    # Look for any mention of New York City
-                    nyc_match = re.search(r'[Nn]ew [Yy]ork [Cc]ity', page_text)
-                    if nyc_match:
-                        product['brand_metadata']['location'] = 'New York City'
-                
-                if not product['brand_metadata'].get('website'):
-                    # Look for banishedusa.com
-                    website_match = re.search(r'banishedusa\.com', page_text)
-                    if website_match:
-                        product['brand_metadata']['website'] = 'banishedusa.com'
-                
-                # Get product variants (sizes, colors, etc.)
-                variant_selectors = [
-                    ('select', {'name': re.compile(r'variant', re.I)}),
-                    ('div', {'class': re.compile(r'variant', re.I)}),
-                ]
-                
-                product['variants'] = []
-                for tag, attrs in variant_selectors:
-                    variant_elem = soup.find(tag, attrs)
-                    if variant_elem:
-                        options = variant_elem.find_all('option')
-                        for option in options:
-                            variant_text = option.get_text(strip=True)
-                            if variant_text and variant_text not in ['Select', 'Choose']:
-                                product['variants'].append(variant_text)
-                
-                product['detailed_data_complete'] = True
-                print(f"    ✓ Found {len(product['images'])} images and {len(product['videos'])} videos")
+            # All name, price, media, description, brand and variant rules run in one pass
+            product = self.extractor.extract(soup, listing_data)
+            print(f"    ✓ Found {len(product['images'])} images and {len(product['videos'])} videos")
             
         except Exception as e:
-            print(f"    × Error scraping product page: {e}")
+            print(f"    × Error parsing product page: {e}")
         
         return product
     
+    def extract_brand_metadata(self, text: str) -> Dict:
+        """Read the brand location, shipping time and website lines out of page or description text"""
+        return extract_brand_metadata(text)
+    
     def clean_image_url(self, img_url: str) -> str:
         """Clean and format image URL"""
         # Replace {width} placeholders with actual dimensions
@@ -447,72 +446,83 @@ class LowheadsCompleteScraper:
     def download_media(self, url: str, save_path: str) -> bool:
         """Download and save an image or video"""
         try:
-            response = self.session.get(url, stream=True, timeout=15)
-            response.raise_for_status()
-            
-            os.makedirs(os.path.dirname(save_path), exist_ok=True)
-            
-            with open(save_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-            
-            return True
+            # Files the server reports unchanged are left as they are on disk
+            return download_file(self.session, url, save_path, timeout=15)
         except Exception as e:
             print(f"Error downloading {url}: {e}")
             return False
     
+    def parse_response(self, namespace: str, response, parse_func, *args):
+        """Parse a page's HTML, reusing the cached result when the page hasn't changed"""
+        if isinstance(self.page_session, CachedSession):
+            return self.page_session.parse(namespace, response, parse_func, *args,
+                                           parser_version=self.parser_version)
+        return parse_func(response.text, *args)
+    
+    def parse_brand_listing(self, html: str, brand_name: str) -> List[Dict]:
+        """Extract complete product listings from a brand collection or vendor search page"""
+        soup = make_soup(html, self.parser_backend)
+        
+        # Find product containers
+        product_containers = []
+        
+        # Method 1: Direct class search for type-product-grid-item
+        containers = soup.find_all('div', class_=lambda x: x and 'type-product-grid-item' in x)
+        if containers:
+            product_containers.extend(containers)
+            print(f"    Found {len(containers)} product containers")
+        
+        # Method 2: If no containers found, try other selectors
+        if not product_containers:
+            container_selectors = [
+                ('div', {'class': re.compile(r'product-grid-item', re.I)}),
+                ('div', {'class': re.compile(r'product', re.I)}),
+                ('article', {'class': re.compile(r'product', re.I)}),
+                ('li', {'class': re.compile(r'product', re.I)}),
+            ]
+            
+            for tag, attrs in container_selectors:
+                containers = soup.find_all(tag, attrs)
+                if containers:
+                    product_containers.extend(containers)
+                    print(f"    Found {len(containers)} containers with selector: {tag}, {attrs}")
+                    break
+        
+        listings = []
+        for container in product_containers:
+            listing_data = self.extract_product_listing_data(container, brand_name)
+            if listing_data['listing_data_complete']:
+                listings.append(listing_data)
+        
+        return listings
+    
     def scrape_brand_products(self, brand_name: str, download_media: bool = True) -> List[Dict]:
         """Scrape all products for a specific brand"""
         print(f"Scraping brand: {brand_name}")
+        
+        feed_products = self.get_feed_products(brand_name)
+        if feed_products:
+            print(f"  ✓ Found {len(feed_products)} products for {brand_name} in product feed")
+            if download_media:
+                self.download_brand_media(brand_name, feed_products)
+            return feed_products
+        
         products = []
         urls_to_try = self.create_brand_urls(brand_name)
+        answered = False
         
         for url in urls_to_try:
             try:
                 print(f"  Trying URL: {url}")
-                # Use direct requests instead of session to avoid header issues
-                response = requests.get(url, timeout=10)
+                # Use the page session instead of self.session to avoid header issues
+                response = self.page_session.get(url, timeout=10)
+                answered = answered or response.status_code < 500
                 
                 if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # Find product containers
-                    product_containers = []
-                    
-                    # Method 1: Direct class search for type-product-grid-item
-                    containers = soup.find_all('div', class_=lambda x: x and 'type-product-grid-item' in x)
-                    if containers:
-                        product_containers.extend(containers)
-                        print(f"    Found {len(containers)} product containers")
-                    
-                    # Method 2: If no containers found, try other selectors
-                    if not product_containers:
-                        container_selectors = [
-                            ('div', {'class': re.compile(r'product-grid-item', re.I)}),
-                            ('div', {'class': re.compile(r'product', re.I)}),
-                            ('article', {'class': re.compile(r'product', re.I)}),
-                            ('li', {'class': re.compile(r'product', re.I)}),
-                        ]
-                        
-                        for tag, attrs in container_selectors:
-                            containers = soup.find_all(tag, attrs)
-                            if containers:
-                                product_containers.extend(containers)
-                                print(f"    Found {len(containers)} containers with selector: {tag}, {attrs}")
-                                break
-                    
-                    # Extract basic listing data
-                    for container in product_containers:
-                        listing_data = self.extract_product_listing_data(container, brand_name)
-                        if listing_data['listing_data_complete']:
-                            # Scrape detailed product page
-                            detailed_product = self.scrape_product_page(
-                                listing_data['product_url'], 
-                                brand_name, 
-                                listing_data
-                            )
-                            products.append(detailed_product)
+                    # Extract basic listing data and scrape each detailed product page
+                    for listing_data in self.parse_response('brand_listing', response, self.parse_brand_listing, brand_name):
+                        detailed_product = self.refresh_product(listing_data, brand_name)
+                        products.append(detailed_product)
                     
                     if products:
                         print(f"  ✓ Found {len(products)} products for {brand_name}")
@@ -530,48 +540,106 @@ class LowheadsCompleteScraper:
             
             time.sleep(0.5)  # Be respectful between attempts
         
+        if not answered:
+            raise BrandFetchError(f"No page for {brand_name} could be fetched")
         print(f"  ! No products found for {brand_name}")
         return products
     
-    def download_brand_media(self, brand_name: str, products: List[Dict]):
-        """Download all media for a brand's products"""
-        print(f"    Downloading media for {brand_name}...")
+    def plan_product_media(self, brand_name: str, index: int, product: Dict) -> List[Tuple[str, str, str]]:
+        """List (kind, url, local path) download jobs for one product's listing image, images and videos"""
+        # Products carried over from the previous snapshot already have their media
+        if self.product_key(product) in self.unchanged_keys:
+            return []
         
         # Create brand folder
         clean_brand_name = brand_name.replace('/', '_').replace('\\', '_').replace(':', '_')
         brand_folder = f"downloads/{clean_brand_name}"
         
+        # Get clean product name for folder
+        product_name = product.get('detailed_name', product.get('name', f'product_{index+1}'))
+        # Clean product name for folder path
+        clean_product_name = product_name.replace('/', '_').replace('\\', '_').replace(':', '_').replace('?', '_').replace('*', '_').replace('"', '_').replace('<', '_').replace('>', '_').replace('|', '_')
+        product_folder = f"{brand_folder}/{clean_product_name}"
+        
+        jobs = []
+        if product.get('listing_image'):
+            jobs.append(('listing_image', product['listing_image'], f"{product_folder}/listing_image.jpg"))
+        for j, img_url in enumerate(product.get('images', [])):
+            jobs.append(('image', img_url, f"{product_folder}/image_{j+1}.jpg"))
+        for j, video_url in enumerate(product.get('videos', [])):
+            jobs.append(('video', video_url, f"{product_folder}/video_{j+1}.mp4"))
+        return jobs
+    
+    def record_media_download(self, product: Dict, kind: str, filename: str):
+        """Store the local path of a successfully downloaded media file on its product"""
+        if kind == 'listing_image':
+            product['listing_image_local'] = filename
+        elif kind == 'image':
+            product['images_local'] = product.get('images_local', [])
+            product['images_local'].append(filename)
+        else:
+            product['videos_local'] = product.get('videos_local', [])
+            product['videos_local'].append(filename)
+    
+    def start_media_downloads(self):
+        """Start the worker pool that media jobs are queued on"""
+        if self.media_pipeline is None:
+            if self.use_media_store and self.media_store is None:
+                self.media_store = MediaStore(self.media_store_dir)
+            # The store already remembers every media URL it has fetched, so caching the
+            # bodies in the HTTP cache as well would only keep a second copy of each file
+            session = self.session
+            if self.media_store and isinstance(session, CachedSession):
+                session = session.session
+            self.media_pipeline = MediaDownloadPipeline(
+                session, workers=self.media_workers, max_queue=self.media_queue_size, store=self.media_store
+            )
+            self.media_pipeline.start()
+    
+    def finish_media_downloads(self):
+        """Wait for queued media, then record the local paths of the files that downloaded"""
+        if self.media_pipeline is None:
+            return
+        self.media_pipeline.close()
+        
+        # Record in plan order so local path lists line up with their URL lists
+        with self._pending_media_lock:
+            pending, self.pending_media = self.pending_media, []
+        for product, kind, filename, future in pending:
+            if future.result():
+                self.record_media_download(product, kind, filename)
+        
+        print(f"✓ Media: {self.media_pipeline.format_stats()}")
+        if self.media_store:
+            print(f"✓ Media store: {self.media_store.fetched} fetched, {self.media_store.reused} unchanged since last fetched, "
+                  f"{self.media_store.deduplicated} duplicate downloads folded")
+        self.media_pipeline = None
+    
+    def download_brand_media(self, brand_name: str, products: List[Dict]):
+        """Queue all media for a brand's products on the download pipeline.
+        
+        Inside run_complete_scrape this returns as soon as the jobs are queued;
+        called on its own it waits for the downloads to finish.
+        """
+        standalone = self.media_pipeline is None
+        if standalone:
+            self.start_media_downloads()
+        
+        jobs = []
         for i, product in enumerate(products):
-            # Get clean product name for folder
-            product_name = product.get('detailed_name', product.get('name', f'product_{i+1}'))
-            # Clean product name for folder path
-            clean_product_name = product_name.replace('/', '_').replace('\\', '_').replace(':', '_').replace('?', '_').replace('*', '_').replace('"', '_').replace('<', '_').replace('>', '_').replace('|', '_')
-            product_folder = f"{brand_folder}/{clean_product_name}"
-            
-            print(f"      Creating folder: {product_folder}")
-            
-            # Download listing image
-            if product.get('listing_image'):
-                filename = f"{product_folder}/listing_image.jpg"
-                if self.download_media(product['listing_image'], filename):
-                    product['listing_image_local'] = filename
-                    print(f"        Downloaded listing image: {filename}")
-            
-            # Download product images
-            for j, img_url in enumerate(product.get('images', [])):
-                filename = f"{product_folder}/image_{j+1}.jpg"
-                if self.download_media(img_url, filename):
-                    product['images_local'] = product.get('images_local', [])
-                    product['images_local'].append(filename)
-                    print(f"        Downloaded product image {j+1}: {filename}")
-            
-            # Download videos
-            for j, video_url in enumerate(product.get('videos', [])):
-                filename = f"{product_folder}/video_{j+1}.mp4"
-                if self.download_media(video_url, filename):
-                    product['videos_local'] = product.get('videos_local', [])
-                    product['videos_local'].append(filename)
-                    print(f"        Downloaded video {j+1}: {filename}")
+            planned = self.plan_product_media(brand_name, i, product)
+            if planned:
+                print(f"      Queueing media for: {os.path.dirname(planned[0][2])}")
+            for kind, url, filename in planned:
+                jobs.append((product, kind, filename, self.media_pipeline.submit(url, filename)))
+        
+        with self._pending_media_lock:
+            self.pending_media.extend(jobs)
+        print(f"    Queued {len(jobs)} media files for {brand_name} "
+              f"(queue depth {self.media_pipeline.queue_depth})")
+        
+        if standalone:
+            self.finish_media_downloads()
     
     def save_data_to_json(self, data: Dict, filename: str = 'lowheads_complete_data.json'):
         """Save scraped data to JSON file"""
@@ -622,16 +690,254 @@ class LowheadsCompleteScraper:
         except Exception as e:
             print(f"Error saving CSV: {e}")
     
-    def run_complete_scrape(self, parallel: bool = False, download_media: bool = True):
-        """Run the complete scraping process for all brands"""
+    async def scrape_brand_products_async(self, crawler: AsyncCrawler, brand_name: str,
+                                          download_media: bool = True) -> List[Dict]:
+        """Async version of scrape_brand_products: product pages and media are fetched concurrently"""
+        print(f"Scraping brand: {brand_name}")
+        
+        feed_products = await crawler.call(self.base_url, self.get_feed_products, brand_name)
+        if feed_products:
+            print(f"  ✓ Found {len(feed_products)} products for {brand_name} in product feed")
+            if download_media:
+                await self.download_brand_media_async(crawler, brand_name, feed_products)
+            return feed_products
+        
+        # Brand URLs are fallbacks for each other, so they are still tried in order
+        answered = False
+        for url in self.create_brand_urls(brand_name):
+            try:
+                print(f"  Trying URL: {url}")
+                response = await crawler.fetch(url)
+                answered = answered or response.status_code < 500
+                if response.status_code != 200:
+                    continue
+                
+                listings = self.parse_response('brand_listing', response, self.parse_brand_listing, brand_name)
+                if not listings:
+                    continue
+                
+                products = list(await asyncio.gather(*(
+                    self.refresh_product_async(crawler, listing, brand_name)
+                    for listing in listings
+                )))
+                print(f"  ✓ Found {len(products)} products for {brand_name}")
+                
+                if download_media:
+                    await self.download_brand_media_async(crawler, brand_name, products)
+                
+                return products
+            
+            except requests.RequestException as e:
+                print(f"  × Error accessing {url}: {e}")
+            except Exception as e:
+                print(f"  × Unexpected error for {url}: {e}")
+        
+        if not answered:
+            raise BrandFetchError(f"No page for {brand_name} could be fetched")
+        print(f"  ! No products found for {brand_name}")
+        return []
+    
+    async def refresh_product_async(self, crawler: AsyncCrawler, listing_data: Dict, brand_name: str) -> Dict:
+        """Async version of refresh_product; unchanged products don't take a crawler slot"""
+        previous = self.previous_version(listing_data)
+        if previous:
+            return previous
+        return await crawler.call(listing_data['product_url'], self.refresh_product, listing_data, brand_name)
+    
+    async def download_brand_media_async(self, crawler: AsyncCrawler, brand_name: str, products: List[Dict]):
+        """Download all media for a brand's products on the pipeline, each file under its host's crawler limits.
+        
+        Media is fetched through crawler.call like the pages are, so the per-host cap and
+        politeness delay also cover images and videos served from the store's host or CDN.
+        """
+        standalone = self.media_pipeline is None
+        if standalone:
+            self.start_media_downloads()
+        
+        planned_jobs = []
+        for i, product in enumerate(products):
+            planned = self.plan_product_media(brand_name, i, product)
+            if planned:
+                print(f"      Queueing media for: {os.path.dirname(planned[0][2])}")
+            planned_jobs.extend((product, kind, url, filename) for kind, url, filename in planned)
+        
+        futures = await asyncio.gather(*(
+            crawler.call(url, self.download_on_pipeline, url, filename)
+            for _, _, url, filename in planned_jobs
+        ))
+        with self._pending_media_lock:
+            self.pending_media.extend(
+                (product, kind, filename, future)
+                for (product, kind, _, filename), future in zip(planned_jobs, futures)
+            )
+        print(f"    Finished {len(planned_jobs)} media downloads for {brand_name}")
+        
+        if standalone:
+            self.finish_media_downloads()
+    
+    def download_on_pipeline(self, url: str, filename: str) -> concurrent.futures.Future:
+        """Queue one download on the media pipeline and wait for it; returns its finished Future"""
+        future = self.media_pipeline.submit(url, filename)
+        concurrent.futures.wait([future])
+        return future
+    
+    async def scrape_all_brands_async(self, download_media: bool = True, max_concurrency: int = 16,
+                                      per_host_limit: int = 4, politeness_delay: float = 0.25) -> Dict:
+        """Crawl every brand at once under per-host concurrency and politeness limits"""
+        async with AsyncCrawler(fetch=partial(self.page_session.get, timeout=10),
+                                max_concurrency=max_concurrency, per_host_limit=per_host_limit,
+                                politeness_delay=politeness_delay) as crawler:
+            # Load the store-wide feed once up front rather than having every brand wait on it
+            if self.use_shopify_feed:
+                await crawler.call(self.base_url, self.load_vendor_catalog)
+            results = await asyncio.gather(*(
+                self.scrape_brand_products_async(crawler, brand, download_media)
+                for brand in self.BRANDS
+            ), return_exceptions=True)
+            print(f"\nAsync crawl made {crawler.requests_made} requests")
+        
+        brands = {}
+        for brand, result in zip(self.BRANDS, results):
+            if isinstance(result, Exception):
+                print(f"Failed: {brand} - {result}")
+                brands[brand] = {
+                    'product_count': 0,
+                    'products': [],
+                    'error': str(result)
+                }
+            else:
+                brands[brand] = {
+                    'product_count': len(result),
+                    'products': result
+                }
+        return brands
+    
+    def load_previous_snapshot(self, filename: str = 'lowheads_complete_data.json') -> bool:
+        """Index the products of a previous scrape by product key for an incremental run"""
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"! No previous snapshot loaded from {filename} ({e}), scraping everything")
+            return False
+        
+        self.previous_scraped_at = snapshot.get('scraped_at')
+        self.previous_products = {}
+        for brand_name, brand_data in snapshot.get('brands', {}).items():
+            for product in brand_data.get('products', []):
+                if product.get('product_url'):
+                    self.previous_products[self.product_key(product)] = dict(product, brand=product.get('brand', brand_name))
+        self.unchanged_keys = set()
+        
+        print(f"✓ Loaded {len(self.previous_products)} products from previous snapshot ({self.previous_scraped_at})")
+        return True
+    
+    def content_fingerprint(self, product: Dict) -> str:
+        """Hash of a product's scraped content, ignoring local paths and bookkeeping fields"""
+        content = {
+            key: value for key, value in product.items()
+            if not key.endswith('_local') and key not in ('last_scraped', 'detailed_data_complete')
+        }
+        return hashlib.sha1(json.dumps(content, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+    
+    def carry_over_failed_brands(self, data: Dict):
+        """Keep the previous snapshot's products for brands that errored out this run"""
+        for brand_name, brand_data in data['brands'].items():
+            if not brand_data.get('error') or brand_data['products']:
+                continue
+            previous = [product for product in self.previous_products.values() if product.get('brand') == brand_name]
+            if previous:
+                print(f"! {brand_name} failed ({brand_data['error']}), keeping its {len(previous)} products from the previous snapshot")
+                brand_data['products'] = previous
+                brand_data['product_count'] = len(previous)
+    
+    def build_delta(self, data: Dict) -> Dict:
+        """Compare a finished scrape with the previous snapshot: added, changed and removed products"""
+        current = {}
+        failed_brands = set()
+        for brand_name, brand_data in data['brands'].items():
+            if brand_data.get('error'):
+                failed_brands.add(brand_name)
+            for product in brand_data['products']:
+                if product.get('product_url'):
+                    current[self.product_key(product)] = product
+        
+        added, changed = [], []
+        for key, product in current.items():
+            previous = self.previous_products.get(key)
+            if previous is None:
+                added.append(product)
+            elif key not in self.unchanged_keys and self.content_fingerprint(previous) != self.content_fingerprint(product):
+                changed.append({
+                    'product_url': product['product_url'],
+                    'brand': product.get('brand', ''),
+                    'changed_fields': sorted(
+                        key for key in set(previous) | set(product)
+                        if not key.endswith('_local') and key not in ('last_scraped', 'detailed_data_complete')
+                        and previous.get(key) != product.get(key)
+                    ),
+                    'product': product
+                })
+        
+        # Brands that errored out this run can't tell us what was removed
+        removed = [
+            product for key, product in self.previous_products.items()
+            if key not in current and product.get('brand') not in failed_brands
+        ]
+        
+        return {
+            'generated_at': datetime.now().isoformat(),
+            'previous_scraped_at': self.previous_scraped_at,
+            'scraped_at': data['scraped_at'],
+            'unchanged_count': len(self.unchanged_keys & set(current)),
+            'added_count': len(added),
+            'changed_count': len(changed),
+            'removed_count': len(removed),
+            'added': added,
+            'changed': changed,
+            'removed': removed
+        }
+    
+    def run_complete_scrape(self, parallel: bool = False, download_media: bool = True,
+                            async_crawl: bool = False, max_concurrency: int = 16,
+                            per_host_limit: int = 4, politeness_delay: float = 0.25,
+                            incremental: bool = False, staleness_days: float = 7,
+                            snapshot_file: str = 'lowheads_complete_data.json',
+                            delta_file: str = 'lowheads_delta.json'):
+        """Run the complete scraping process for all brands
+        
+        async_crawl fetches collection and product pages and media for all brands
+        concurrently, capped at per_host_limit requests in flight per host and
+        spaced at least politeness_delay seconds apart per host.
+        
+        With download_media, images and videos are queued on a pool of media_workers
+        download threads as each brand is scraped, and waited for before saving.
+        
+        incremental loads the previous snapshot and only scrapes product pages whose
+        listing (name, price, listing image) changed or that were last scraped more
+        than staleness_days ago; the rest are carried over with their media. The
+        added, changed and removed products are written to delta_file. Brands whose
+        pages couldn't be fetched keep their previous products (and their 'error')
+        rather than showing up as removed.
+        """
         print("=" * 60)
         print("LOWHEADS COMPLETE BRAND SCRAPER")
         print("=" * 60)
         print(f"Starting scrape of {len(self.BRANDS)} brands...")
         print(f"Download media: {download_media}")
+        print(f"Incremental: {incremental}")
         print(f"Timestamp: {datetime.now().isoformat()}")
         print("=" * 60)
         
+        self.previous_products = {}
+        self.unchanged_keys = set()
+        if incremental:
+            self.staleness_window = timedelta(days=staleness_days)
+            incremental = self.load_previous_snapshot(snapshot_file)
+        
+        if download_media:
+            self.start_media_downloads()
+        
         all_data = {
             'scraped_at': datetime.now().isoformat(),
             'total_brands': len(self.BRANDS),
@@ -639,7 +945,14 @@ class LowheadsCompleteScraper:
             'brands': {}
         }
         
-        if parallel:
+        if async_crawl:
+            all_data['brands'] = asyncio.run(self.scrape_all_brands_async(
+                download_media=download_media,
+                max_concurrency=max_concurrency,
+                per_host_limit=per_host_limit,
+                politeness_delay=politeness_delay
+            ))
+        elif parallel:
             # Parallel processing for faster scraping
             with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
                 future_to_brand = {
@@ -667,23 +980,47 @@ class LowheadsCompleteScraper:
             # Sequential processing
             for i, brand in enumerate(self.BRANDS, 1):
                 print(f"\n[{i}/{len(self.BRANDS)}] Processing: {brand}")
-                products = self.scrape_brand_products(brand, download_media)
-                
-                all_data['brands'][brand] = {
-                    'product_count': len(products),
-                    'products': products
-                }
+                try:
+                    products = self.scrape_brand_products(brand, download_media)
+                    all_data['brands'][brand] = {
+                        'product_count': len(products),
+                        'products': products
+                    }
+                except Exception as e:
+                    print(f"  × Failed: {brand} - {e}")
+                    all_data['brands'][brand] = {
+                        'product_count': 0,
+                        'products': [],
+                        'error': str(e)
+                    }
                 
                 # Rate limiting
                 time.sleep(1)
         
+        if download_media:
+            print("\nWaiting for media downloads to finish...")
+            self.finish_media_downloads()
+        
+        if incremental:
+            self.carry_over_failed_brands(all_data)
+        
         # Save data in multiple formats
-        self.save_data_to_json(all_data)
+        self.save_data_to_json(all_data, snapshot_file)
         self.save_data_to_csv(all_data)
         
+        if incremental:
+            delta = self.build_delta(all_data)
+            self.save_data_to_json(delta, delta_file)
+            print(f"Delta: {delta['added_count']} added, {delta['changed_count']} changed, "
+                  f"{delta['removed_count']} removed, {delta['unchanged_count']} unchanged")
+        
         # Print summary
         self.print_summary(all_data)
         
+        if isinstance(self.page_session, CachedSession):
+            cache = self.page_session.cache
+            print(f"HTTP cache: {cache.revalidated} unchanged (304), {cache.hits} fresh, {cache.misses} fetched")
+        
         return all_data
     
     def print_summary(self, data: Dict):
@@ -737,12 +1074,22 @@ def main():
     
     # Configuration
     PARALLEL_SCRAPING = False  # Set to True for faster scraping (be careful with rate limits)
+    ASYNC_CRAWL = False        # Set to True to crawl all brands concurrently with per-host limits
+    PER_HOST_LIMIT = 4         # Max requests in flight per host in async mode
+    POLITENESS_DELAY = 0.25    # Min seconds between request starts to the same host in async mode
     DOWNLOAD_MEDIA = True      # Set to True to download all product images and videos
+    INCREMENTAL = False        # Set to True to only re-scrape products changed since the last snapshot
+    STALENESS_DAYS = 7         # In incremental mode, re-scrape unchanged products older than this
     
     # Run the complete scrape
     data = scraper.run_complete_scrape(
         parallel=PARALLEL_SCRAPING,
-        download_media=DOWNLOAD_MEDIA
+        download_media=DOWNLOAD_MEDIA,
+        async_crawl=ASYNC_CRAWL,
+        per_host_limit=PER_HOST_LIMIT,
+        politeness_delay=POLITENESS_DELAY,
+        incremental=INCREMENTAL,
+        staleness_days=STALENESS_DAYS
     )
     
     print("\nScraping completed successfully!")
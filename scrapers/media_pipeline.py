@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Media Download Pipeline
+A bounded queue of media downloads drained by a pool of worker threads, so
+scrapers can hand off images and videos and keep scraping while the files
+stream to disk
+"""
+
+import queue
+import threading
+import time
+import concurrent.futures
+from typing import Callable, Dict, Optional
+
+from http_cache import download_file
+
+DEFAULT_CHUNK_SIZE = 256 * 1024
+_STOP = object()
+
+
+class MediaDownloadPipeline:
+    """Downloads queued (url, path) jobs on ``workers`` threads.
+
+    At most ``max_queue`` jobs wait in the queue; submit() blocks once it is
+    full so a fast scraper can't run arbitrarily far ahead of the downloads.
+    Files are streamed in ``chunk_size`` chunks to a temporary file and
+    renamed into place (see http_cache.download_file), or, given a
+    MediaStore, fetched into the store once per URL and linked into place.
+    Each submit() returns a Future that resolves to True or False.
+    Throughput and queue depth are printed every ``report_interval`` seconds
+    while jobs are running.
+    """
+
+    def __init__(self, session, workers: int = 8, max_queue: int = 256,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, timeout: int = 15,
+                 report_interval: Optional[float] = 10.0, store=None):
+        self.session = session
+        self.store = store
+        self.workers = workers
+        self.max_queue = max_queue
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.report_interval = report_interval
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._started_at = None
+        self._last_report = 0.0
+        self.bytes_downloaded = 0
+        self.files_downloaded = 0
+        self.files_failed = 0
+        self.peak_queue_depth = 0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def start(self):
+        if self._threads:
+            return
+        self._started_at = self._last_report = time.monotonic()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"media-download-{i+1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, url: str, save_path: str,
+               on_done: Optional[Callable[[bool], None]] = None) -> concurrent.futures.Future:
+        """Queue a download, waiting for room if the queue is full"""
+        if not self._threads:
+            self.start()
+        future = concurrent.futures.Future()
+        self._queue.put((url, save_path, on_done, future))
+        with self._lock:
+            self.peak_queue_depth = max(self.peak_queue_depth, self._queue.qsize())
+        return future
+
+    def join(self):
+        """Wait for every queued job to finish"""
+        self._queue.join()
+
+    def close(self):
+        """Finish the queued jobs and stop the workers"""
+        if not self._threads:
+            return
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _add_bytes(self, count: int):
+        with self._lock:
+            self.bytes_downloaded += count
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is _STOP:
+                    return
+                url, save_path, on_done, future = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    if self.store:
+                        self.store.fetch(self.session, url, save_path, timeout=self.timeout,
+                                         chunk_size=self.chunk_size, progress=self._add_bytes)
+                    else:
+                        download_file(self.session, url, save_path, timeout=self.timeout,
+                                      chunk_size=self.chunk_size, progress=self._add_bytes)
+                    ok = True
+                except Exception as e:
+                    print(f"Error downloading {url}: {e}")
+                    ok = False
+
+                with self._lock:
+                    if ok:
+                        self.files_downloaded += 1
+                    else:
+                        self.files_failed += 1
+                if on_done:
+                    on_done(ok)
+                future.set_result(ok)
+                self._maybe_report()
+            finally:
+                self._queue.task_done()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+            return {
+                'files_downloaded': self.files_downloaded,
+                'files_failed': self.files_failed,
+                'bytes_downloaded': self.bytes_downloaded,
+                'elapsed': elapsed,
+                'bytes_per_second': self.bytes_downloaded / elapsed if elapsed else 0.0,
+                'queue_depth': self._queue.qsize(),
+                'peak_queue_depth': self.peak_queue_depth,
+            }
+
+    def format_stats(self) -> str:
+        stats = self.stats()
+        return (f"{stats['files_downloaded']} files ({stats['files_failed']} failed), "
+                f"{stats['bytes_downloaded'] / 1e6:.1f} MB at {stats['bytes_per_second'] / 1e6:.2f} MB/s, "
+                f"queue {stats['queue_depth']}/{self.max_queue} (peak {stats['peak_queue_depth']})")
+
+    def _maybe_report(self):
+        if not self.report_interval:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_report < self.report_interval:
+                return
+            self._last_report = now
+        print(f"    Media: {self.format_stats()}")
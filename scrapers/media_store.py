@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Media Store
+Keeps one copy of every media file under its SHA-256 and exposes it at the
+usual downloads/ paths as hardlinks (or reflinks/copies where links aren't
+possible), so the same image saved for several products or posts takes the
+space of one and a URL that has been downloaded once is only revalidated
+(a conditional request answered by a 304) instead of fetched again
+
+Run directly to fold an existing downloads tree into the store:
+    python media_store.py downloads
+"""
+
+import os
+import sys
+import time
+import shutil
+import sqlite3
+import hashlib
+import threading
+from typing import Callable, Dict, Optional
+
+# Kept outside downloads/ so the migration and indexing walks never see the objects
+DEFAULT_STORE_DIR = '.media_store'
+# Fetches of the same URL are serialized on one of this many locks
+URL_LOCK_STRIPES = 64
+MEDIA_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif', '.mp4', '.mov', '.avi')
+_FICLONE = 0x40049409  # Linux ioctl that makes a copy-on-write clone (btrfs, XFS)
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _reflink(src: str, dst: str) -> bool:
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(src, 'rb') as s, open(dst, 'wb') as d:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+        return True
+    except OSError:
+        if os.path.exists(dst):
+            os.remove(dst)
+        return False
+
+
+def link_or_copy(src: str, dst: str) -> str:
+    """Make dst a view of src without duplicating its data where the filesystem allows.
+
+    Tries a hardlink, then a reflink, then falls back to a plain copy, and
+    returns which one was used. dst is replaced atomically if it exists.
+    """
+    directory = os.path.dirname(dst)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        return 'hardlink'
+
+    temp_path = f"{dst}.link-{os.getpid()}-{threading.get_ident()}"
+    try:
+        os.link(src, temp_path)
+        method = 'hardlink'
+    except OSError:
+        if _reflink(src, temp_path):
+            method = 'reflink'
+        else:
+            shutil.copy2(src, temp_path)
+            method = 'copy'
+    os.replace(temp_path, dst)
+    return method
+
+
+class MediaStore:
+    """SHA-256 keyed object store with a URL index, safe to share between threads.
+
+    Objects live at ``<store_dir>/objects/<hash[:2]>/<hash>``; the SQLite
+    index maps each fetched URL to the object it produced and the ETag and
+    Last-Modified it came with, which fetch() uses to revalidate the URL.
+    """
+
+    def __init__(self, store_dir: str = DEFAULT_STORE_DIR):
+        self.store_dir = store_dir
+        self.objects_dir = os.path.join(store_dir, 'objects')
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.fetched = 0
+        self.reused = 0
+        self.deduplicated = 0
+
+        self._lock = threading.Lock()
+        self._url_locks = [threading.Lock() for _ in range(URL_LOCK_STRIPES)]
+        self._db = sqlite3.connect(os.path.join(store_dir, 'index.sqlite3'), check_same_thread=False)
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT,
+                size INTEGER,
+                fetched_at REAL,
+                etag TEXT,
+                last_modified TEXT
+            )
+        ''')
+        columns = [row[1] for row in self._db.execute('PRAGMA table_info(urls)')]
+        for column in ('etag', 'last_modified'):
+            if column not in columns:
+                self._db.execute(f'ALTER TABLE urls ADD COLUMN {column} TEXT')
+        self._db.commit()
+
+    def object_path(self, content_hash: str) -> str:
+        return os.path.join(self.objects_dir, content_hash[:2], content_hash)
+
+    def has_object(self, content_hash: str) -> bool:
+        return os.path.exists(self.object_path(content_hash))
+
+    def hash_for_url(self, url: str) -> Optional[str]:
+        """The content hash a URL was stored under, if its object is still present"""
+        entry = self.url_entry(url)
+        return entry['content_hash'] if entry else None
+
+    def url_entry(self, url: str) -> Optional[Dict[str, Optional[str]]]:
+        """The content hash and validators a URL was stored with, if its object is still present"""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT content_hash, etag, last_modified FROM urls WHERE url = ?', (url,)
+            ).fetchone()
+        if row and self.has_object(row[0]):
+            return {'content_hash': row[0], 'etag': row[1], 'last_modified': row[2]}
+        return None
+
+    def remember_url(self, url: str, content_hash: str, etag: Optional[str] = None,
+                     last_modified: Optional[str] = None):
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO urls (url, content_hash, size, fetched_at, etag, last_modified) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (url, content_hash, os.path.getsize(self.object_path(content_hash)), time.time(),
+                 etag, last_modified)
+            )
+            self._db.commit()
+
+    def _adopt(self, temp_path: str, content_hash: str):
+        """Move a file into the store as content_hash unless that object already exists"""
+        path = self.object_path(content_hash)
+        if os.path.exists(path):
+            os.remove(temp_path)
+            with self._lock:
+                self.deduplicated += 1
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(temp_path, path)
+
+    def add_file(self, path: str) -> str:
+        """Fold an existing file into the store, leaving a link to the stored object at path"""
+        content_hash = file_sha256(path)
+        stored = self.object_path(content_hash)
+        if os.path.exists(stored):
+            if not os.path.samefile(path, stored):
+                with self._lock:
+                    self.deduplicated += 1
+        else:
+            os.makedirs(os.path.dirname(stored), exist_ok=True)
+            try:
+                os.link(path, stored)
+            except OSError:
+                shutil.copy2(path, stored)
+        link_or_copy(stored, path)
+        return content_hash
+
+    def fetch(self, session, url: str, save_path: str, timeout: int = 15, chunk_size: int = 256 * 1024,
+              progress: Optional[Callable[[int], None]] = None) -> str:
+        """Put url's content at save_path, downloading it only if it changed since the store last saw it.
+
+        A URL fetched before is revalidated with the ETag/Last-Modified it
+        was stored with; a 304 links the stored object. Concurrent fetches
+        of the same URL wait for the first one instead of downloading it
+        again. Returns the content hash; errors are raised to the caller.
+        """
+        url_lock = self._url_locks[hash(url) % URL_LOCK_STRIPES]
+        with url_lock:
+            return self._fetch(session, url, save_path, timeout, chunk_size, progress)
+
+    def _fetch(self, session, url: str, save_path: str, timeout: int, chunk_size: int,
+               progress: Optional[Callable[[int], None]]) -> str:
+        entry = self.url_entry(url)
+        headers = {}
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        response = session.get(url, stream=True, timeout=timeout, headers=headers)
+        try:
+            if response.status_code == 304 and entry:
+                with self._lock:
+                    self.reused += 1
+                link_or_copy(self.object_path(entry['content_hash']), save_path)
+                return entry['content_hash']
+            response.raise_for_status()
+            temp_path = os.path.join(self.store_dir, f"incoming-{os.getpid()}-{threading.get_ident()}")
+            digest = hashlib.sha256()
+            try:
+                with open(temp_path, 'wb', buffering=chunk_size) as f:
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        if chunk:
+                            f.write(chunk)
+                            digest.update(chunk)
+                            if progress:
+                                progress(len(chunk))
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        finally:
+            response.close()
+
+        content_hash = digest.hexdigest()
+        self._adopt(temp_path, content_hash)
+        self.remember_url(url, content_hash, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        with self._lock:
+            self.fetched += 1
+        link_or_copy(self.object_path(content_hash), save_path)
+        return content_hash
+
+    def dedupe_tree(self, root: str) -> Dict[str, int]:
+        """Fold every media file under root into the store; returns file and byte counts"""
+        stats = {'files': 0, 'unique': 0, 'bytes_before': 0, 'bytes_after': 0}
+        seen = set()
+        store_root = os.path.abspath(self.store_dir)
+        for dirpath, dirnames, filenames in os.walk(root):
+            if os.path.abspath(dirpath).startswith(store_root):
+                dirnames[:] = []
+                continue
+            for name in filenames:
+                if not name.lower().endswith(MEDIA_EXTENSIONS):
+                    continue
+                path = os.path.join(dirpath, name)
+                size = os.path.getsize(path)
+                content_hash = self.add_file(path)
+                stats['files'] += 1
+                stats['bytes_before'] += size
+                if content_hash not in seen:
+                    seen.add(content_hash)
+                    stats['unique'] += 1
+                    stats['bytes_after'] += size
+        return stats
+
+
+def main():
+    root = sys.argv[1] if len(sys.argv) > 1 else 'downloads'
+    store = MediaStore()
+    print(f"Folding media under {root} into {store.store_dir}...")
+    stats = store.dedupe_tree(root)
+    print(f"✓ {stats['files']} files, {stats['unique']} unique")
+    print(f"✓ {stats['bytes_before'] / 1e6:.1f} MB of media now stored in {stats['bytes_after'] / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
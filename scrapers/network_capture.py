@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Browser Network Capture
+Reads the JSON responses a Chrome page fetched (Instagram's web_profile_info,
+feed and GraphQL calls) out of chromedriver's performance log, so a Selenium
+scraper can take profiles and posts from the data the page already loaded
+instead of polling the DOM and opening every post
+"""
+
+import re
+import json
+import base64
+import logging
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from instagram_client import parse_feed_post
+from instagram_engine import GraphQLBackend
+
+# XHR/fetch responses worth reading; everything else in the log is skipped
+CAPTURE_URL_PATTERN = re.compile(r'/api/v1/|/graphql')
+CAPTURE_RESOURCE_TYPES = ('XHR', 'Fetch')
+# Instagram prefixes some JSON with this to stop it being run as a script
+JSON_GUARD = 'for (;;);'
+
+
+def enable_performance_log(options):
+    """Ask chromedriver to keep the DevTools network events that NetworkCapture reads"""
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    return options
+
+
+def _walk(data) -> Iterator[Dict]:
+    if isinstance(data, dict):
+        yield data
+        for value in data.values():
+            yield from _walk(value)
+    elif isinstance(data, list):
+        for value in data:
+            yield from _walk(value)
+
+
+def find_posts(payload) -> List[Dict]:
+    """Every post in a captured response, in the order it appears, in the post_data.json shape.
+
+    Understands both the mobile feed item (``code``, ``image_versions2``)
+    and the GraphQL timeline node (``shortcode``, ``display_url``), which
+    between them cover web_profile_info, the feed API and the web
+    timeline queries. A post's own children (carousel items) are not
+    reported separately.
+    """
+    posts = []
+
+    def visit(data):
+        if isinstance(data, dict):
+            if data.get('code') and ('image_versions2' in data or 'carousel_media' in data
+                                     or 'video_versions' in data):
+                posts.append(parse_feed_post(data))
+                return
+            if data.get('shortcode') and ('display_url' in data or 'video_url' in data):
+                posts.append(GraphQLBackend.parse_post(data))
+                return
+            for value in data.values():
+                visit(value)
+        elif isinstance(data, list):
+            for value in data:
+                visit(value)
+
+    visit(payload)
+    return posts
+
+
+def find_profile(payload, username: str) -> Optional[Dict]:
+    """username's profile summary, if the response carries it"""
+    for data in _walk(payload):
+        if str(data.get('username', '')).lower() != username.lower() or 'profile_pic_url' not in data:
+            continue
+        if 'edge_followed_by' not in data and 'follower_count' not in data:
+            continue
+        return {
+            'username': username,
+            'full_name': data.get('full_name', ''),
+            'bio': data.get('biography', ''),
+            'profile_pic_url': data.get('profile_pic_url', ''),
+            'profile_pic_url_hd': data.get('profile_pic_url_hd', '')
+            or (data.get('hd_profile_pic_url_info') or {}).get('url', ''),
+            'followers': data.get('edge_followed_by', {}).get('count', data.get('follower_count', 0)),
+            'posts_count': data.get('edge_owner_to_timeline_media', {}).get('count', data.get('media_count')),
+            'is_private': data.get('is_private', False)
+        }
+    return None
+
+
+def has_more_posts(payload) -> Optional[bool]:
+    """Whether the timeline in a response has another page (None if it says nothing about paging)"""
+    more = None
+    for data in _walk(payload):
+        if 'more_available' in data:
+            more = bool(data['more_available'])
+        elif isinstance(data.get('page_info'), dict) and 'has_next_page' in data['page_info']:
+            more = bool(data['page_info']['has_next_page'])
+    return more
+
+
+class NetworkCapture:
+    """Collects the JSON bodies of a driver's XHR/fetch responses as they finish loading.
+
+    The driver must have been started with enable_performance_log().
+    responses() reads the log entries that arrived since the last call,
+    so call clear() before a navigation whose responses should stand on
+    their own. Bodies are fetched with Network.getResponseBody while
+    Chrome still holds them; responses that aren't JSON are dropped.
+    """
+
+    def __init__(self, driver, url_pattern=CAPTURE_URL_PATTERN, logger=None):
+        self.driver = driver
+        self.url_pattern = url_pattern
+        self.logger = logger or logging.getLogger(__name__)
+        self._pending: Dict[str, str] = {}
+        self.responses_captured = 0
+
+    def clear(self):
+        """Forget everything logged so far"""
+        self.driver.get_log('performance')
+        self._pending.clear()
+
+    def responses(self) -> List[Tuple[str, object]]:
+        """(url, parsed JSON) for each matching response finished since the last call"""
+        captured = []
+        for entry in self.driver.get_log('performance'):
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            method = message.get('method')
+            params = message.get('params', {})
+
+            if method == 'Network.responseReceived':
+                url = params.get('response', {}).get('url', '')
+                if params.get('type') in CAPTURE_RESOURCE_TYPES and self.url_pattern.search(url):
+                    self._pending[params['requestId']] = url
+            elif method == 'Network.loadingFailed':
+                self._pending.pop(params.get('requestId'), None)
+            elif method == 'Network.loadingFinished' and params.get('requestId') in self._pending:
+                url = self._pending.pop(params['requestId'])
+                payload = self._response_json(params['requestId'], url)
+                if payload is not None:
+                    captured.append((url, payload))
+
+        self.responses_captured += len(captured)
+        return captured
+
+    def _response_json(self, request_id: str, url: str):
+        try:
+            result = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except Exception as e:
+            self.logger.debug(f"No body for {url}: {e}")
+            return None
+
+        body = result.get('body', '')
+        if result.get('base64Encoded'):
+            body = base64.b64decode(body).decode('utf-8', errors='replace')
+        body = body.strip()
+        if body.startswith(JSON_GUARD):
+            body = body[len(JSON_GUARD):]
+        try:
+            return json.loads(body)
+        except ValueError:
+            return None
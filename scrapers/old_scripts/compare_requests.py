@@ -4,8 +4,12 @@ Compare requests between debug script and scraper
 """
 
 import requests
-from bs4 import BeautifulSoup
 from lowheads_scraper_improved import LowheadsImprovedScraper
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from html_parsing import make_soup
 
 def compare_requests():
     """Compare requests between debug script and scraper"""
@@ -18,7 +22,7 @@ def compare_requests():
     print(f"Status: {response1.status_code}")
     print(f"Content length: {len(response1.text)}")
     
-    soup1 = BeautifulSoup(response1.text, 'html.parser')
+    soup1 = make_soup(response1.text)
     containers1 = soup1.find_all('div', class_=lambda x: x and 'type-product-grid-item' in x)
     print(f"Containers found: {len(containers1)}")
     
@@ -29,7 +33,7 @@ def compare_requests():
     print(f"Status: {response2.status_code}")
     print(f"Content length: {len(response2.text)}")
     
-    soup2 = BeautifulSoup(response2.text, 'html.parser')
+    soup2 = make_soup(response2.text)
     containers2 = soup2.find_all('div', class_=lambda x: x and 'type-product-grid-item' in x)
     print(f"Containers found: {len(containers2)}")
     
@@ -4,8 +4,12 @@ Debug script for Lowheads scraper
 """
 
 import requests
-from bs4 import BeautifulSoup
 import re
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from html_parsing import make_soup
 
 def debug_brand_page(brand_name: str):
     """Debug a specific brand page"""
@@ -20,7 +24,7 @@ def debug_brand_page(brand_name: str):
         print(f"Status code: {response.status_code}")
         
         if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text)
             
             # Check page title
             title = soup.title.string if soup.title else "No title"
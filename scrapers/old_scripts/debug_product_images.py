@@ -4,8 +4,12 @@ Debug script to see what images are on product pages
 """
 
 import requests
-from bs4 import BeautifulSoup
 import re
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from html_parsing import make_soup
 
 def debug_product_images():
     """Debug image extraction from product page"""
@@ -16,7 +20,7 @@ def debug_product_images():
     try:
         response = requests.get(url, timeout=10)
         if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text)
             
             print(f"\nPage title: {soup.title.string if soup.title else 'No title'}")
             
@@ -4,8 +4,12 @@ Final test to identify the issue with the scraper
 """
 
 import requests
-from bs4 import BeautifulSoup
 from lowheads_complete_scraper import LowheadsCompleteScraper
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from html_parsing import make_soup
 
 def final_test():
     """Test with exact same approach as debug script"""
@@ -19,7 +23,7 @@ def final_test():
     response1 = requests.get(url, timeout=10)
     print(f"Status: {response1.status_code}")
     
-    soup1 = BeautifulSoup(response1.text, 'html.parser')
+    soup1 = make_soup(response1.text)
     containers1 = soup1.find_all('div', class_=lambda x: x and 'type-product-grid-item' in x)
     print(f"Containers found: {len(containers1)}")
     
@@ -29,7 +33,7 @@ def final_test():
     response2 = scraper.session.get(url, timeout=10)
     print(f"Status: {response2.status_code}")
     
-    soup2 = BeautifulSoup(response2.text, 'html.parser')
+    soup2 = make_soup(response2.text)
     containers2 = soup2.find_all('div', class_=lambda x: x and 'type-product-grid-item' in x)
     print(f"Containers found: {len(containers2)}")
     
@@ -11,12 +11,15 @@ import time
 import os
 import re
 from urllib.parse import urlparse, urljoin
-from bs4 import BeautifulSoup
 import logging
 from datetime import datetime
 import csv
 import base64
 import hashlib
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from html_parsing import make_soup
 
 # Set up logging
 logging.basicConfig(
@@ -118,7 +121,7 @@ class InstagramAdvancedScraper:
         videos = []
         
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = make_soup(html_content)
             
             # Method 1: Look for Instagram's shared data
             scripts = soup.find_all('script')
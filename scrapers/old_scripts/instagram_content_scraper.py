@@ -11,10 +11,13 @@ import time
 import os
 import re
 from urllib.parse import urlparse
-from bs4 import BeautifulSoup
 import logging
 from datetime import datetime
 import csv
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from html_parsing import make_soup
 
 # Set up logging
 logging.basicConfig(
@@ -97,7 +100,7 @@ class InstagramContentScraper:
         videos = []
         
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = make_soup(html_content)
             
             # Method 1: Look for JSON-LD structured data
             json_ld_scripts = soup.find_all('script', type='application/ld+json')
@@ -11,13 +11,16 @@ import time
 import os
 import re
 from urllib.parse import urlparse, urljoin
-from bs4 import BeautifulSoup
 import concurrent.futures
 from typing import List, Dict, Optional, Tuple
 import random
 import logging
 from datetime import datetime
 import csv
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from html_parsing import make_soup
 
 # Set up logging
 logging.basicConfig(
@@ -173,7 +176,7 @@ class InstagramScraper:
         videos = []
         
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = make_soup(html_content)
             
             # Method 1: Look for JSON-LD structured data
             json_ld_scripts = soup.find_all('script', type='application/ld+json')
@@ -7,7 +7,6 @@ Downloads all images and videos to organized folders
 """
 
 import requests
-from bs4 import BeautifulSoup
 import json
 import time
 import os
@@ -17,6 +16,10 @@ from datetime import datetime
 import concurrent.futures
 from typing import List, Dict, Optional
 import csv
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from html_parsing import make_soup
 
 class LowheadsCompleteScraper:
     def __init__(self, base_url="https://lowheads.com"):
@@ -166,7 +169,7 @@ class LowheadsCompleteScraper:
             response = requests.get(product_url, timeout=10)
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = make_soup(response.text)
                 
                             # Get detailed product name
             name_selectors = [
@@ -407,7 +410,7 @@ class LowheadsCompleteScraper:
                 response = requests.get(url, timeout=10)
                 
                 if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
+                    soup = make_soup(response.text)
                     
                     # Find product containers
                     product_containers = []
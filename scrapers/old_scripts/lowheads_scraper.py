@@ -14,6 +14,10 @@ import re
 from datetime import datetime
 import concurrent.futures
 from typing import List, Dict, Optional
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from html_parsing import make_soup
 
 class LowheadsScraper:
     def __init__(self, base_url="https://lowheads.com"):
@@ -203,7 +207,7 @@ class LowheadsScraper:
             try:
                 response = self.session.get(url, timeout=10)
                 if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
+                    soup = make_soup(response.text)
                     
                     # Find product containers - try multiple selectors
                     container_selectors = [
@@ -268,7 +272,7 @@ class LowheadsScraper:
             try:
                 response = self.session.get(next_url, timeout=10)
                 if response.status_code == 200:
-                    next_soup = BeautifulSoup(response.text, 'html.parser')
+                    next_soup = make_soup(response.text)
                     # Recursively get products from next page
                     # (Implementation would continue here)
             except:
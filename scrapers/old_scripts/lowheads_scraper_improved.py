@@ -15,6 +15,10 @@ import re
 from datetime import datetime
 import concurrent.futures
 from typing import List, Dict, Optional
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from html_parsing import make_soup
 
 class LowheadsImprovedScraper:
     def __init__(self, base_url="https://lowheads.com"):
@@ -231,7 +235,7 @@ class LowheadsImprovedScraper:
                 print(f"  Trying URL: {url}")
                 response = self.session.get(url, timeout=10)
                 if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
+                    soup = make_soup(response.text)
                     
                     # Find product containers - Lowheads specific selectors
                     product_containers = []
@@ -308,7 +312,7 @@ class LowheadsImprovedScraper:
             try:
                 response = self.session.get(next_url, timeout=10)
                 if response.status_code == 200:
-                    next_soup = BeautifulSoup(response.text, 'html.parser')
+                    next_soup = make_soup(response.text)
                     # Recursively get products from next page
                     # (Implementation would continue here)
             except:
@@ -4,6 +4,10 @@ Simple test using the exact same approach as debug script
 """
 
 from lowheads_scraper_improved import LowheadsImprovedScraper
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 def simple_test():
     """Test with the exact same approach as debug script"""
@@ -20,8 +24,8 @@ def simple_test():
         print(f"Status code: {response.status_code}")
         
         if response.status_code == 200:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(response.text, 'html.parser')
+            from html_parsing import make_soup
+            soup = make_soup(response.text)
             
             # Use the exact same method as debug script
             containers = soup.find_all('div', class_=lambda x: x and 'type-product-grid-item' in x)
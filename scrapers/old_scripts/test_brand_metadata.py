@@ -4,8 +4,12 @@ Test script to check brand metadata extraction
 """
 
 import requests
-from bs4 import BeautifulSoup
 import re
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from html_parsing import make_soup
 
 def test_brand_metadata():
     """Test brand metadata extraction from product page"""
@@ -16,7 +20,7 @@ def test_brand_metadata():
     try:
         response = requests.get(url, timeout=10)
         if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text)
             
             # Get page text
             page_text = soup.get_text()
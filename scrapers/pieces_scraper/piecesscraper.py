@@ -9,11 +9,17 @@ from typing import List, Dict, Optional, Tuple
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 import os
+import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shopify_feed import ShopifyFeed, product_available, product_image_urls, product_price, strip_html
+from http_cache import CachedSession
+from html_parsing import make_soup
+
 class ProductScraper:
     def __init__(self):
-        self.session = requests.Session()
+        self.session = CachedSession(requests.Session())
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -28,10 +34,17 @@ class ProductScraper:
             
         print(f"Scraping products from: {url}")
         
+        # Shopify collections (a brand's page on a multi-brand store) are served as JSON;
+        # any other URL is parsed as HTML, since the store-wide feed isn't that page's products
+        feed_products = self._scrape_shopify_feed(url)
+        if feed_products:
+            print(f"Found {len(feed_products)} products in Shopify feed")
+            return feed_products
+        
         try:
             response = self.session.get(url, timeout=15)
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text)
             
             products = []
             
@@ -56,6 +69,37 @@ class ProductScraper:
             print(f"Error scraping {url}: {e}")
             return []
     
+    def _scrape_shopify_feed(self, url: str) -> List[Dict]:
+        parsed = urlparse(url)
+        store_url = f"{parsed.scheme}://{parsed.netloc}"
+        collection_match = re.search(r'/collections/([^/?#]+)', parsed.path)
+        if not collection_match:
+            return []
+        collection_handle = collection_match.group(1)
+        
+        try:
+            feed_products = ShopifyFeed(store_url, session=self.session).fetch_products(collection_handle)
+        except requests.RequestException:
+            return []
+        
+        brand = self._extract_brand_from_url(url)
+        products = []
+        for feed_product in feed_products or []:
+            images = product_image_urls(feed_product)
+            in_stock = product_available(feed_product)
+            products.append({
+                'name': (feed_product.get('title') or '').strip(),
+                'price': product_price(feed_product),
+                'image_url': images[0] if images else None,
+                'availability': 'In Stock' if in_stock else 'Sold Out',
+                'in_stock': in_stock,
+                'product_url': f"{store_url}/products/{feed_product.get('handle', '')}",
+                'description': strip_html(feed_product.get('body_html', '')) or None,
+                'brand': brand,
+            })
+        
+        return [product for product in products if product['name']]
+    
     def _scrape_shopify(self, soup: BeautifulSoup, base_url: str) -> List[Dict]:
         products = []
         
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Product Page Extractor
+Compiles the Lowheads product page rules (name, price, images, videos,
+description, brand metadata, variants) once and applies all of them in a
+single walk over the parsed page
+"""
+
+import re
+from typing import Callable, Dict, List, Optional
+
+from bs4 import CData, NavigableString, Tag
+
+import html_parsing
+from html_parsing import make_soup
+
+# Element and text node types of every parser backend. Only strings that
+# soup.get_text() includes count as text: no comments, scripts, styles or templates.
+ELEMENT_TYPES = (Tag,) + html_parsing.ELEMENT_TYPES
+TEXT_TYPES = (NavigableString, CData) + html_parsing.TEXT_TYPES
+
+PRICE_PATTERN = re.compile(r'[\$£€]?\s*\d+(?:[.,]\d{2})?')
+DESCRIPTION_PATTERN = re.compile(r'Heavyweight[^.]*?Ships in \d+-\d+ days', re.DOTALL | re.IGNORECASE)
+DESCRIPTION_KEYWORDS = ('heavyweight', 'embroidered', 'cotton', 'print')
+BACKGROUND_URL_PATTERN = re.compile(r'url\([\'"]?([^\'"]+)[\'"]?\)')
+BRAND_METADATA_PATTERNS = (
+    ('location', re.compile(r'This Brand Is From - (.+)')),
+    ('shipping_time', re.compile(r'This Brand Ships Within - (.+)')),
+    ('website', re.compile(r'About This Brand - (.+)')),
+)
+NYC_PATTERN = re.compile(r'[Nn]ew [Yy]ork [Cc]ity')
+BANISHED_PATTERN = re.compile(r'banishedusa\.com')
+
+
+def extract_brand_metadata(text: str) -> Dict:
+    """Read the brand location, shipping time and website lines out of page or description text"""
+    metadata = {}
+    for key, pattern in BRAND_METADATA_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            metadata[key] = match.group(1).strip()
+    return metadata
+
+
+class Rule:
+    """Element matcher with BeautifulSoup's find_all semantics for a tag name and attribute filters.
+
+    An attribute filter of True means "present", a string means equality and
+    a compiled regex means search. Filters on class, like BeautifulSoup's,
+    match if any single class or the whole class string matches.
+    """
+
+    def __init__(self, name: str, tag: Optional[str] = None, attrs: Optional[Dict] = None):
+        self.name = name
+        self.tag = tag
+        self.attrs = list((attrs or {}).items())
+
+    @staticmethod
+    def _value_matches(value, expected) -> bool:
+        if expected is True:
+            return value is not None
+        if value is None:
+            return False
+        if isinstance(value, list):
+            return any(Rule._value_matches(v, expected) for v in value) or Rule._value_matches(' '.join(value), expected)
+        if isinstance(expected, str):
+            return value == expected
+        return expected.search(value) is not None
+
+    def matches(self, element: Tag) -> bool:
+        for attr, expected in self.attrs:
+            if not self._value_matches(element.attrs.get(attr), expected):
+                return False
+        return True
+
+
+# Rules in the order their matches are used. "all" rules collect every match in
+# document order, "first" rules only the first one, like find_all and find.
+IMAGE_RULES = [
+    Rule('product_image', 'img', {'class': re.compile(r'product.*image', re.I)}),
+    Rule('gallery_image', 'img', {'class': re.compile(r'gallery.*image', re.I)}),
+    Rule('lazy_image', 'img', {'data-src': True}),
+    Rule('shopify_image', 'img', {'src': re.compile(r'cdn\.shopify\.com', re.I)}),
+    Rule('image_src', 'img', {'src': re.compile(r'\.jpg|\.jpeg|\.png|\.webp', re.I)}),
+    Rule('image_data_src', 'img', {'data-src': re.compile(r'\.jpg|\.jpeg|\.png|\.webp', re.I)}),
+    Rule('responsive_image', 'img', {'class': 'responsive-image'}),
+    Rule('any_image', 'img'),
+    Rule('background_image', None, {'style': re.compile(r'background-image')}),
+    Rule('data_image', None, {'data-image': True}),
+    # BeautifulSoup treats a bare regex for attrs as a class filter
+    Rule('data_image_class', None, {'class': re.compile(r'data-.*image')}),
+]
+VIDEO_RULES = [
+    Rule('video', 'video'),
+    Rule('video_source', 'source', {'type': re.compile(r'video', re.I)}),
+    Rule('video_iframe', 'iframe', {'src': re.compile(r'youtube|vimeo', re.I)}),
+]
+NAME_RULES = [
+    Rule('name_h1', 'h1'),
+    Rule('name_h1_title', 'h1', {'class': re.compile(r'product.*title', re.I)}),
+    Rule('name_div_title', 'div', {'class': re.compile(r'product.*title', re.I)}),
+]
+PRICE_RULES = [
+    Rule('price_span', 'span', {'class': re.compile(r'price', re.I)}),
+    Rule('price_div', 'div', {'class': re.compile(r'price', re.I)}),
+    Rule('price_p', 'p', {'class': re.compile(r'price', re.I)}),
+]
+DESCRIPTION_RULES = [
+    Rule('description_product', 'div', {'class': re.compile(r'product.*description', re.I)}),
+    Rule('description_div', 'div', {'class': re.compile(r'description', re.I)}),
+    Rule('description_p', 'p', {'class': re.compile(r'description', re.I)}),
+]
+BRAND_INFO_RULES = [
+    Rule('brand_info', 'div', {'class': re.compile(r'brand.*info', re.I)}),
+    Rule('vendor_info', 'div', {'class': re.compile(r'vendor.*info', re.I)}),
+    Rule('seller_info', 'div', {'class': re.compile(r'seller.*info', re.I)}),
+    Rule('about_brand', 'div', {'class': re.compile(r'about.*brand', re.I)}),
+]
+VARIANT_RULES = [
+    Rule('variant_select', 'select', {'name': re.compile(r'variant', re.I)}),
+    Rule('variant_div', 'div', {'class': re.compile(r'variant', re.I)}),
+]
+COLLECT_ALL = {rule.name for rule in IMAGE_RULES + VIDEO_RULES}
+
+
+class ProductPageExtractor:
+    """Extracts every product field from a parsed page in one traversal.
+
+    Works on a BeautifulSoup tree or any make_soup() backend.
+
+    Matches are bucketed per rule during the walk and resolved afterwards in
+    rule order, with set-based de-duplication, so the result is the same as
+    running each selector as its own find/find_all pass.
+    """
+
+    def __init__(self, clean_image_url: Callable[[str], str]):
+        self.clean_image_url = clean_image_url
+        rules = IMAGE_RULES + VIDEO_RULES + NAME_RULES + PRICE_RULES + DESCRIPTION_RULES + BRAND_INFO_RULES + VARIANT_RULES
+        self._rules_by_tag: Dict[str, List[Rule]] = {}
+        self._any_tag_rules: List[Rule] = []
+        for rule in rules:
+            if rule.tag is None:
+                self._any_tag_rules.append(rule)
+            else:
+                self._rules_by_tag.setdefault(rule.tag, []).append(rule)
+
+    def _walk(self, soup):
+        """Single pass: bucket matching elements per rule and collect the page text"""
+        matches: Dict[str, List[Tag]] = {}
+        text_parts = []
+        rules_by_tag = self._rules_by_tag
+        any_tag_rules = self._any_tag_rules
+
+        for node in soup.descendants:
+            if isinstance(node, ELEMENT_TYPES):
+                for rule in rules_by_tag.get(node.name, ()):
+                    if rule.name in COLLECT_ALL or rule.name not in matches:
+                        if rule.matches(node):
+                            matches.setdefault(rule.name, []).append(node)
+                for rule in any_tag_rules:
+                    if rule.matches(node):
+                        matches.setdefault(rule.name, []).append(node)
+            elif type(node) in TEXT_TYPES:
+                text_parts.append(node)
+
+        return matches, ''.join(text_parts)
+
+    def _image_candidates(self, matches: Dict[str, List[Tag]], rule_name: str) -> List[str]:
+        urls = []
+        for img in matches.get(rule_name, ()):
+            img_url = img.get('src') or img.get('data-src') or img.get('data-srcset')
+            if img_url:
+                urls.append(self.clean_image_url(img_url))
+        return urls
+
+    def _extract_images(self, matches: Dict[str, List[Tag]]) -> List[str]:
+        images: List[str] = []
+        seen = set()
+
+        def add(url: str):
+            if url not in seen:
+                seen.add(url)
+                images.append(url)
+
+        def not_logo(url: str) -> bool:
+            lowered = url.lower()
+            return 'logo' not in lowered and 'icon' not in lowered
+
+        for rule in IMAGE_RULES[:6]:
+            for url in self._image_candidates(matches, rule.name):
+                if not_logo(url) and len(url) > 20:
+                    add(url)
+
+        for url in self._image_candidates(matches, 'responsive_image'):
+            if not_logo(url):
+                add(url)
+
+        # Only fall back to every image on the page if the selectors found nothing
+        if not images:
+            for url in self._image_candidates(matches, 'any_image'):
+                if 'cdn.shopify.com' in url and not_logo(url) and len(url) > 20:
+                    add(url)
+
+        for elem in matches.get('background_image', ()):
+            match = BACKGROUND_URL_PATTERN.search(elem.get('style', ''))
+            if match:
+                url = self.clean_image_url(match.group(1))
+                if 'cdn.shopify.com' in url and not_logo(url):
+                    add(url)
+
+        for elem in matches.get('data_image', ()):
+            if elem.get('data-image'):
+                add(self.clean_image_url(elem.get('data-image')))
+
+        for elem in matches.get('data_image_class', ()):
+            for attr_name, attr_value in elem.attrs.items():
+                if 'image' in attr_name.lower() and attr_value:
+                    url = self.clean_image_url(attr_value)
+                    if 'cdn.shopify.com' in url:
+                        add(url)
+
+        return images
+
+    def _extract_videos(self, matches: Dict[str, List[Tag]]) -> List[str]:
+        videos: List[str] = []
+        seen = set()
+        for rule in VIDEO_RULES:
+            for video in matches.get(rule.name, ()):
+                video_url = video.get('src') or video.get('data-src')
+                if video_url and video_url not in seen:
+                    seen.add(video_url)
+                    videos.append(video_url)
+        return videos
+
+    def _first(self, matches: Dict[str, List[Tag]], rule: Rule) -> Optional[Tag]:
+        found = matches.get(rule.name)
+        return found[0] if found else None
+
+    def extract(self, soup, listing_data: Dict) -> Dict:
+        """Return listing_data extended with everything the product page says about the product"""
+        product = listing_data.copy()
+        matches, page_text = self._walk(soup)
+
+        # Detailed name, skipping cart headings
+        for rule in NAME_RULES:
+            name_elem = self._first(matches, rule)
+            if name_elem:
+                detailed_name = name_elem.get_text(strip=True)
+                if detailed_name and 'cart' not in detailed_name.lower() and len(detailed_name) > 3:
+                    product['detailed_name'] = detailed_name
+                    break
+        if not product.get('detailed_name') or 'cart' in product.get('detailed_name', '').lower():
+            product['detailed_name'] = product.get('name', 'Unknown Product')
+
+        for rule in PRICE_RULES:
+            price_elem = self._first(matches, rule)
+            if price_elem:
+                price_match = PRICE_PATTERN.search(price_elem.get_text(strip=True))
+                if price_match:
+                    product['detailed_price'] = price_match.group(0)
+                    break
+
+        product['images'] = self._extract_images(matches)
+        product['videos'] = self._extract_videos(matches)
+
+        desc_match = DESCRIPTION_PATTERN.search(page_text)
+        if desc_match:
+            product['description'] = desc_match.group(0).strip()
+        else:
+            for rule in DESCRIPTION_RULES:
+                desc_elem = self._first(matches, rule)
+                if desc_elem:
+                    desc_text = desc_elem.get_text(strip=True)
+                    if any(keyword in desc_text.lower() for keyword in DESCRIPTION_KEYWORDS):
+                        product['description'] = desc_text
+                        break
+
+        product['brand_metadata'] = {}
+        for rule in BRAND_INFO_RULES:
+            brand_elem = self._first(matches, rule)
+            if brand_elem:
+                product['brand_metadata'] = extract_brand_metadata(brand_elem.get_text(strip=True))
+                break
+        if not product['brand_metadata']:
+            product['brand_metadata'] = extract_brand_metadata(page_text)
+        if not product['brand_metadata'].get('location') and NYC_PATTERN.search(page_text):
+            product['brand_metadata']['location'] = 'New York City'
+        if not product['brand_metadata'].get('website') and BANISHED_PATTERN.search(page_text):
+            product['brand_metadata']['website'] = 'banishedusa.com'
+
+        product['variants'] = []
+        for rule in VARIANT_RULES:
+            variant_elem = self._first(matches, rule)
+            if variant_elem:
+                for option in variant_elem.find_all('option'):
+                    variant_text = option.get_text(strip=True)
+                    if variant_text and variant_text not in ['Select', 'Choose']:
+                        product['variants'].append(variant_text)
+
+        product['detailed_data_complete'] = True
+        return product
+
+    def extract_html(self, html: str, listing_data: Dict, backend: Optional[str] = None) -> Dict:
+        return self.extract(make_soup(html, backend), listing_data)
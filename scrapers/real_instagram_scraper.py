@@ -4,21 +4,16 @@ Real Instagram Scraper
 Downloads actual Instagram content using modern techniques
 """
 
-import requests
 import json
-import os
-import time
 import re
-import random
-from urllib.parse import urlparse
-import urllib.request
 import logging
-from bs4 import BeautifulSoup
+
+from html_parsing import make_soup
+from instagram_engine import CallableBackend, InstagramEngine, extract_username_from_url, instagram_sessions, read_brands_list
 
 class RealInstagramScraper:
     def __init__(self, output_dir="downloads/instagram_data"):
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.session, self.media_session = instagram_sessions({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.9',
@@ -33,6 +28,10 @@ class RealInstagramScraper:
         })
         self.output_dir = output_dir
         self.setup_logging()
+        self.engine = InstagramEngine(
+            CallableBackend('html', self.get_profile_data, self.get_posts_data),
+            output_dir, media_session=self.media_session, max_posts=6, logger=self.logger
+        )
         
     def setup_logging(self):
         """Setup logging configuration"""
@@ -48,24 +47,7 @@ class RealInstagramScraper:
     
     def extract_username_from_url(self, instagram_url):
         """Extract username from Instagram URL"""
-        try:
-            if '/p/' in instagram_url:
-                # Post URL, extract username from the path
-                path = urlparse(instagram_url).path
-                parts = path.split('/')
-                if len(parts) > 1:
-                    return parts[1]
-            elif 'instagram.com/' in instagram_url:
-                # Profile URL
-                path = urlparse(instagram_url).path
-                username = path.strip('/')
-                if username and not username.startswith('p/'):
-                    return username
-            
-            return None
-        except Exception as e:
-            self.logger.error(f"Error extracting username from {instagram_url}: {e}")
-            return None
+        return extract_username_from_url(instagram_url)
     
     def get_profile_data(self, username):
         """Get profile data using modern Instagram structure"""
@@ -76,7 +58,7 @@ class RealInstagramScraper:
             response = self.session.get(profile_url, timeout=15)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text)
             
             profile_data = {
                 'username': username,
@@ -137,7 +119,7 @@ class RealInstagramScraper:
             response = self.session.get(profile_url, timeout=15)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text)
             posts_data = []
             
             # Look for posts data in script tags
@@ -205,159 +187,19 @@ class RealInstagramScraper:
     
     def download_media(self, url, filepath):
         """Download media file from URL"""
-        try:
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(filepath), exist_ok=True)
-            
-            # Download the file
-            urllib.request.urlretrieve(url, filepath)
-            self.logger.info(f"Downloaded: {filepath}")
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Error downloading {url}: {e}")
-            return False
+        return self.engine.download_media(url, filepath).result()
     
     def scrape_brand_instagram(self, brand_name, instagram_url):
         """Scrape Instagram content for a specific brand"""
-        try:
-            # Extract username from URL
-            username = self.extract_username_from_url(instagram_url)
-            if not username:
-                self.logger.error(f"Could not extract username from URL: {instagram_url}")
-                return False
-            
-            # Create brand folder
-            brand_folder = os.path.join(self.output_dir, brand_name)
-            images_folder = os.path.join(brand_folder, 'images')
-            videos_folder = os.path.join(brand_folder, 'videos')
-            posts_folder = os.path.join(brand_folder, 'posts')
-            
-            os.makedirs(images_folder, exist_ok=True)
-            os.makedirs(videos_folder, exist_ok=True)
-            os.makedirs(posts_folder, exist_ok=True)
-            
-            self.logger.info(f"Processing {brand_name} (@{username})")
-            
-            # Get profile data
-            profile_data = self.get_profile_data(username)
-            if profile_data:
-                # Download profile picture
-                if profile_data.get('profile_pic_url'):
-                    profile_pic_path = os.path.join(brand_folder, f"{username}_profile.jpg")
-                    self.download_media(profile_data['profile_pic_url'], profile_pic_path)
-                
-                # Save profile data
-                profile_file = os.path.join(brand_folder, 'profile_data.json')
-                with open(profile_file, 'w', encoding='utf-8') as f:
-                    json.dump(profile_data, f, indent=2)
-            
-            # Get posts data
-            posts_data = self.get_posts_data(username, max_posts=6)
-            
-            # Download media from posts
-            downloaded_count = 0
-            for i, post in enumerate(posts_data):
-                try:
-                    post_folder = os.path.join(posts_folder, f"post_{i+1}")
-                    os.makedirs(post_folder, exist_ok=True)
-                    
-                    # Save post data
-                    post_file = os.path.join(post_folder, 'post_data.json')
-                    with open(post_file, 'w', encoding='utf-8') as f:
-                        json.dump(post, f, indent=2)
-                    
-                    # Download media
-                    for j, media in enumerate(post.get('media_urls', [])):
-                        if media['type'] == 'image':
-                            filename = f"image_{j+1}.jpg"
-                            filepath = os.path.join(post_folder, filename)
-                        else:
-                            filename = f"video_{j+1}.mp4"
-                            filepath = os.path.join(post_folder, filename)
-                        
-                        if self.download_media(media['url'], filepath):
-                            downloaded_count += 1
-                    
-                    time.sleep(random.uniform(1, 2))
-                    
-                except Exception as e:
-                    self.logger.error(f"Error processing post {i+1}: {e}")
-                    continue
-            
-            self.logger.info(f"Downloaded {downloaded_count} media files for {brand_name}")
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Error scraping {brand_name}: {e}")
-            return False
+        return self.engine.scrape_brand(brand_name, instagram_url)
     
     def read_brands_list(self, brands_file="downloads/brands-list.md"):
         """Read brands and Instagram links from the markdown file"""
-        brands = {}
-        
-        try:
-            with open(brands_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Extract brand names and Instagram links
-            lines = content.split('\n')
-            for line in lines:
-                if '**' in line and 'Instagram' in line:
-                    # Extract brand name
-                    brand_match = re.search(r'\*\*(.*?)\*\*', line)
-                    if brand_match:
-                        brand_name = brand_match.group(1)
-                        
-                        # Extract Instagram URL
-                        url_match = re.search(r'https://www\.instagram\.com/[^\s)]+', line)
-                        if url_match:
-                            instagram_url = url_match.group(0)
-                            brands[brand_name] = instagram_url
-                        elif 'No official Instagram link found' in line or 'No specific Instagram link found' in line:
-                            brands[brand_name] = None
-            
-            return brands
-            
-        except Exception as e:
-            self.logger.error(f"Error reading brands file: {e}")
-            return {}
+        return read_brands_list(brands_file, self.logger)
     
     def run(self, brands_file="downloads/brands-list.md", max_brands=None):
         """Main method to scrape Instagram content for all brands"""
-        self.logger.info("Starting Real Instagram Scraper...")
-        
-        # Read brands list
-        brands = self.read_brands_list(brands_file)
-        
-        if not brands:
-            self.logger.error("No brands found in the file!")
-            return
-        
-        self.logger.info(f"Found {len(brands)} brands with Instagram links")
-        
-        # Limit brands if specified
-        if max_brands:
-            brands = dict(list(brands.items())[:max_brands])
-            self.logger.info(f"Limited to {max_brands} brands for testing")
-        
-        # Process each brand
-        successful_scrapes = 0
-        for i, (brand_name, instagram_url) in enumerate(brands.items(), 1):
-            if not instagram_url:
-                self.logger.info(f"Skipping {brand_name} - no Instagram link")
-                continue
-            
-            self.logger.info(f"\n[{i}/{len(brands)}] Processing: {brand_name}")
-            
-            if self.scrape_brand_instagram(brand_name, instagram_url):
-                successful_scrapes += 1
-            
-            # Be respectful with delays between brands
-            time.sleep(random.uniform(3, 6))
-        
-        self.logger.info(f"\nCompleted! Successfully scraped {successful_scrapes} out of {len(brands)} brands")
-        self.logger.info(f"Check the '{self.output_dir}' folder for downloaded content.")
+        self.engine.run(brands_file, max_brands=max_brands, title="Real Instagram Scraper")
 
 def main():
     """Main function to run the real Instagram scraper"""
@@ -10,6 +10,8 @@ import json
 import logging
 from pathlib import Path
 
+from media_store import link_or_copy
+
 class ReorganizeFinalStructure:
     def __init__(self, output_dir="downloads/instagram_data"):
         self.output_dir = output_dir
@@ -70,10 +72,10 @@ class ReorganizeFinalStructure:
                         shutil.move(file_path, new_image_path)
                         self.logger.info(f"    Moved image: {file}")
                     
-                    # Copy to posts folder
+                    # Link into posts folder (a hardlink, not a second copy)
                     post_image_path = os.path.join(new_post_dir, file)
                     if not os.path.exists(post_image_path):
-                        shutil.copy2(new_image_path, post_image_path)
+                        link_or_copy(new_image_path, post_image_path)
                         
                 elif file.endswith(('.mp4', '.mov', '.avi')):
                     # Move to videos folder
@@ -82,10 +84,10 @@ class ReorganizeFinalStructure:
                         shutil.move(file_path, new_video_path)
                         self.logger.info(f"    Moved video: {file}")
                     
-                    # Copy to posts folder
+                    # Link into posts folder
                     post_video_path = os.path.join(new_post_dir, file)
                     if not os.path.exists(post_video_path):
-                        shutil.copy2(new_video_path, post_video_path)
+                        link_or_copy(new_video_path, post_video_path)
                         
                 elif file.endswith('.json'):
                     # Move post_data.json to posts folder
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Shopify Feed Client
+Reads product data from Shopify's JSON endpoints (/products.json,
+/collections/<handle>/products.json and /products/<handle>.js) so scrapers
+only fall back to parsing rendered HTML for non-Shopify pages
+"""
+
+import re
+import html as html_lib
+from urllib.parse import urlparse
+from typing import Dict, List, Optional
+
+import requests
+
+
+class ShopifyFeed:
+    """Paginated reader for a Shopify storefront's public product feeds"""
+
+    def __init__(self, base_url: str, session=None, page_size: int = 250,
+                 max_pages: int = 100, timeout: int = 15):
+        self.base_url = base_url.rstrip('/')
+        self.session = session or requests
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.timeout = timeout
+
+    def _get_json(self, url: str, params: Optional[Dict] = None):
+        """GET a JSON document, returning None when the endpoint isn't a Shopify feed"""
+        response = self.session.get(url, params=params, timeout=self.timeout)
+        if response.status_code != 200:
+            return None
+        try:
+            return response.json()
+        except ValueError:
+            return None
+
+    def fetch_products(self, collection_handle: Optional[str] = None) -> Optional[List[Dict]]:
+        """Fetch every product in the store, or in one collection, a page at a time.
+
+        Returns None if the feed is not available (not a Shopify store, or no
+        such collection) so callers can fall back to HTML parsing.
+        """
+        if collection_handle:
+            url = f"{self.base_url}/collections/{collection_handle}/products.json"
+        else:
+            url = f"{self.base_url}/products.json"
+
+        products: List[Dict] = []
+        for page in range(1, self.max_pages + 1):
+            data = self._get_json(url, params={'limit': self.page_size, 'page': page})
+            if not isinstance(data, dict) or 'products' not in data:
+                return products if page > 1 else None
+
+            batch = data['products']
+            products.extend(batch)
+            if len(batch) < self.page_size:
+                break
+
+        return products
+
+    def fetch_product(self, handle: str) -> Optional[Dict]:
+        """Fetch a single product from /products/<handle>.js in products.json shape"""
+        data = self._get_json(f"{self.base_url}/products/{handle}.js")
+        if not isinstance(data, dict) or 'handle' not in data:
+            return None
+        return normalize_js_product(data)
+
+
+def normalize_js_product(data: Dict) -> Dict:
+    """Convert a /products/<handle>.js document to the products.json layout.
+
+    The .js endpoint reports prices in cents and images as bare URL strings,
+    but also carries the product's media (including videos).
+    """
+    product = dict(data)
+    product['body_html'] = data.get('description', '')
+    product['variants'] = [
+        dict(variant, price=f"{variant['price'] / 100:.2f}") if isinstance(variant.get('price'), int) else variant
+        for variant in data.get('variants', [])
+    ]
+    product['images'] = [
+        {'src': image} if isinstance(image, str) else image
+        for image in data.get('images', [])
+    ]
+    return product
+
+
+def product_handle_from_url(product_url: str) -> Optional[str]:
+    """Return the product handle from a .../products/<handle> URL"""
+    match = re.search(r'/products/([^/?#]+)', urlparse(product_url).path)
+    return match.group(1) if match else None
+
+
+def product_image_urls(product: Dict) -> List[str]:
+    """Image URLs of a feed product, with protocol-relative URLs made absolute"""
+    urls = []
+    for image in product.get('images', []):
+        src = image.get('src') if isinstance(image, dict) else image
+        if src:
+            urls.append('https:' + src if src.startswith('//') else src)
+    return urls
+
+
+def product_video_urls(product: Dict) -> List[str]:
+    """Highest-resolution MP4 source for each video in a product's media (only present in .js)"""
+    urls = []
+    for media in product.get('media', []):
+        if media.get('media_type') != 'video':
+            continue
+        sources = [s for s in media.get('sources', []) if s.get('format') == 'mp4' and s.get('url')]
+        if sources:
+            best = max(sources, key=lambda s: s.get('height', 0))
+            urls.append('https:' + best['url'] if best['url'].startswith('//') else best['url'])
+    return urls
+
+
+def product_price(product: Dict) -> str:
+    """Price of a feed product's first variant formatted like the HTML scrapers ("$45.00")"""
+    variants = product.get('variants', [])
+    if not variants or variants[0].get('price') in (None, ''):
+        return ''
+    return f"${variants[0]['price']}"
+
+
+def product_available(product: Dict) -> bool:
+    """Whether any variant of a feed product is in stock"""
+    variants = product.get('variants', [])
+    return any(variant.get('available', True) for variant in variants) if variants else True
+
+
+def product_variant_titles(product: Dict) -> List[str]:
+    """Variant titles, skipping Shopify's placeholder for single-variant products"""
+    return [
+        variant['title'] for variant in product.get('variants', [])
+        if variant.get('title') and variant['title'] != 'Default Title'
+    ]
+
+
+def strip_html(body_html: str) -> str:
+    """Collapse a product's HTML description to plain text"""
+    text = re.sub(r'<(br|/p|/div|/li)\s*/?>', '\n', body_html or '', flags=re.I)
+    text = re.sub(r'<[^>]+>', '', text)
+    text = html_lib.unescape(text)
+    return re.sub(r'[ \t]*\n\s*', '\n', text).strip()
@@ -19,16 +19,21 @@ Requirements:
 import os
 import sys
 import json
-import time
+import hashlib
+import threading
+import concurrent.futures
 import unicodedata
 import re
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional, Set
+from typing import List, Dict, Optional, Tuple
 import argparse
 from dotenv import load_dotenv
 from supabase import create_client, Client
 
+from media_catalog import MediaCatalog, DEFAULT_CATALOG_PATH
+from storage_listing import iter_storage_folder, iter_storage_names
+
 # Load environment variables
 load_dotenv()
 
@@ -40,11 +45,16 @@ BUCKET_NAME = 'brand-content'
 # Supported file extensions for media
 SUPPORTED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.mp4', '.mov'}
 
+INDEX_FILE_NAME = 'index.json'
+
 # Progress tracking
 processed_brands = 0
 processed_products = 0
 errors = []
 processed_brand_names = []  # Track all brand names that were processed
+unchanged_indexes = 0
+media_catalog: Optional[MediaCatalog] = None
+_stats_lock = threading.Lock()
 
 def sanitize_key_component(component: str) -> str:
     """
@@ -65,77 +75,96 @@ def sanitize_key_component(component: str) -> str:
     
     return safe
 
+def list_storage_folder(supabase: Client, folder_path: str) -> List[str]:
+    """
+    List the names of every entry (files and subfolders) in a storage folder.
+    """
+    return list(iter_storage_names(supabase.storage.from_(BUCKET_NAME), folder_path))
+
+def media_files_in(names: List[str]) -> List[str]:
+    """
+    Filter folder entries down to media files with a supported extension.
+    """
+    media_files = []
+    for file_name in names:
+        # Check if it's a file (not a folder) and has supported extension
+        if '.' in file_name:
+            extension = Path(file_name).suffix.lower()
+            if extension in SUPPORTED_EXTENSIONS:
+                media_files.append(file_name)
+    return sorted(media_files)
+
 def list_files_in_storage_folder(supabase: Client, folder_path: str) -> List[str]:
     """
     List all files in a specific storage folder.
     """
     try:
-        # Use the storage API to list files
-        result = supabase.storage.from_(BUCKET_NAME).list(folder_path)
-        
-        if not result:
-            return []
-        
-        # Filter for media files only
-        media_files = []
-        for item in result:
-            if isinstance(item, dict) and 'name' in item:
-                file_name = item['name']
-                # Check if it's a file (not a folder) and has supported extension
-                if '.' in file_name:
-                    extension = Path(file_name).suffix.lower()
-                    if extension in SUPPORTED_EXTENSIONS:
-                        media_files.append(file_name)
-        
-        return sorted(media_files)
-        
+        return media_files_in(list_storage_folder(supabase, folder_path))
     except Exception as error:
         print(f"❌ Error listing files in {folder_path}: {str(error)}")
         return []
 
-def create_index_file(supabase: Client, folder_path: str, files: List[str]) -> bool:
+def files_hash(files: List[str]) -> str:
+    """
+    Hash of an index's file list, stored in index.json so an unchanged folder
+    can be recognised without rewriting its index.
+    """
+    return hashlib.sha256('\n'.join(files).encode('utf-8')).hexdigest()
+
+def read_index_hash(supabase: Client, folder_path: str) -> Optional[str]:
+    """
+    Return the files_hash recorded in a folder's existing index.json, or None
+    if it can't be read or predates the hash.
+    """
+    try:
+        data = supabase.storage.from_(BUCKET_NAME).download(f"{folder_path}/{INDEX_FILE_NAME}")
+        return json.loads(data).get('files_hash')
+    except Exception:
+        return None
+
+def create_index_file(supabase: Client, folder_path: str, files: List[str],
+                      existing_hash: Optional[str] = None) -> bool:
     """
     Create an index.json file in the specified folder with the list of files.
+    
+    Written with a single upsert; skipped entirely when existing_hash shows
+    the folder's current index already lists exactly these files.
     """
+    global unchanged_indexes
+    
     try:
+        content_hash = files_hash(files)
+        if existing_hash == content_hash:
+            with _stats_lock:
+                unchanged_indexes += 1
+            print(f"⏭️  index.json unchanged for {folder_path} ({len(files)} files)")
+            return True
+        
         # Create index.json content
         index_content = {
             "files": files,
             "generated_at": datetime.now().isoformat(),
-            "total_files": len(files)
+            "total_files": len(files),
+            "files_hash": content_hash
         }
         
         # Convert to JSON string
         json_content = json.dumps(index_content, indent=2)
         json_bytes = json_content.encode('utf-8')
         
-        # Upload index.json to storage
-        index_path = f"{folder_path}/index.json"
+        # Upload index.json to storage, replacing any existing one
+        index_path = f"{folder_path}/{INDEX_FILE_NAME}"
+        result = supabase.storage.from_(BUCKET_NAME).upload(
+            index_path,
+            json_bytes,
+            file_options={"content-type": "application/json", "upsert": "true"}
+        )
         
-        # Try to upload, if it exists we'll need to update it
-        try:
-            result = supabase.storage.from_(BUCKET_NAME).upload(
-                index_path,
-                json_bytes,
-                file_options={"content-type": "application/json"}
-            )
-        except Exception as upload_error:
-            # If file exists, try to update it instead
-            if "already exists" in str(upload_error).lower() or "duplicate" in str(upload_error).lower():
-                result = supabase.storage.from_(BUCKET_NAME).update(
-                    index_path,
-                    json_bytes,
-                    file_options={"content-type": "application/json"}
-                )
-            else:
-                raise upload_error
+        if hasattr(result, 'error') and result.error:
+            raise Exception(str(result.error))
         
-        if result:
-            print(f"✅ Created index.json for {folder_path} ({len(files)} files)")
-            return True
-        else:
-            print(f"❌ Failed to create index.json for {folder_path}")
-            return False
+        print(f"✅ Created index.json for {folder_path} ({len(files)} files)")
+        return True
             
     except Exception as error:
         error_msg = f"Failed to create index.json for {folder_path}: {str(error)}"
@@ -143,29 +172,42 @@ def create_index_file(supabase: Client, folder_path: str, files: List[str]) -> b
         errors.append(error_msg)
         return False
 
+def index_folder(supabase: Client, folder_path: str) -> bool:
+    """
+    List one media folder and write its index.json if the file list changed.
+    Safe to call from several worker threads at once.
+    """
+    try:
+        items = list(iter_storage_folder(supabase.storage.from_(BUCKET_NAME), folder_path))
+    except Exception as error:
+        error_msg = f"Failed to list {folder_path}: {str(error)}"
+        print(f"❌ {error_msg}")
+        errors.append(error_msg)
+        return False
+    
+    names = [item['name'] for item in items]
+    files = media_files_in(names)
+    if media_catalog is not None:
+        # The listing is fresh, so bring the catalog's copy of this folder up to date too
+        sizes = {item['name']: (item.get('metadata') or {}).get('size') for item in items}
+        media_catalog.sync_folder(folder_path, {name: sizes[name] for name in files})
+    if not files:
+        # Still create an empty index.json so the app can fetch a valid structure
+        print(f"ℹ️  No media files in {folder_path} — creating empty index.json")
+    
+    # Only an index that is actually there needs to be fetched for comparison
+    existing_hash = read_index_hash(supabase, folder_path) if INDEX_FILE_NAME in names else None
+    return create_index_file(supabase, folder_path, files, existing_hash)
+
 def get_all_brand_folders(supabase: Client) -> List[str]:
     """
     Get all brand folders from storage.
     """
     try:
-        # List items in the bucket root (brand folders are directly in bucket)
-        result = supabase.storage.from_(BUCKET_NAME).list('', {
-            'limit': 1000,
-            'offset': 0,
-            'sortBy': { 'column': 'name', 'order': 'asc' },
-        })
-        
-        if not result:
-            return []
-        
-        brand_folders: List[str] = []
-        for item in result:
-            if isinstance(item, dict) and 'name' in item and item['name']:
-                # Be permissive: many brand names contain dots/underscores/numbers/mixed case
-                # We assume items at root are brand folders in this bucket layout
-                brand_folders.append(item['name'])
-        
-        return sorted(brand_folders)
+        # List items in the bucket root (brand folders are directly in bucket), page by page.
+        # Be permissive: many brand names contain dots/underscores/numbers/mixed case
+        # We assume items at root are brand folders in this bucket layout
+        return sorted(iter_storage_names(supabase.storage.from_(BUCKET_NAME), ''))
         
     except Exception as error:
         print(f"❌ Error listing brand folders: {str(error)}")
@@ -177,79 +219,53 @@ def get_product_folders(supabase: Client, brand_name: str) -> List[str]:
     """
     try:
         product_media_path = f"{brand_name}/scrolling_product_media"
-        result = supabase.storage.from_(BUCKET_NAME).list(product_media_path)
-        
-        if not result:
-            return []
         
-        product_folders = []
-        for item in result:
-            if isinstance(item, dict) and 'name' in item:
-                # Check if it's a folder (no extension)
-                if '.' not in item['name']:
-                    product_folders.append(item['name'])
-        
-        return sorted(product_folders)
+        # Folders are the entries without an extension
+        return sorted(name for name in list_storage_folder(supabase, product_media_path) if '.' not in name)
         
     except Exception as error:
         print(f"❌ Error listing product folders for {brand_name}: {str(error)}")
         return []
 
-def process_brand_media(supabase: Client, brand_name: str) -> bool:
-    """
-    Process brand media folder and create index.json inside scrolling_brand_media.
+def index_brands(supabase: Client, brand_names: List[str], concurrency: int) -> Dict[str, Tuple[bool, int, int]]:
     """
-    print(f"\n📁 Processing brand media for: {brand_name}")
-    
-    brand_media_path = f"{brand_name}/scrolling_brand_media"
-    
-    # Get all media files in the brand media folder
-    files = list_files_in_storage_folder(supabase, brand_media_path)
+    Write index.json for every brand's scrolling_brand_media folder and each
+    of its product folders, listing and indexing folders concurrently on a
+    pool of ``concurrency`` threads.
     
-    if not files:
-        # Still create an empty index.json so the app can fetch a valid structure
-        print(f"ℹ️  No media files in {brand_media_path} — creating empty index.json")
-        success = create_index_file(supabase, brand_media_path, [])
-    else:
-        # Create index.json file inside the scrolling_brand_media folder
-        success = create_index_file(supabase, brand_media_path, files)
-    return success
-
-def process_product_media(supabase: Client, brand_name: str) -> int:
-    """
-    Process all product media folders for a brand and create index.json files.
-    Returns the number of successfully processed products.
+    Returns {brand: (brand media indexed, products indexed, product folders)}.
     """
-    print(f"\n🛍️  Processing product media for: {brand_name}")
-    
-    # Get all product folders
-    product_folders = get_product_folders(supabase, brand_name)
-    
-    if not product_folders:
-        print(f"⚠️  No product folders found for {brand_name}")
-        return 0
-    
-    successful_products = 0
-    
-    for product_name in product_folders:
-        product_media_path = f"{brand_name}/scrolling_product_media/{product_name}"
-        
-        # Get all media files in this product folder
-        files = list_files_in_storage_folder(supabase, product_media_path)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+        # Product folders of every brand are listed in parallel; each brand's
+        # scrolling_brand_media index is written alongside
+        brand_futures = {
+            brand_name: pool.submit(index_folder, supabase, f"{brand_name}/scrolling_brand_media")
+            for brand_name in brand_names
+        }
+        product_list_futures = {
+            brand_name: pool.submit(get_product_folders, supabase, brand_name)
+            for brand_name in brand_names
+        }
         
-        if not files:
-            # Create an empty index.json to keep app fetches happy
-            print(f"ℹ️  No media files in {product_media_path} — creating empty index.json")
-            if create_index_file(supabase, product_media_path, []):
-                successful_products += 1
-            continue
+        product_futures: Dict[str, List[concurrent.futures.Future]] = {}
+        for brand_name in brand_names:
+            product_folders = product_list_futures[brand_name].result()
+            if not product_folders:
+                print(f"⚠️  No product folders found for {brand_name}")
+            product_futures[brand_name] = [
+                pool.submit(index_folder, supabase, f"{brand_name}/scrolling_product_media/{product_name}")
+                for product_name in product_folders
+            ]
         
-        # Create index.json file for this product
-        if create_index_file(supabase, product_media_path, files):
-            successful_products += 1
-    
-    print(f"✅ Processed {successful_products}/{len(product_folders)} products for {brand_name}")
-    return successful_products
+        results = {}
+        for brand_name in brand_names:
+            brand_success = brand_futures[brand_name].result()
+            successful_products = sum(future.result() for future in product_futures[brand_name])
+            total_products = len(product_futures[brand_name])
+            if total_products:
+                print(f"✅ Processed {successful_products}/{total_products} products for {brand_name}")
+            results[brand_name] = (brand_success, successful_products, total_products)
+        return results
 
 def verify_bucket(supabase: Client) -> bool:
     """
@@ -272,15 +288,16 @@ def generate_report() -> None:
     print('='*50)
     print(f"✅ Brands processed: {processed_brands}")
     print(f"✅ Products processed: {processed_products}")
+    print(f"⏭️  Indexes unchanged: {unchanged_indexes}")
     
     if processed_brand_names:
         total_brands_attempted = len(processed_brand_names)
-        print(f"\n📊 Brand Processing Summary:")
+        print("\n📊 Brand Processing Summary:")
         print(f"   • Total brands attempted: {total_brands_attempted}")
         print(f"   • Successfully processed: {processed_brands}")
         print(f"   • Failed to process: {total_brands_attempted - processed_brands}")
-        print(f"\n🏢 Brands processed:")
-        print(f"[{', '.join(f'"{brand_name}"' for brand_name in processed_brand_names)}]")
+        print("\n🏢 Brands processed:")
+        print(json.dumps(processed_brand_names, ensure_ascii=False))
     
     if errors:
         print(f"\n❌ Errors encountered: {len(errors)}")
@@ -316,7 +333,7 @@ def main():
     """
     Main function to generate all index.json files.
     """
-    global processed_brands, processed_products
+    global processed_brands, processed_products, media_catalog
     
     print('🚀 Starting Index File Generation')
     print('=' * 50)
@@ -337,7 +354,22 @@ def main():
         default=None,
         help="Comma-separated list of brand names",
     )
+    parser.add_argument(
+        "--concurrency",
+        dest="concurrency",
+        type=int,
+        default=8,
+        help="Number of folders listed and indexed in parallel (default: 8)",
+    )
+    parser.add_argument(
+        "--catalog",
+        dest="catalog",
+        type=str,
+        default=str(DEFAULT_CATALOG_PATH),
+        help="SQLite media catalog updated from the folder listings (see media_catalog.py)",
+    )
     args = parser.parse_args()
+    media_catalog = MediaCatalog(Path(args.catalog))
 
     # Verify environment
     if not SUPABASE_URL or not SUPABASE_ANON_KEY:
@@ -375,30 +407,22 @@ def main():
     
     print(f"📦 Found {len(brand_folders)} brands to process")
     
-    # Process each brand
+    # Index every brand's folders on one shared worker pool
+    try:
+        results = index_brands(supabase, brand_folders, max(1, args.concurrency))
+    except Exception as error:
+        error_msg = f"Failed to process brands: {str(error)}"
+        print(f"❌ {error_msg}")
+        errors.append(error_msg)
+        results = {}
+    
     for brand_name in brand_folders:
-        try:
-            print(f"\n🏢 Processing brand: {brand_name}")
-            
-            # Process brand media (scrolling_brand_media)
-            brand_success = process_brand_media(supabase, brand_name)
-            
-            # Process product media (scrolling_product_media)
-            products_processed = process_product_media(supabase, brand_name)
-            processed_products += products_processed
-            
-            if brand_success:
-                processed_brands += 1
-                
-            # Track all brands that were attempted, regardless of success
-            processed_brand_names.append(brand_name)
-                
-        except Exception as error:
-            error_msg = f"Failed to process brand {brand_name}: {str(error)}"
-            print(f"❌ {error_msg}")
-            errors.append(error_msg)
-            # Still track failed brands
-            processed_brand_names.append(brand_name)
+        brand_success, products_processed, _ = results.get(brand_name, (False, 0, 0))
+        processed_products += products_processed
+        if brand_success:
+            processed_brands += 1
+        # Track all brands that were attempted, regardless of success
+        processed_brand_names.append(brand_name)
     
     # Generate final report
     generate_report()
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+
+"""
+Local catalog of the media in the 'brand-content' storage bucket
+
+Every media object the migrator uploads (or finds already uploaded) and
+every folder index_files.py lists is recorded here with its brand, media
+type, size and, when the file was local, its pixel dimensions. Questions
+such as which brands have videos, how much media each brand has, or which
+products have no image to use as a thumbnail are then answered from SQLite
+instead of by listing the bucket brand by brand.
+
+Usage:
+    python media_catalog.py brands-with-video
+    python media_catalog.py counts
+    python media_catalog.py missing-thumbnails
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import struct
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+BUCKET_NAME = 'brand-content'
+DEFAULT_CATALOG_PATH = Path(__file__).parent / '.media_catalog.sqlite3'
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+VIDEO_EXTENSIONS = {'.mp4', '.mov'}
+
+
+def media_type_for(name: str) -> Optional[str]:
+    extension = Path(name).suffix.lower()
+    if extension in IMAGE_EXTENSIONS:
+        return 'image'
+    if extension in VIDEO_EXTENSIONS:
+        return 'video'
+    return None
+
+
+def _image_dimensions(f) -> Optional[Tuple[int, int]]:
+    head = f.read(32)
+    if head.startswith(b'\x89PNG\r\n\x1a\n') and head[12:16] == b'IHDR':
+        return struct.unpack('>II', head[16:24])
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        chunk = head[12:16]
+        if chunk == b'VP8X':
+            return (int.from_bytes(head[24:27], 'little') + 1, int.from_bytes(head[27:30], 'little') + 1)
+        if chunk == b'VP8 ':
+            w, h = struct.unpack('<HH', head[26:30])
+            return (w & 0x3fff, h & 0x3fff)
+        if chunk == b'VP8L':
+            bits = int.from_bytes(head[21:25], 'little')
+            return ((bits & 0x3fff) + 1, ((bits >> 14) & 0x3fff) + 1)
+        return None
+    if head[:2] == b'\xff\xd8':
+        # Walk the JPEG segments to the start-of-frame marker
+        f.seek(2)
+        while True:
+            marker = f.read(2)
+            if len(marker) < 2 or marker[0] != 0xff:
+                return None
+            if marker[1] in (0xd8, 0x01) or 0xd0 <= marker[1] <= 0xd7:
+                continue
+            length = struct.unpack('>H', f.read(2))[0]
+            if 0xc0 <= marker[1] <= 0xcf and marker[1] not in (0xc4, 0xc8, 0xcc):
+                h, w = struct.unpack('>xHH', f.read(5))
+                return (w, h)
+            f.seek(length - 2, os.SEEK_CUR)
+    return None
+
+
+def _video_dimensions(f, end: int) -> Optional[Tuple[int, int]]:
+    # Walk the MP4/QuickTime boxes down to the first video track header
+    while f.tell() + 8 <= end:
+        start = f.tell()
+        size, kind = struct.unpack('>I4s', f.read(8))
+        if size == 1:
+            size = struct.unpack('>Q', f.read(8))[0]
+        elif size == 0:
+            size = end - start
+        if size < 8:
+            return None
+        if kind in (b'moov', b'trak', b'mdia', b'minf'):
+            found = _video_dimensions(f, start + size)
+            if found:
+                return found
+        elif kind == b'tkhd':
+            version = f.read(1)[0]
+            # Width and height (16.16 fixed point) close the box in both versions
+            f.seek(start + (92 if version == 1 else 80) + 4)
+            w, h = struct.unpack('>II', f.read(8))
+            if w and h:
+                return (w >> 16, h >> 16)
+        f.seek(start + size)
+    return None
+
+
+def media_dimensions(path: Path) -> Optional[Tuple[int, int]]:
+    """Pixel (width, height) of a local image or video, read from its headers."""
+    try:
+        with open(path, 'rb') as f:
+            if media_type_for(path.name) == 'video':
+                return _video_dimensions(f, os.fstat(f.fileno()).st_size)
+            return _image_dimensions(f)
+    except (OSError, struct.error, IndexError):
+        return None
+
+
+def parse_storage_path(storage_path: str) -> Dict[str, Optional[str]]:
+    """Split brand/scrolling_*_media[/product]/name into its parts."""
+    parts = storage_path.split('/')
+    brand, section, name = parts[0], parts[1] if len(parts) > 2 else '', parts[-1]
+    product = parts[2] if section == 'scrolling_product_media' and len(parts) > 3 else None
+    return {'brand': brand, 'section': section, 'product': product, 'name': name}
+
+
+class MediaCatalog:
+    """SQLite catalog of media objects in one bucket, keyed by storage path.
+
+    Safe to share between threads. Writes are committed immediately, so the
+    catalog stays correct if a migration or index run stops part-way. Each
+    folder synced from a full listing is recorded with its time, and so is
+    each completed scan of one section across every brand, so callers can
+    tell whether the catalog covers a question before answering it.
+    """
+
+    def __init__(self, path: Path = DEFAULT_CATALOG_PATH, bucket: str = BUCKET_NAME):
+        self.path = path
+        self.bucket = bucket
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS media (
+                bucket TEXT,
+                storage_path TEXT,
+                brand TEXT,
+                section TEXT,
+                product TEXT,
+                name TEXT,
+                media_type TEXT,
+                size INTEGER,
+                width INTEGER,
+                height INTEGER,
+                updated_at TEXT,
+                PRIMARY KEY (bucket, storage_path)
+            )
+        ''')
+        self._db.execute('CREATE INDEX IF NOT EXISTS media_brand ON media (bucket, brand, media_type)')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS synced_folders (
+                bucket TEXT,
+                folder TEXT,
+                synced_at TEXT,
+                PRIMARY KEY (bucket, folder)
+            )
+        ''')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS section_scans (
+                bucket TEXT,
+                section TEXT,
+                brands TEXT,
+                completed_at TEXT,
+                PRIMARY KEY (bucket, section)
+            )
+        ''')
+        self._db.commit()
+
+    def _row(self, storage_path: str, size: Optional[int], dimensions: Optional[Tuple[int, int]]):
+        parts = parse_storage_path(storage_path)
+        width, height = dimensions or (None, None)
+        return (self.bucket, storage_path, parts['brand'], parts['section'], parts['product'], parts['name'],
+                media_type_for(parts['name']), size, width, height, datetime.now().isoformat())
+
+    def record_local(self, storage_path: str, local_path: Path):
+        """Record an object uploaded from local_path, reading its dimensions unless already known for this size."""
+        if not media_type_for(storage_path):
+            return
+        size = local_path.stat().st_size
+        with self._lock:
+            known = self._db.execute(
+                'SELECT 1 FROM media WHERE bucket = ? AND storage_path = ? AND size = ? AND width IS NOT NULL',
+                (self.bucket, storage_path, size)
+            ).fetchone()
+        if known:
+            return
+        row = self._row(storage_path, size, media_dimensions(local_path))
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO media VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', row)
+            self._db.commit()
+
+    def sync_folder(self, folder: str, sizes: Dict[str, Optional[int]]):
+        """Make the catalog's view of one storage folder match a fresh listing of its media {name: size}.
+
+        Objects no longer listed are dropped; dimensions already known for an
+        object of the same size are kept.
+        """
+        with self._lock:
+            existing = dict(self._db.execute(
+                "SELECT name, size FROM media WHERE bucket = ? AND storage_path LIKE ? ESCAPE '\\' "
+                "AND storage_path NOT LIKE ? ESCAPE '\\'",
+                (self.bucket, self._like_prefix(folder) + '%', self._like_prefix(folder) + '%/%')
+            ).fetchall())
+            stale = [f"{folder}/{name}" for name in existing if name not in sizes]
+            self._db.executemany('DELETE FROM media WHERE bucket = ? AND storage_path = ?',
+                                 [(self.bucket, path) for path in stale])
+            for name, size in sizes.items():
+                if name in existing and (size is None or existing[name] == size):
+                    continue
+                self._db.execute('INSERT OR REPLACE INTO media VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                 self._row(f"{folder}/{name}", size, None))
+            self._db.execute('INSERT OR REPLACE INTO synced_folders VALUES (?, ?, ?)',
+                             (self.bucket, folder, datetime.now().isoformat()))
+            self._db.commit()
+
+    def record_section_scan(self, section: str, brands: List[str]):
+        """Record that every brand's folder for section was just synced, and which brands there were."""
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO section_scans VALUES (?, ?, ?, ?)',
+                             (self.bucket, section, json.dumps(sorted(brands)), datetime.now().isoformat()))
+            self._db.commit()
+
+    def covers_section(self, section: str, max_age: Optional[timedelta] = None) -> bool:
+        """Whether a completed scan of section (newer than max_age, if given) has every brand's folder synced."""
+        with self._lock:
+            scan = self._db.execute('SELECT brands, completed_at FROM section_scans WHERE bucket = ? AND section = ?',
+                                    (self.bucket, section)).fetchone()
+            if scan is None:
+                return False
+            if max_age is not None and datetime.now() - datetime.fromisoformat(scan[1]) > max_age:
+                return False
+            synced = {row[0] for row in self._db.execute(
+                'SELECT folder FROM synced_folders WHERE bucket = ?', (self.bucket,)
+            )}
+        return all(f"{brand}/{section}" in synced for brand in json.loads(scan[0]))
+
+    @staticmethod
+    def _like_prefix(folder: str) -> str:
+        escaped = folder.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return f"{escaped}/"
+
+    def brands_with_videos(self, extension: str = '.mp4') -> List[str]:
+        """Brands with at least one video in scrolling_brand_media.
+
+        Only videos with the given extension count: the storage-listing
+        version of this question only ever looked for .mp4 files, and .mov
+        files in brand media don't make a brand a video brand.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT DISTINCT brand FROM media WHERE bucket = ? AND section = 'scrolling_brand_media' "
+                "AND media_type = 'video' AND lower(name) LIKE '%' || ? ORDER BY brand",
+                (self.bucket, extension.lower())
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def media_counts(self) -> Dict[str, Dict[str, int]]:
+        """Per brand: number of images and videos, and their total size in bytes."""
+        counts: Dict[str, Dict[str, int]] = {}
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT brand, media_type, COUNT(*), COALESCE(SUM(size), 0) FROM media '
+                'WHERE bucket = ? GROUP BY brand, media_type ORDER BY brand',
+                (self.bucket,)
+            ).fetchall()
+        for brand, media_type, count, size in rows:
+            brand_counts = counts.setdefault(brand, {'image': 0, 'video': 0, 'bytes': 0})
+            brand_counts[media_type] = count
+            brand_counts['bytes'] += size
+        return counts
+
+    def missing_thumbnails(self) -> List[Tuple[str, str]]:
+        """(brand, product) folders with media but no image for the app to show as the product thumbnail."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT brand, product FROM media WHERE bucket = ? AND section = 'scrolling_product_media' "
+                "GROUP BY brand, product HAVING SUM(media_type = 'image') = 0 ORDER BY brand, product",
+                (self.bucket,)
+            ).fetchall()
+        return [(brand, product) for brand, product in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM media WHERE bucket = ?', (self.bucket,)).fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the local catalog of brand-content storage media")
+    parser.add_argument('query', choices=['brands-with-video', 'counts', 'missing-thumbnails'])
+    parser.add_argument('--catalog', default=str(DEFAULT_CATALOG_PATH), help='Catalog SQLite file')
+    args = parser.parse_args()
+
+    catalog = MediaCatalog(Path(args.catalog))
+    print(f"📒 Media catalog: {args.catalog} ({len(catalog)} objects)")
+    if args.query == 'brands-with-video':
+        brands = catalog.brands_with_videos()
+        print(f"Found {len(brands)} brands with videos in scrolling_brand_media:")
+        for brand in brands:
+            print(f"  - {brand}")
+    elif args.query == 'counts':
+        for brand, counts in catalog.media_counts().items():
+            print(f"  {brand}: {counts['image']} images, {counts['video']} videos, {counts['bytes'] / 1e6:.1f} MB")
+    else:
+        missing = catalog.missing_thumbnails()
+        print(f"Found {len(missing)} products without a thumbnail image:")
+        for brand, product in missing:
+            print(f"  - {brand}/{product}")
+
+
+if __name__ == "__main__":
+    main()
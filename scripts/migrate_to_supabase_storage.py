@@ -12,7 +12,7 @@ brand-content/
 │   └── scrolling_product_media/   (from shop_content/[brand]/[product_folders])
 
 Requirements:
-- Python packages: supabase, python-dotenv
+- Python packages: supabase, python-dotenv, requests
 - Environment variables for Supabase
 - Supabase project with 'brand-content' bucket
 """
@@ -26,12 +26,22 @@ import time
 import unicodedata
 import re
 import csv
+import hashlib
+import random
+import sqlite3
+import threading
+import concurrent.futures
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set, Tuple
 from dotenv import load_dotenv
 from supabase import create_client, Client
 
+from media_catalog import MediaCatalog, DEFAULT_CATALOG_PATH
+from index_files import INDEX_FILE_NAME, create_index_file, files_hash, media_files_in
+from storage_listing import iter_storage_names, LIST_PAGE_SIZE
+from tus_upload import TusUploader, TusUploadExpired, DEFAULT_CHUNK_SIZE
+
 # Load environment variables
 load_dotenv()
 
@@ -50,15 +60,228 @@ SCRAPERS_DIR = PROJECT_DIR / 'scrapers' / 'downloads'
 INSTAGRAM_DATA_DIR = SCRAPERS_DIR / 'instagram_data'
 SHOP_CONTENT_DIR = SCRAPERS_DIR / 'shop_content'
 
+# Local record of what has been uploaded, so reruns skip unchanged files without asking storage
+DEFAULT_LEDGER_PATH = SCRIPT_DIR / '.upload_ledger.sqlite3'
+
+# Files at least this large are sent as resumable chunked (TUS) uploads
+RESUMABLE_THRESHOLD = DEFAULT_CHUNK_SIZE
+
 # Supported file extensions
 SUPPORTED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.mp4', '.mov', '.webp'}
 
 # Progress tracking
-total_files = 0
-processed_files = 0
-skipped_files = 0
-errors = []
-failed_uploads = []  # Detailed failure tracking for CSV export
+class MigrationProgress:
+    """Counters, failures and uploaded-content index shared by the upload workers.
+    
+    Every update goes through a lock, so any number of workers can report
+    into the same instance.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total_files = 0
+        self.processed_files = 0
+        self.skipped_files = 0
+        self.unchanged_files = 0
+        self.deduplicated_files = 0
+        self.deduplicated_bytes = 0
+        self.uploaded_bytes = 0
+        self.indexes_written = 0
+        self.indexes_unchanged = 0
+        self.errors: List[str] = []
+        self.failed_uploads: List[Dict] = []  # Detailed failure tracking for CSV export
+        self.started_at = time.time()
+        self._uploaded_hashes: Dict[str, str] = {}  # SHA-256 of content -> first storage path holding it
+        self._pending_hashes: Dict[str, threading.Event] = {}
+    
+    @property
+    def completed_files(self) -> int:
+        return self.processed_files + self.skipped_files + self.unchanged_files + self.deduplicated_files
+    
+    def record_uploaded(self, size: int) -> int:
+        with self._lock:
+            self.processed_files += 1
+            self.uploaded_bytes += size
+            return self.completed_files
+    
+    def record_skipped(self) -> int:
+        with self._lock:
+            self.skipped_files += 1
+            return self.completed_files
+    
+    def record_unchanged(self) -> int:
+        with self._lock:
+            self.unchanged_files += 1
+            return self.completed_files
+    
+    def record_deduplicated(self, size: int) -> int:
+        with self._lock:
+            self.deduplicated_files += 1
+            self.deduplicated_bytes += size
+            return self.completed_files
+    
+    def record_index(self, written: bool):
+        with self._lock:
+            if written:
+                self.indexes_written += 1
+            else:
+                self.indexes_unchanged += 1
+    
+    def record_error(self, error_msg: str, failure: Optional[Dict] = None):
+        with self._lock:
+            self.errors.append(error_msg)
+            if failure:
+                self.failed_uploads.append(failure)
+    
+    def claim_content(self, content_hash: str) -> Optional[str]:
+        """Return a storage path already holding this content, or None if the caller should upload it.
+        
+        While another worker is uploading the same content this waits for it,
+        so identical files are never uploaded twice at once. A caller that
+        gets None must call release_content when done.
+        """
+        while True:
+            with self._lock:
+                if content_hash in self._uploaded_hashes:
+                    return self._uploaded_hashes[content_hash]
+                pending = self._pending_hashes.get(content_hash)
+                if pending is None:
+                    self._pending_hashes[content_hash] = threading.Event()
+                    return None
+            pending.wait()
+    
+    def release_content(self, content_hash: str, storage_path: Optional[str]):
+        """Finish a claim: record where the content now lives (None if the upload failed)."""
+        with self._lock:
+            pending = self._pending_hashes.pop(content_hash, None)
+            if storage_path:
+                self._uploaded_hashes.setdefault(content_hash, storage_path)
+        if pending:
+            pending.set()
+    
+    def remember_content(self, content_hash: str, storage_path: str):
+        with self._lock:
+            self._uploaded_hashes.setdefault(content_hash, storage_path)
+
+progress = MigrationProgress()
+
+class UploadLedger:
+    """Persistent SQLite record of every object this script has put in storage.
+    
+    Rows are keyed by project, bucket and storage path and hold the size,
+    mtime and SHA-256 of the local file that was uploaded. Each upload is
+    committed as soon as it completes, so an interrupted run resumes where
+    it stopped. Safe to share between upload workers.
+    """
+    
+    def __init__(self, path: Path, project: str = '', bucket: str = BUCKET_NAME):
+        self.path = path
+        self.project = project or ''
+        self.bucket = bucket
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS uploads (
+                project TEXT,
+                bucket TEXT,
+                storage_path TEXT,
+                local_path TEXT,
+                size INTEGER,
+                mtime_ns INTEGER,
+                content_hash TEXT,
+                uploaded_at TEXT,
+                PRIMARY KEY (project, bucket, storage_path)
+            )
+        ''')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS resumable_uploads (
+                project TEXT,
+                bucket TEXT,
+                storage_path TEXT,
+                upload_url TEXT,
+                size INTEGER,
+                mtime_ns INTEGER,
+                PRIMARY KEY (project, bucket, storage_path)
+            )
+        ''')
+        self._db.commit()
+    
+    def get(self, storage_path: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._db.execute(
+                'SELECT size, mtime_ns, content_hash FROM uploads WHERE project = ? AND bucket = ? AND storage_path = ?',
+                (self.project, self.bucket, storage_path)
+            ).fetchone()
+        if not row:
+            return None
+        return {'size': row[0], 'mtime_ns': row[1], 'content_hash': row[2]}
+    
+    def record(self, storage_path: str, local_path: Path, stat: os.stat_result, content_hash: str):
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO uploads VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (self.project, self.bucket, storage_path, str(local_path), stat.st_size, stat.st_mtime_ns,
+                 content_hash, datetime.now().isoformat())
+            )
+            self._db.commit()
+    
+    def resumable_url(self, storage_path: str, stat: os.stat_result) -> Optional[str]:
+        """URL of an unfinished resumable upload of this same file, if there is one."""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT upload_url, size, mtime_ns FROM resumable_uploads '
+                'WHERE project = ? AND bucket = ? AND storage_path = ?',
+                (self.project, self.bucket, storage_path)
+            ).fetchone()
+        if row and row[1] == stat.st_size and row[2] == stat.st_mtime_ns:
+            return row[0]
+        return None
+    
+    def remember_resumable(self, storage_path: str, upload_url: str, stat: os.stat_result):
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO resumable_uploads VALUES (?, ?, ?, ?, ?, ?)',
+                (self.project, self.bucket, storage_path, upload_url, stat.st_size, stat.st_mtime_ns)
+            )
+            self._db.commit()
+    
+    def forget_resumable(self, storage_path: str):
+        with self._lock:
+            self._db.execute(
+                'DELETE FROM resumable_uploads WHERE project = ? AND bucket = ? AND storage_path = ?',
+                (self.project, self.bucket, storage_path)
+            )
+            self._db.commit()
+    
+    def record_generated(self, storage_path: str, content_hash: str):
+        """Record an object written from generated content rather than a local file."""
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO uploads VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (self.project, self.bucket, storage_path, None, None, None,
+                 content_hash, datetime.now().isoformat())
+            )
+            self._db.commit()
+    
+    def content_index(self) -> Dict[str, str]:
+        """Map each uploaded content hash to one storage path holding it."""
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT content_hash, storage_path FROM uploads WHERE project = ? AND bucket = ?',
+                (self.project, self.bucket)
+            ).fetchall()
+        return dict(rows)
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute(
+                'SELECT COUNT(*) FROM uploads WHERE project = ? AND bucket = ?', (self.project, self.bucket)
+            ).fetchone()[0]
+
+upload_ledger: Optional[UploadLedger] = None
+media_catalog: Optional[MediaCatalog] = None
+resumable_threshold = RESUMABLE_THRESHOLD
 
 def sanitize_key_component(component: str) -> str:
     """Sanitize a string component for use in Supabase Storage keys.
@@ -74,37 +297,35 @@ def sanitize_key_component(component: str) -> str:
     component = re.sub(r"[^A-Za-z0-9._-]", "", component)
     return component
 
-def resolve_folder_name(suspect_name: str, base_dir: Path) -> Optional[str]:
-    """Resolve a possibly-sanitized brand name to the actual on-disk folder name under base_dir.
+class FolderIndex:
+    """The sub-folders of a source directory, listed once with os.scandir.
     
-    Tries, in order:
-    - Exact match
-    - Case-insensitive match
-    - Sanitized-name match (using sanitize_key_component)
-    Returns the real folder name if found, otherwise None.
+    resolve() maps a possibly-sanitized brand name to the real folder name by
+    trying, in order, an exact match, a case-insensitive match and a
+    sanitized-name match (using sanitize_key_component), each a dict lookup.
     """
-    try:
-        if not base_dir.exists() or not base_dir.is_dir():
-            return None
-        # Exact match
-        exact_path = base_dir / suspect_name
-        if exact_path.exists() and exact_path.is_dir():
+    
+    def __init__(self, base_dir: Path):
+        self.base_dir = base_dir
+        self.names: List[str] = []
+        try:
+            with os.scandir(base_dir) as entries:
+                self.names = sorted(entry.name for entry in entries if entry.is_dir())
+        except OSError:
+            pass
+        self._exact = set(self.names)
+        self._by_casefold: Dict[str, str] = {}
+        self._by_sanitized: Dict[str, str] = {}
+        for name in self.names:
+            self._by_casefold.setdefault(name.casefold(), name)
+            self._by_sanitized.setdefault(sanitize_key_component(name).casefold(), name)
+    
+    def resolve(self, suspect_name: str) -> Optional[str]:
+        """Return the real folder name if found, otherwise None."""
+        if suspect_name in self._exact:
             return suspect_name
-        suspect_lower = suspect_name.lower()
-        suspect_sanitized = sanitize_key_component(suspect_name).lower()
-        # Case-insensitive match
-        for item in base_dir.iterdir():
-            if item.is_dir() and item.name.lower() == suspect_lower:
-                return item.name
-        # Sanitized-name match
-        for item in base_dir.iterdir():
-            if not item.is_dir():
-                continue
-            if sanitize_key_component(item.name).lower() == suspect_sanitized:
-                return item.name
-    except Exception:
-        return None
-    return None
+        return (self._by_casefold.get(suspect_name.casefold())
+                or self._by_sanitized.get(sanitize_key_component(suspect_name).casefold()))
 
 def load_brands_from_file(path: str) -> List[str]:
     """Load brand names from a file supporting JSON array or newline/comma-separated lists."""
@@ -143,188 +364,406 @@ def get_mime_type(file_path: Path) -> str:
     }
     return mime_map.get(ext, 'application/octet-stream')
 
-def storage_file_exists(supabase: Client, storage_path: str) -> bool:
-    """Check if a file already exists at storage_path in the bucket."""
-    try:
-        parent = str(Path(storage_path).parent)
-        filename = Path(storage_path).name
-        list_path = '' if parent == '.' else parent
-        result = supabase.storage.from_(BUCKET_NAME).list(list_path)
-        if not result:
-            return False
-        for item in result:
-            if isinstance(item, dict) and item.get('name') == filename:
-                return True
+def file_sha256(file_path: Path) -> str:
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def copy_duplicate(supabase: Client, local_path: Path, storage_path: str, source_path: str) -> bool:
+    """Copy an identical, already uploaded object to storage_path server-side instead of uploading it again."""
+    if source_path == storage_path:
         return False
-    except Exception:
-        # If unsure, assume it does not exist to proceed with upload
-        return False
-
-def upload_file(supabase: Client, local_path: Path, storage_path: str, retries: int = 3) -> bool:
-    """Upload file to Supabase storage with retry logic. Skips if already exists."""
-    global processed_files, skipped_files, failed_uploads
-    
     try:
-        # Skip upload if the file already exists to prevent duplicates
-        if storage_file_exists(supabase, storage_path):
-            skipped_files += 1
-            print(f"⏭️  Skipping (exists): {storage_path}")
-            return True
-
-        print(f"📤 Uploading: {storage_path}")
-        
-        mime_type = get_mime_type(local_path)
-        
-        # Upload to Supabase using the correct syntax from documentation
-        with open(local_path, 'rb') as f:
-            response = supabase.storage.from_(BUCKET_NAME).upload(
-                file=f,
-                path=storage_path,
-                file_options={
-                    "content-type": mime_type
-                }
-            )
-        
-        # Check for errors in response
-        if hasattr(response, 'error') and response.error:
-            raise Exception(str(response.error))
-        
-        processed_files += 1
-        print(f"✅ Uploaded: {storage_path} ({processed_files}/{total_files})")
-        return True
-        
+        supabase.storage.from_(BUCKET_NAME).copy(source_path, storage_path)
     except Exception as error:
-        if retries > 0:
-            print(f"⚠️  Retrying upload: {storage_path} ({retries} retries left)")
-            time.sleep(1)  # Wait 1 second
-            return upload_file(supabase, local_path, storage_path, retries - 1)
-        
-        # Record detailed failure information
-        file_size = local_path.stat().st_size if local_path.exists() else 0
-        failed_upload = {
-            'timestamp': datetime.now().isoformat(),
-            'local_path': str(local_path),
-            'storage_path': storage_path,
-            'file_name': local_path.name,
-            'file_size_bytes': file_size,
-            'mime_type': get_mime_type(local_path),
-            'error_message': str(error),
-            'brand_name': storage_path.split('/')[0] if '/' in storage_path else '',
-            'media_type': 'brand_media' if 'scrolling_brand_media' in storage_path else 'product_media'
-        }
-        failed_uploads.append(failed_upload)
-        
-        error_msg = f"Failed to upload {storage_path}: {str(error)}"
-        print(f"❌ {error_msg}")
-        errors.append(error_msg)
+        print(f"⚠️  Server-side copy from {source_path} failed, uploading instead: {str(error)}")
         return False
+    
+    remote_manifest.add(storage_path)
+    done = progress.record_deduplicated(local_path.stat().st_size)
+    print(f"🔗 Copied (same content as {source_path}): {storage_path} ({done}/{progress.total_files})")
+    return True
 
-def get_media_files(dir_path: Path) -> List[Path]:
-    """Get all media files from a directory recursively."""
-    if not dir_path.exists():
-        return []
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 30.0) -> float:
+    """Exponential backoff with full jitter: a random delay of up to base * 2**attempt seconds, capped."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+class RemoteManifest:
+    """Names of the objects already in the bucket, listed once per storage folder.
     
-    files = []
-    for item in dir_path.rglob('*'):
-        if item.is_file() and item.suffix.lower() in SUPPORTED_EXTENSIONS:
-            files.append(item)
+    The first existence check in a folder lists the whole folder (page by
+    page) into a set; every later check in that folder is a set lookup, and
+    uploads and copies add their path as they complete. Safe to share
+    between upload workers: a folder is only ever listed by one of them.
+    """
     
-    return files
-
-def count_total_files(brand_names: List[str]) -> int:
-    """Count total files to process across both sources for provided brands."""
-    print('📊 Counting files to process...')
+    def __init__(self, page_size: int = LIST_PAGE_SIZE):
+        self.page_size = page_size
+        self.list_calls = 0
+        self._lock = threading.Lock()
+        self._folders: Dict[str, Set[str]] = {}
+        self._folder_locks: Dict[str, threading.Lock] = {}
     
-    count = 0
+    @staticmethod
+    def split_path(storage_path: str) -> Tuple[str, str]:
+        parent = str(Path(storage_path).parent)
+        return ('' if parent == '.' else parent), Path(storage_path).name
     
-    for brand_name in brand_names:
-        # Resolve Instagram folder
-        ig_resolved = resolve_folder_name(brand_name, INSTAGRAM_DATA_DIR)
-        if ig_resolved:
-            brand_dir = INSTAGRAM_DATA_DIR / ig_resolved
-            images_dir = brand_dir / 'images'
-            videos_dir = brand_dir / 'videos'
-            image_files = get_media_files(images_dir)
-            video_files = get_media_files(videos_dir)
-            count += len(image_files) + len(video_files)
+    def _count_list_call(self, page_length: int):
+        with self._lock:
+            self.list_calls += 1
+    
+    def _list_folder(self, supabase: Client, folder: str) -> Set[str]:
+        return set(iter_storage_names(supabase.storage.from_(BUCKET_NAME), folder,
+                                      page_size=self.page_size, on_page=self._count_list_call))
+    
+    def _folder_names(self, supabase: Client, folder: str) -> Optional[Set[str]]:
+        with self._lock:
+            if folder in self._folders:
+                return self._folders[folder]
+            folder_lock = self._folder_locks.setdefault(folder, threading.Lock())
         
-        # Resolve Shop content folder
-        shop_resolved = resolve_folder_name(brand_name, SHOP_CONTENT_DIR)
-        if shop_resolved:
-            brand_shop_dir = SHOP_CONTENT_DIR / shop_resolved
-            shop_files = get_media_files(brand_shop_dir)
-            count += len(shop_files)
+        with folder_lock:
+            with self._lock:
+                if folder in self._folders:
+                    return self._folders[folder]
+            try:
+                names = self._list_folder(supabase, folder)
+            except Exception as error:
+                # Not cached, so the next check in this folder tries again
+                print(f"⚠️  Could not list {folder or '/'}: {str(error)}")
+                return None
+            with self._lock:
+                self._folders[folder] = names
+            return names
+    
+    def exists(self, supabase: Client, storage_path: str) -> bool:
+        folder, name = self.split_path(storage_path)
+        names = self._folder_names(supabase, folder)
+        if names is None:
+            # If unsure, assume it does not exist to proceed with upload
+            return False
+        with self._lock:
+            return name in names
     
-    return count
+    def add(self, storage_path: str):
+        """Record a completed upload (folders not listed yet will see it when they are)."""
+        folder, name = self.split_path(storage_path)
+        with self._lock:
+            if folder in self._folders:
+                self._folders[folder].add(name)
+
+remote_manifest = RemoteManifest()
 
-def process_instagram_data(supabase: Client, brand_name: str) -> None:
-    """Process Instagram data for a brand."""
-    print(f"\n🏷️  Processing Instagram data for: {brand_name}")
+def storage_file_exists(supabase: Client, storage_path: str) -> bool:
+    """Check if a file already exists at storage_path in the bucket."""
+    return remote_manifest.exists(supabase, storage_path)
+
+def record_failed_upload(local_path: Path, storage_path: str, error: Exception) -> None:
+    """Record detailed failure information for the report and CSV export."""
+    file_size = local_path.stat().st_size if local_path.exists() else 0
+    failed_upload = {
+        'timestamp': datetime.now().isoformat(),
+        'local_path': str(local_path),
+        'storage_path': storage_path,
+        'file_name': local_path.name,
+        'file_size_bytes': file_size,
+        'mime_type': get_mime_type(local_path),
+        'error_message': str(error),
+        'brand_name': storage_path.split('/')[0] if '/' in storage_path else '',
+        'media_type': 'brand_media' if 'scrolling_brand_media' in storage_path else 'product_media'
+    }
+    error_msg = f"Failed to upload {storage_path}: {str(error)}"
+    print(f"❌ {error_msg}")
+    progress.record_error(error_msg, failed_upload)
+
+def put_object_resumable(local_path: Path, storage_path: str, mime_type: str, overwrite: bool = False) -> None:
+    """Stream a large file to storage in chunks over the TUS resumable upload endpoint.
     
-    brand_dir = INSTAGRAM_DATA_DIR / brand_name
-    if not brand_dir.exists():
-        print(f"⚠️  Instagram data not found for: {brand_name}")
-        return
+    The upload URL is kept in the ledger until the upload completes, so a
+    failed chunk, a retry or a rerun after a crash carries on from the last
+    byte storage acknowledged instead of sending the whole file again.
+    """
+    stat = local_path.stat()
+    uploader = TusUploader(
+        f"{SUPABASE_URL.rstrip('/')}/storage/v1/upload/resumable",
+        headers={'Authorization': f"Bearer {SUPABASE_ANON_KEY}", 'apikey': SUPABASE_ANON_KEY},
+        backoff=backoff_delay,
+    )
+    metadata = {
+        'bucketName': BUCKET_NAME,
+        'objectName': storage_path,
+        'contentType': mime_type,
+        'cacheControl': '3600',
+    }
+    upload_url = upload_ledger.resumable_url(storage_path, stat)
+    if upload_url:
+        print(f"🔁 Resuming upload: {storage_path}")
+    try:
+        uploader.upload(
+            str(local_path), metadata, upload_url=upload_url,
+            extra_headers={'x-upsert': 'true'} if overwrite else None,
+            on_created=lambda url: upload_ledger.remember_resumable(storage_path, url, stat),
+            on_abandoned=lambda url: upload_ledger.forget_resumable(storage_path),
+        )
+    except TusUploadExpired:
+        # Storage dropped the half-finished upload; the next attempt starts a new one
+        upload_ledger.forget_resumable(storage_path)
+        raise
+    upload_ledger.forget_resumable(storage_path)
+
+def put_object(supabase: Client, local_path: Path, storage_path: str, retries: int = 3,
+               overwrite: bool = False) -> bool:
+    """Upload one file, retrying failures with exponential backoff and jitter.
+    
+    Files of resumable_threshold bytes or more go through
+    put_object_resumable rather than a single request.
+    """
+    mime_type = get_mime_type(local_path)
+    file_options = {"content-type": mime_type}
+    if overwrite:
+        file_options["upsert"] = "true"
     
-    # Sanitize brand name for storage path
-    brand_safe = sanitize_key_component(brand_name)
+    for attempt in range(retries + 1):
+        try:
+            print(f"📤 Uploading: {storage_path}")
+            
+            if resumable_threshold and local_path.stat().st_size >= resumable_threshold:
+                put_object_resumable(local_path, storage_path, mime_type, overwrite)
+            else:
+                # Upload to Supabase using the correct syntax from documentation
+                with open(local_path, 'rb') as f:
+                    response = supabase.storage.from_(BUCKET_NAME).upload(
+                        file=f,
+                        path=storage_path,
+                        file_options=file_options
+                    )
+                
+                # Check for errors in response
+                if hasattr(response, 'error') and response.error:
+                    raise Exception(str(response.error))
+            
+            remote_manifest.add(storage_path)
+            done = progress.record_uploaded(local_path.stat().st_size)
+            print(f"✅ Uploaded: {storage_path} ({done}/{progress.total_files})")
+            return True
+        
+        except Exception as error:
+            if attempt == retries:
+                record_failed_upload(local_path, storage_path, error)
+                return False
+            delay = backoff_delay(attempt)
+            print(f"⚠️  Retrying upload: {storage_path} in {delay:.1f}s ({retries - attempt} retries left)")
+            time.sleep(delay)
     
-    files_processed = 0
+    return False
+
+def upload_file(supabase: Client, local_path: Path, storage_path: str, retries: int = 3) -> bool:
+    """Upload file to Supabase storage with retry logic. Skips if already exists.
+    
+    Files the ledger shows were uploaded with the same size and mtime are
+    skipped without hashing or any network call; files whose content has
+    changed since are uploaded over the old object. Files whose content was
+    already uploaded under another path are copied server-side from there
+    rather than uploaded again. Safe to call from several worker threads at
+    once.
+    """
+    try:
+        stat = local_path.stat()
+        entry = upload_ledger.get(storage_path)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            done = progress.record_unchanged()
+            print(f"⏭️  Skipping (unchanged): {storage_path} ({done}/{progress.total_files})")
+            return True
+        content_hash = file_sha256(local_path)
+    except OSError as error:
+        record_failed_upload(local_path, storage_path, error)
+        return False
     
-    # Process images directory
-    images_dir = brand_dir / 'images'
-    image_files = get_media_files(images_dir)
+    # Touched but not modified: just bring the ledger up to date
+    if entry and entry['content_hash'] == content_hash:
+        upload_ledger.record(storage_path, local_path, stat, content_hash)
+        done = progress.record_unchanged()
+        print(f"⏭️  Skipping (unchanged): {storage_path} ({done}/{progress.total_files})")
+        return True
     
-    for file_path in image_files:
-        storage_path = f"{brand_safe}/scrolling_brand_media/{file_path.name}"
-        if upload_file(supabase, file_path, storage_path):
-            files_processed += 1
+    # Modified since it was uploaded, so the old object is overwritten
+    modified = entry is not None
     
-    # Process videos directory  
-    videos_dir = brand_dir / 'videos'
-    video_files = get_media_files(videos_dir)
+    # Skip upload if the file already exists to prevent duplicates
+    if not modified and storage_file_exists(supabase, storage_path):
+        upload_ledger.record(storage_path, local_path, stat, content_hash)
+        done = progress.record_skipped()
+        progress.remember_content(content_hash, storage_path)
+        print(f"⏭️  Skipping (exists): {storage_path} ({done}/{progress.total_files})")
+        return True
     
-    for file_path in video_files:
-        storage_path = f"{brand_safe}/scrolling_brand_media/{file_path.name}"
-        if upload_file(supabase, file_path, storage_path):
-            files_processed += 1
+    source_path = progress.claim_content(content_hash)
+    if source_path:
+        ok = not modified and copy_duplicate(supabase, local_path, storage_path, source_path)
+        if not ok:
+            ok = put_object(supabase, local_path, storage_path, retries, overwrite=modified)
+    else:
+        ok = False
+        try:
+            ok = put_object(supabase, local_path, storage_path, retries, overwrite=modified)
+        finally:
+            progress.release_content(content_hash, storage_path if ok else None)
     
-    total_brand_files = len(image_files) + len(video_files)
-    print(f"✅ Completed Instagram data for: {brand_name} ({files_processed}/{total_brand_files} files)")
+    if ok:
+        upload_ledger.record(storage_path, local_path, stat, content_hash)
+    return ok
+
+def get_media_files(dir_path: Path) -> List[Path]:
+    """Get all media files from a directory recursively, in one os.scandir walk."""
+    files = []
+    pending = [str(dir_path)]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in SUPPORTED_EXTENSIONS:
+                        files.append(Path(entry.path))
+        except OSError:
+            continue
+    return files
 
-def process_shop_content(supabase: Client, brand_name: str) -> None:
-    """Process shop content for a brand."""
-    print(f"\n🛍️  Processing shop content for: {brand_name}")
+def instagram_upload_jobs(brand_name: str) -> List[Tuple[Path, str]]:
+    """List (local file, storage path) uploads for a brand's Instagram data."""
+    brand_dir = INSTAGRAM_DATA_DIR / brand_name
+    
+    # Sanitize brand name for storage path
+    brand_safe = sanitize_key_component(brand_name)
     
+    jobs = []
+    # Images and videos directories
+    for media_dir in (brand_dir / 'images', brand_dir / 'videos'):
+        for file_path in get_media_files(media_dir):
+            jobs.append((file_path, f"{brand_safe}/scrolling_brand_media/{file_path.name}"))
+    return jobs
+
+def shop_upload_jobs(brand_name: str) -> List[Tuple[Path, str]]:
+    """List (local file, storage path) uploads for a brand's shop content."""
     brand_shop_dir = SHOP_CONTENT_DIR / brand_name
-    if not brand_shop_dir.exists():
+    try:
+        with os.scandir(brand_shop_dir) as entries:
+            product_dirs = [entry for entry in entries if entry.is_dir()]
+    except OSError:
         print(f"⚠️  Shop content not found for: {brand_name}")
-        return
+        return []
     
     # Sanitize brand name for storage path
     brand_safe = sanitize_key_component(brand_name)
     
-    files_processed = 0
-    total_product_files = 0
-    
+    jobs = []
     # Get all product folders
-    for product_dir in brand_shop_dir.iterdir():
-        if not product_dir.is_dir():
-            continue
-        
+    for product_dir in product_dirs:
         # Sanitize product name for storage path
         product_safe = sanitize_key_component(product_dir.name)
         
-        product_files = get_media_files(product_dir)
-        total_product_files += len(product_files)
-        
-        for file_path in product_files:
+        for file_path in get_media_files(Path(product_dir.path)):
             # Maintain product folder structure in storage with sanitized names
-            storage_path = f"{brand_safe}/scrolling_product_media/{product_safe}/{file_path.name}"
-            if upload_file(supabase, file_path, storage_path):
-                files_processed += 1
+            jobs.append((file_path, f"{brand_safe}/scrolling_product_media/{product_safe}/{file_path.name}"))
+    return jobs
+
+def plan_brand_uploads(brand_name: str, instagram_index: FolderIndex,
+                       shop_index: FolderIndex) -> List[Tuple[str, List[Tuple[Path, str]]]]:
+    """Resolve a brand's source folders and list its uploads as (label, jobs) groups."""
+    ig_resolved = instagram_index.resolve(brand_name)
+    shop_resolved = shop_index.resolve(brand_name)
+    
+    print(f"\n🏢 Planning brand: {brand_name}")
+    print(f"INSTAGRAM_DATA_DIR resolved:  {INSTAGRAM_DATA_DIR / ig_resolved if ig_resolved else 'None'}")
+    print(f"SHOP_CONTENT_DIR resolved:   {SHOP_CONTENT_DIR / shop_resolved if shop_resolved else 'None'}")
+    
+    groups = []
+    # Instagram data (scrolling_brand_media) only if source exists
+    if ig_resolved:
+        groups.append((f"Instagram data for: {ig_resolved}", instagram_upload_jobs(ig_resolved)))
+    else:
+        print(f"ℹ️  No Instagram data for: {brand_name} (skipping brand media)")
     
-    print(f"✅ Completed shop content for: {brand_name} ({files_processed}/{total_product_files} files)")
+    # Shop content (scrolling_product_media) only if source exists
+    if shop_resolved:
+        groups.append((f"shop content for: {shop_resolved}", shop_upload_jobs(shop_resolved)))
+    else:
+        print(f"ℹ️  No shop content for: {brand_name} (skipping product media)")
+    return groups
+
+def run_uploads(supabase: Client, plan: List[Tuple[str, List[Tuple[Path, str]]]], concurrency: int) -> Set[str]:
+    """Upload every planned file on a pool of concurrency workers, reporting each group as it finishes.
+    
+    Returns the storage paths that are in the bucket afterwards (uploaded,
+    copied or skipped because they were already there).
+    """
+    stored: Set[str] = set()
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        submitted = [
+            (label, [(local_path, storage_path, executor.submit(upload_file, supabase, local_path, storage_path))
+                     for local_path, storage_path in jobs])
+            for label, jobs in plan
+        ]
+        for label, futures in submitted:
+            files_processed = 0
+            for local_path, storage_path, future in futures:
+                if future.result():
+                    stored.add(storage_path)
+                    files_processed += 1
+                    if media_catalog is not None:
+                        media_catalog.record_local(storage_path, local_path)
+            print(f"✅ Completed {label} ({files_processed}/{len(futures)} files)")
+    except BaseException:
+        # Don't start anything still queued; uploads already running finish on their own
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown(wait=True)
+    return stored
+
+def write_index(supabase: Client, folder: str, files: List[str]) -> bool:
+    """Write a folder's index.json unless the ledger shows one listing the same files was already written."""
+    index_path = f"{folder}/{INDEX_FILE_NAME}"
+    content_hash = files_hash(files)
+    entry = upload_ledger.get(index_path)
+    if entry and entry['content_hash'] == content_hash:
+        progress.record_index(written=False)
+        return True
+    if not create_index_file(supabase, folder, files):
+        progress.record_error(f"Failed to write {index_path}")
+        return False
+    upload_ledger.record_generated(index_path, content_hash)
+    progress.record_index(written=True)
+    return True
+
+def write_plan_indexes(supabase: Client, plan: List[Tuple[str, List[Tuple[Path, str]]]],
+                       stored: Set[str], concurrency: int) -> None:
+    """Write the index.json of every brand and product media folder in the plan from the files now stored there.
+    
+    Uses the same format as index_files.py, built from the local plan rather
+    than by listing the bucket, so the planned files are taken to be the
+    folder's whole contents.
+    """
+    folders: Dict[str, List[str]] = {}
+    for _, jobs in plan:
+        for _, storage_path in jobs:
+            # Like index_files.py, every brand gets a (possibly empty) brand media index
+            folders.setdefault(f"{storage_path.split('/', 1)[0]}/scrolling_brand_media", [])
+            folder, name = RemoteManifest.split_path(storage_path)
+            names = folders.setdefault(folder, [])
+            if storage_path in stored:
+                names.append(name)
+    
+    print(f"\n🗂️  Writing index.json for {len(folders)} folders")
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(write_index, supabase, folder, media_files_in(sorted(set(names))))
+                   for folder, names in folders.items()]
+        for future in futures:
+            future.result()
 
 def verify_bucket(supabase: Client) -> bool:
     """Verify bucket exists and is accessible."""
@@ -346,7 +785,7 @@ def verify_bucket(supabase: Client) -> bool:
 
 def export_failed_uploads_csv() -> None:
     """Export failed uploads to CSV file in scripts folder."""
-    if not failed_uploads:
+    if not progress.failed_uploads:
         print("📊 No failed uploads to export.")
         return
     
@@ -372,10 +811,10 @@ def export_failed_uploads_csv() -> None:
             writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
             writer.writeheader()
             
-            for failure in failed_uploads:
+            for failure in progress.failed_uploads:
                 writer.writerow(failure)
         
-        print(f"📊 Exported {len(failed_uploads)} failed uploads to: {csv_path}")
+        print(f"📊 Exported {len(progress.failed_uploads)} failed uploads to: {csv_path}")
         
     except Exception as error:
         print(f"❌ Failed to export CSV: {str(error)}")
@@ -384,22 +823,30 @@ def generate_report() -> None:
     """Generate progress report."""
     print('\n📋 MIGRATION REPORT')
     print('=' * 50)
-    print(f"Total files considered: {total_files}")
-    print(f"- Uploaded: {processed_files}")
-    print(f"- Skipped (already existed): {skipped_files}")
-    
-    if total_files > 0:
-        completed = processed_files + skipped_files
-        success_rate = (completed / total_files) * 100
-        print(f"Completion rate (uploaded or skipped): {success_rate:.2f}%")
+    elapsed = time.time() - progress.started_at
+    print(f"Total files considered: {progress.total_files}")
+    print(f"- Uploaded: {progress.processed_files} ({progress.uploaded_bytes / 1e6:.1f} MB, "
+          f"{progress.uploaded_bytes / 1e6 / elapsed if elapsed else 0:.2f} MB/s)")
+    print(f"- Skipped (unchanged since last upload): {progress.unchanged_files}")
+    print(f"- Skipped (already existed): {progress.skipped_files}")
+    print(f"- Copied from identical content: {progress.deduplicated_files} "
+          f"({progress.deduplicated_bytes / 1e6:.1f} MB not uploaded)")
+    
+    if progress.total_files > 0:
+        success_rate = (progress.completed_files / progress.total_files) * 100
+        print(f"Completion rate (uploaded, skipped or copied): {success_rate:.2f}%")
     else:
         print("Completion rate: 0%")
     
-    print(f"Errors: {len(errors)}")
+    if progress.indexes_written or progress.indexes_unchanged:
+        print(f"Index files written: {progress.indexes_written} "
+              f"({progress.indexes_unchanged} unchanged since last written)")
+    print(f"Storage list calls: {remote_manifest.list_calls}")
+    print(f"Errors: {len(progress.errors)}")
     
-    if errors:
+    if progress.errors:
         print('\n❌ ERRORS:')
-        for i, error in enumerate(errors, 1):
+        for i, error in enumerate(progress.errors, 1):
             print(f"{i}. {error}")
     
     # Export failed uploads to CSV
@@ -409,8 +856,6 @@ def generate_report() -> None:
 
 def main():
     """Main migration function."""
-    global total_files
-    
     print('🚀 Starting Supabase Storage Migration')
     print('=' * 50)
     
@@ -455,17 +900,58 @@ def main():
         default=None,
         help="Comma-separated list of brand names",
     )
+    parser.add_argument(
+        "--concurrency",
+        dest="concurrency",
+        type=int,
+        default=8,
+        help="Number of files uploaded in parallel (default: 8)",
+    )
+    parser.add_argument(
+        "--ledger",
+        dest="ledger",
+        type=str,
+        default=str(DEFAULT_LEDGER_PATH),
+        help="SQLite file recording completed uploads, so reruns skip unchanged files",
+    )
+    parser.add_argument(
+        "--resumable-threshold-mb",
+        dest="resumable_threshold_mb",
+        type=float,
+        default=RESUMABLE_THRESHOLD / (1024 * 1024),
+        help="Upload files of at least this many MB in resumable chunks (0 disables; default: 6)",
+    )
+    parser.add_argument(
+        "--catalog",
+        dest="catalog",
+        type=str,
+        default=str(DEFAULT_CATALOG_PATH),
+        help="SQLite media catalog updated with every object in storage (see media_catalog.py)",
+    )
+    parser.add_argument(
+        "--write-indexes",
+        dest="write_indexes",
+        action="store_true",
+        help="Also write each media folder's index.json from the upload plan (instead of running index_files.py)",
+    )
     args = parser.parse_args()
+    
+    global upload_ledger, resumable_threshold, media_catalog
+    resumable_threshold = int(args.resumable_threshold_mb * 1024 * 1024)
+    upload_ledger = UploadLedger(Path(args.ledger), project=SUPABASE_URL)
+    # Content uploaded on earlier runs can be copied server-side rather than uploaded again
+    for content_hash, storage_path in upload_ledger.content_index().items():
+        progress.remember_content(content_hash, storage_path)
+    print(f"📒 Upload ledger: {args.ledger} ({len(upload_ledger)} uploads recorded)")
+    media_catalog = MediaCatalog(Path(args.catalog))
+    print(f"📒 Media catalog: {args.catalog} ({len(media_catalog)} objects)")
 
-    # Build union of brand names from both sources, optionally restricted by CLI args
-    instagram_brands = set()
-    shop_content_brands = set()
-    if INSTAGRAM_DATA_DIR.exists():
-        instagram_brands = {item.name for item in INSTAGRAM_DATA_DIR.iterdir() if item.is_dir()}
-    if SHOP_CONTENT_DIR.exists():
-        shop_content_brands = {item.name for item in SHOP_CONTENT_DIR.iterdir() if item.is_dir()}
+    # Build union of brand names from both sources, optionally restricted by CLI args.
+    # Each source folder is listed once; brand lookups below go through these indexes.
+    instagram_index = FolderIndex(INSTAGRAM_DATA_DIR)
+    shop_index = FolderIndex(SHOP_CONTENT_DIR)
 
-    discovered_brands = sorted(instagram_brands.union(shop_content_brands))
+    discovered_brands = sorted(set(instagram_index.names).union(shop_index.names))
 
     brand_names: List[str] = []
     if args.brands_file:
@@ -480,45 +966,31 @@ def main():
     
     print("BRAND NAMES: ", brand_names)
     
-    # Count total files across the selected set
-    total_files = count_total_files(brand_names)
-    print(f"📊 Total files to process: {total_files}")
+    # Plan every brand's uploads in a single walk up front; the plan gives the
+    # progress total and feeds one worker pool shared by all brands
+    plan = []
+    for brand_name in brand_names:
+        try:
+            plan.extend(plan_brand_uploads(brand_name, instagram_index, shop_index))
+        except Exception as error:
+            error_msg = f"Failed to process brand {brand_name}: {str(error)}"
+            print(f"❌ {error_msg}")
+            progress.record_error(error_msg)
     
-    if total_files == 0:
+    progress.total_files = sum(len(jobs) for _, jobs in plan)
+    print(f"📊 Total files to process: {progress.total_files}")
+    
+    if progress.total_files == 0:
         print('⚠️  No files found to migrate')
         return
     
     print(f"📦 Found {len(brand_names)} brands to process (union of sources)")
+    print(f"⚙️  Uploading with {args.concurrency} workers")
     
-
-    # Process each brand
-    for brand_name in brand_names:
-        try:
-            ig_resolved = resolve_folder_name(brand_name, INSTAGRAM_DATA_DIR)
-            shop_resolved = resolve_folder_name(brand_name, SHOP_CONTENT_DIR)
-
-            print(f"\n🏢 Processing brand: {brand_name}")
-            print(f"INSTAGRAM_DATA_DIR requested: {INSTAGRAM_DATA_DIR / brand_name}")
-            print(f"INSTAGRAM_DATA_DIR resolved:  {INSTAGRAM_DATA_DIR / ig_resolved if ig_resolved else 'None'}")
-            print(f"SHOP_CONTENT_DIR requested:  {SHOP_CONTENT_DIR / brand_name}")
-            print(f"SHOP_CONTENT_DIR resolved:   {SHOP_CONTENT_DIR / shop_resolved if shop_resolved else 'None'}")
-
-            # Process Instagram data (scrolling_brand_media) only if source exists
-            if ig_resolved:
-                process_instagram_data(supabase, ig_resolved)
-            else:
-                print(f"ℹ️  No Instagram data for: {brand_name} (skipping brand media)")
-            
-            # Process shop content (scrolling_product_media) only if source exists
-            if shop_resolved:
-                process_shop_content(supabase, shop_resolved)
-            else:
-                print(f"ℹ️  No shop content for: {brand_name} (skipping product media)")
-            
-        except Exception as error:
-            error_msg = f"Failed to process brand {brand_name}: {str(error)}"
-            print(f"❌ {error_msg}")
-            errors.append(error_msg)
+    progress.started_at = time.time()
+    stored = run_uploads(supabase, plan, args.concurrency)
+    if args.write_indexes:
+        write_plan_indexes(supabase, plan, stored, args.concurrency)
     
     # Generate final report
     generate_report()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+"""
+Paginated listing of Supabase Storage folders
+
+Storage list() returns at most one page of entries per call, so anything
+past the first page is silently missing unless the caller keeps asking.
+iter_storage_folder pages through a folder lazily, holding one page in
+memory at a time, and fetches the next page in the background while the
+current one is being consumed.
+"""
+
+import concurrent.futures
+from typing import Callable, Dict, Iterator, Optional
+
+# Objects per storage list() call
+LIST_PAGE_SIZE = 1000
+
+
+def iter_storage_folder(bucket, folder: str = '', page_size: int = LIST_PAGE_SIZE,
+                        prefetch: bool = True,
+                        on_page: Optional[Callable[[int], None]] = None) -> Iterator[Dict]:
+    """Yield every entry (files and subfolders) in a storage folder.
+
+    bucket is a storage bucket handle, i.e. supabase.storage.from_(name).
+    Entries come in name order, page_size per list() call. With prefetch,
+    the next page is requested as soon as a full page arrives. on_page is
+    called with the size of each page fetched, e.g. to count list() calls.
+    Stopping the iteration early abandons any page still being fetched.
+    """
+    def fetch(offset: int):
+        items = bucket.list(folder, {
+            'limit': page_size,
+            'offset': offset,
+            'sortBy': {'column': 'name', 'order': 'asc'},
+        }) or []
+        if on_page:
+            on_page(len(items))
+        return items
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        offset = 0
+        items = fetch(offset)
+        while True:
+            next_page = None
+            if len(items) >= page_size:
+                offset += len(items)
+                if executor:
+                    next_page = executor.submit(fetch, offset)
+
+            for item in items:
+                if isinstance(item, dict) and item.get('name'):
+                    yield item
+
+            if len(items) < page_size:
+                return
+            items = next_page.result() if next_page else fetch(offset)
+    finally:
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_storage_names(bucket, folder: str = '', **kwargs) -> Iterator[str]:
+    """Names of the entries in a storage folder; see iter_storage_folder."""
+    for item in iter_storage_folder(bucket, folder, **kwargs):
+        yield item['name']
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+"""
+Local stand-in for Supabase Storage's resumable (TUS) upload endpoint.
+
+Serves POST/HEAD/PATCH on /storage/v1/upload/resumable from memory and can
+drop connections part-way through chunks, so resumable uploads can be
+exercised without a Supabase project or a real flaky network.
+
+Run directly to upload a generated file through tus_upload with failures
+injected and check that it arrives intact:
+
+    python tus_stand_in_server.py --size-mb 40 --fail-every 3
+"""
+
+import argparse
+import base64
+import hashlib
+import os
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from tus_upload import TusUploader
+
+RESUMABLE_PATH = '/storage/v1/upload/resumable'
+
+
+class TusStandInServer:
+    """In-memory TUS server.
+
+    Every ``fail_every``-th PATCH stores only the first half of its chunk and
+    then drops the connection without answering, the way an upload over a
+    flaky link is cut off mid-chunk. Completed objects are kept in
+    ``objects`` by "bucket/object" name.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, fail_every: int = 0):
+        self.host = host
+        self.port = port
+        self.fail_every = fail_every
+        self.uploads: Dict[str, Dict] = {}
+        self.objects: Dict[str, bytes] = {}
+        self.patches = 0
+        self.dropped = 0
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @staticmethod
+    def _decode_metadata(header: str) -> Dict[str, str]:
+        metadata = {}
+        for pair in filter(None, (part.strip() for part in header.split(','))):
+            key, _, value = pair.partition(' ')
+            metadata[key] = base64.b64decode(value).decode('utf-8') if value else ''
+        return metadata
+
+    def _make_handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status: int, headers: Optional[Dict[str, str]] = None, body: bytes = b''):
+                self.send_response(status)
+                self.send_header('Tus-Resumable', '1.0.0')
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+
+            def _upload(self) -> Optional[Dict]:
+                upload_id = self.path.rsplit('/', 1)[-1]
+                return stand_in.uploads.get(upload_id)
+
+            def do_POST(self):
+                if self.path.rstrip('/') != RESUMABLE_PATH:
+                    return self._reply(404)
+                metadata = stand_in._decode_metadata(self.headers.get('Upload-Metadata', ''))
+                key = f"{metadata.get('bucketName', '')}/{metadata.get('objectName', '')}"
+                if key in stand_in.objects and self.headers.get('x-upsert') != 'true':
+                    return self._reply(409, body=b'The resource already exists')
+                upload_id = uuid.uuid4().hex
+                with stand_in._lock:
+                    stand_in.uploads[upload_id] = {
+                        'key': key,
+                        'length': int(self.headers['Upload-Length']),
+                        'data': bytearray(),
+                    }
+                self._reply(201, {'Location': f"{RESUMABLE_PATH}/{upload_id}"})
+
+            def do_HEAD(self):
+                upload = self._upload()
+                if upload is None:
+                    return self._reply(404)
+                self._reply(200, {
+                    'Upload-Offset': str(len(upload['data'])),
+                    'Upload-Length': str(upload['length']),
+                    'Cache-Control': 'no-store',
+                })
+
+            def do_PATCH(self):
+                upload = self._upload()
+                length = int(self.headers.get('Content-Length', 0))
+                if upload is None:
+                    self.rfile.read(length)
+                    return self._reply(404)
+                if int(self.headers.get('Upload-Offset', -1)) != len(upload['data']):
+                    self.rfile.read(length)
+                    return self._reply(409, body=b'Upload-Offset mismatch')
+
+                with stand_in._lock:
+                    stand_in.patches += 1
+                    drop = stand_in.fail_every and stand_in.patches % stand_in.fail_every == 0
+                if drop:
+                    # Keep what "arrived" before the link went down, then hang up
+                    partial = self.rfile.read(length // 2)
+                    upload['data'].extend(partial)
+                    with stand_in._lock:
+                        stand_in.dropped += 1
+                        stand_in.bytes_received += len(partial)
+                    self.close_connection = True
+                    self.connection.shutdown(socket.SHUT_RDWR)
+                    return
+
+                chunk = self.rfile.read(length)
+                upload['data'].extend(chunk)
+                with stand_in._lock:
+                    stand_in.bytes_received += len(chunk)
+                    if len(upload['data']) >= upload['length']:
+                        stand_in.objects[upload['key']] = bytes(upload['data'])
+                self._reply(204, {'Upload-Offset': str(len(upload['data']))})
+
+        return Handler
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://{self.host}:{self._server.server_address[1]}{RESUMABLE_PATH}"
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload a generated file to a local TUS stand-in with dropped chunks")
+    parser.add_argument('--size-mb', type=float, default=40, help='Size of the test file')
+    parser.add_argument('--chunk-mb', type=float, default=6, help='Chunk size')
+    parser.add_argument('--fail-every', type=int, default=3, help='Drop every Nth chunk half-way (0 = never)')
+    args = parser.parse_args()
+
+    size = int(args.size_mb * 1024 * 1024)
+    with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as f:
+        f.write(os.urandom(size))
+        path = f.name
+
+    try:
+        with TusStandInServer(fail_every=args.fail_every) as server:
+            uploader = TusUploader(server.endpoint, chunk_size=int(args.chunk_mb * 1024 * 1024),
+                                   backoff=lambda attempt: 0.05)
+            start = time.perf_counter()
+            uploader.upload(path, {'bucketName': 'brand-content', 'objectName': 'test/video.mp4',
+                                   'contentType': 'video/mp4'})
+            elapsed = time.perf_counter() - start
+
+            with open(path, 'rb') as f:
+                expected = hashlib.sha256(f.read()).hexdigest()
+            stored = server.objects.get('brand-content/test/video.mp4', b'')
+            intact = hashlib.sha256(stored).hexdigest() == expected
+
+            print(f"Uploaded {size / 1e6:.1f} MB in {elapsed:.2f}s")
+            print(f"Chunks sent: {server.patches}, dropped half-way: {server.dropped}")
+            print(f"Bytes received: {server.bytes_received / 1e6:.1f} MB "
+                  f"({server.bytes_received / size:.2f}x the file; restarting from zero would resend everything)")
+            print(f"{'✅' if intact else '❌'} Stored object {'matches' if intact else 'does not match'} the file")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
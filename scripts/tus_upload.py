@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+"""
+Resumable uploads over the TUS protocol (https://tus.io), as served by
+Supabase Storage at /storage/v1/upload/resumable.
+
+A file is sent in fixed-size chunks read from disk one at a time. When a
+chunk fails, the server is asked how many bytes it already has and the
+upload carries on from there instead of starting again from byte zero.
+"""
+
+import base64
+import os
+import random
+import time
+from typing import Callable, Dict, Optional
+from urllib.parse import urljoin
+
+import requests
+
+TUS_VERSION = '1.0.0'
+# Supabase requires every chunk except the last to be exactly 6 MB
+DEFAULT_CHUNK_SIZE = 6 * 1024 * 1024
+
+
+class TusError(Exception):
+    """The server rejected a TUS request."""
+
+
+class TusUploadExpired(TusError):
+    """The server no longer has the upload being resumed."""
+
+
+def default_backoff(attempt: int, base: float = 0.5, cap: float = 30.0) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def encode_metadata(metadata: Dict[str, str]) -> str:
+    """Upload-Metadata header value: comma-separated "key base64(value)" pairs."""
+    return ','.join(
+        f"{key} {base64.b64encode(str(value).encode('utf-8')).decode('ascii')}"
+        for key, value in metadata.items()
+    )
+
+
+class TusUploader:
+    """Creates and resumes TUS uploads against one endpoint.
+
+    headers are sent with every request (auth, x-upsert, ...). Chunk
+    failures are retried up to ``retries`` times in a row, waiting
+    ``backoff(attempt)`` seconds and resuming from the offset the server
+    reports.
+    """
+
+    def __init__(self, endpoint: str, headers: Optional[Dict[str, str]] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, retries: int = 5, timeout: int = 60,
+                 session: Optional[requests.Session] = None,
+                 backoff: Callable[[int], float] = default_backoff):
+        self.endpoint = endpoint
+        self.headers = dict(headers or {})
+        self.headers['Tus-Resumable'] = TUS_VERSION
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.backoff = backoff
+
+    def create(self, size: int, metadata: Dict[str, str], extra_headers: Optional[Dict[str, str]] = None) -> str:
+        """Start an upload of size bytes and return its URL."""
+        headers = dict(self.headers, **(extra_headers or {}))
+        headers['Upload-Length'] = str(size)
+        headers['Upload-Metadata'] = encode_metadata(metadata)
+        response = self.session.post(self.endpoint, headers=headers, timeout=self.timeout)
+        if response.status_code != 201 or 'Location' not in response.headers:
+            raise TusError(f"Creating upload failed: {response.status_code} {response.text[:200]}")
+        return urljoin(self.endpoint, response.headers['Location'])
+
+    def offset(self, upload_url: str) -> Optional[int]:
+        """Bytes the server already has for an upload, or None if it no longer knows the upload."""
+        response = self.session.head(upload_url, headers=self.headers, timeout=self.timeout)
+        if response.status_code in (404, 410):
+            return None
+        if response.status_code != 200 or 'Upload-Offset' not in response.headers:
+            raise TusError(f"Reading upload offset failed: {response.status_code}")
+        return int(response.headers['Upload-Offset'])
+
+    def _patch(self, upload_url: str, offset: int, chunk: bytes) -> int:
+        headers = dict(self.headers)
+        headers['Upload-Offset'] = str(offset)
+        headers['Content-Type'] = 'application/offset+octet-stream'
+        response = self.session.patch(upload_url, data=chunk, headers=headers, timeout=self.timeout)
+        if response.status_code != 204:
+            raise TusError(f"Chunk at offset {offset} failed: {response.status_code} {response.text[:200]}")
+        return int(response.headers['Upload-Offset'])
+
+    def upload(self, file_path: str, metadata: Dict[str, str], upload_url: Optional[str] = None,
+               extra_headers: Optional[Dict[str, str]] = None,
+               on_created: Optional[Callable[[str], None]] = None,
+               on_abandoned: Optional[Callable[[str], None]] = None,
+               progress: Optional[Callable[[int], None]] = None) -> str:
+        """Upload file_path, resuming upload_url if the server still has it. Returns the upload URL.
+
+        on_created is called with the URL of a newly created upload so the
+        caller can persist it and resume after a crash; on_abandoned with a
+        given upload_url that couldn't be resumed (expired, or refused by
+        the server in any way) before a new upload is started in its place.
+        progress is called with the number of bytes each accepted chunk
+        added.
+        """
+        size = os.path.getsize(file_path)
+        offset = None
+        if upload_url:
+            try:
+                offset = self.offset(upload_url)
+            except TusError:
+                # Expired in some other way, or not ours: it will never resume, so don't keep asking
+                offset = None
+            if offset is None and on_abandoned:
+                on_abandoned(upload_url)
+        if offset is None:
+            upload_url = self.create(size, metadata, extra_headers)
+            offset = 0
+            if on_created:
+                on_created(upload_url)
+
+        failures = 0
+        resync = False
+        with open(file_path, 'rb') as f:
+            while True:
+                try:
+                    if resync:
+                        resumed = self.offset(upload_url)
+                        if resumed is None:
+                            raise TusUploadExpired(f"Upload {upload_url} expired on the server")
+                        offset = resumed
+                        resync = False
+                    if offset >= size:
+                        break
+                    f.seek(offset)
+                    chunk = f.read(self.chunk_size)
+                    new_offset = self._patch(upload_url, offset, chunk)
+                except TusUploadExpired:
+                    raise
+                except (requests.RequestException, TusError):
+                    failures += 1
+                    if failures > self.retries:
+                        raise
+                    time.sleep(self.backoff(failures - 1))
+                    # Ask the server how much of the chunk arrived and carry on from there
+                    resync = True
+                    continue
+
+                if progress:
+                    progress(new_offset - offset)
+                offset = new_offset
+                failures = 0
+        return upload_url
@@ -1,13 +1,40 @@
-import os
+import sys
+from datetime import timedelta
 from supabase import create_client, Client
-from typing import List
+from typing import List, Optional
 
-def get_brands_with_videos() -> List[str]:
+from media_catalog import MediaCatalog, media_type_for
+from storage_listing import iter_storage_folder
+
+BRAND_MEDIA_SECTION = 'scrolling_brand_media'
+# How old a completed scan may be before the bucket is listed again
+DEFAULT_MAX_AGE = timedelta(days=7)
+
+def get_brands_with_videos(refresh: bool = False, max_age: Optional[timedelta] = DEFAULT_MAX_AGE) -> List[str]:
     """
-    Returns a list of brand names that have MP4 files in their scrolling_brand_media folder.
+    Returns a list of brand names that have .mp4 videos in their scrolling_brand_media folder.
+    
+    Answered from the local media catalog that the migrator and index
+    builder keep up to date, but only if a scan of every brand's
+    scrolling_brand_media folder finished within max_age. Otherwise (after
+    a partial or interrupted scan, for instance), or when refresh is set,
+    the bucket is scanned again and the catalog updated from it.
     
     Returns:
-        List[str]: List of brand names with MP4 files
+        List[str]: List of brand names with videos
+    """
+    catalog = MediaCatalog()
+    if not refresh and catalog.covers_section(BRAND_MEDIA_SECTION, max_age):
+        return catalog.brands_with_videos()
+    
+    scan_bucket_into_catalog(catalog)
+    return catalog.brands_with_videos()
+
+def scan_bucket_into_catalog(catalog: MediaCatalog) -> None:
+    """
+    List every brand's scrolling_brand_media folder in storage and record it in the catalog.
+    
+    The scan is recorded as complete only if every brand's folder could be listed.
     """
     # Initialize Supabase client
     url = "https://bslylabiiircssqasmcs.supabase.co"
@@ -18,8 +45,6 @@ def get_brands_with_videos() -> List[str]:
     
     supabase: Client = create_client(url, key)
     
-    brands_with_videos = []
-    
     try:
         # List all buckets to find the storage bucket
         buckets = supabase.storage.list_buckets()
@@ -38,45 +63,43 @@ def get_brands_with_videos() -> List[str]:
         if not storage_bucket:
             raise ValueError("No storage bucket found")
         
-        # List all folders in the storage bucket
-        folders = supabase.storage.from_(storage_bucket).list()
+        bucket = supabase.storage.from_(storage_bucket)
         
-        # Go through each folder (brand)
-        for folder in folders:
+        # Go through each folder (brand), page by page
+        brands = []
+        complete = True
+        for folder in iter_storage_folder(bucket):
             if folder.get('name') and not folder.get('name').startswith('.'):
                 brand_name = folder['name']
+                brands.append(brand_name)
                 
                 # Check if this brand has a scrolling_brand_media folder
                 try:
-                    media_files = supabase.storage.from_(storage_bucket).list(
-                        path=f"{brand_name}/scrolling_brand_media"
-                    )
-                    
-                    # Check if any files in the folder are MP4s
-                    has_mp4 = any(
-                        file.get('name', '').lower().endswith('.mp4') 
-                        for file in media_files
-                    )
-                    
-                    if has_mp4:
-                        brands_with_videos.append(brand_name)
+                    media_folder = f"{brand_name}/{BRAND_MEDIA_SECTION}"
+                    catalog.sync_folder(media_folder, {
+                        file['name']: (file.get('metadata') or {}).get('size')
+                        for file in iter_storage_folder(bucket, media_folder)
+                        if media_type_for(file['name'])
+                    })
                         
                 except Exception as e:
                     # Skip brands that don't have scrolling_brand_media folder
                     print(f"Warning: Could not access scrolling_brand_media for brand {brand_name}: {e}")
+                    complete = False
                     continue
+        
+        if complete:
+            catalog.record_section_scan(BRAND_MEDIA_SECTION, brands)
     
     except Exception as e:
         print(f"Error accessing Supabase storage: {e}")
         raise
-    
-    return brands_with_videos
 
 def main():
     """Main function to run the script and print results."""
     try:
-        brands = get_brands_with_videos()
-        print(f"Found {len(brands)} brands with MP4 files in scrolling_brand_media:")
+        brands = get_brands_with_videos(refresh='--refresh' in sys.argv[1:])
+        print(f"Found {len(brands)} brands with videos in scrolling_brand_media:")
         for brand in brands:
             print(f"  - {brand}")
         return brands